@@ -1,11 +1,19 @@
 # core_api/admin.py
 from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from . import counters, profiling
 from .models import (
     BlogPost, Event, ContactMessage, NewsletterSubscriber, Resource,
     VolunteerApplication, PartnershipInquiry, TeamMember, GalleryItem,
-    Category, ImpactStat, TransformationStory
+    Category, ImpactStat, TransformationStory, MediaBlob, Counter,
+    ArchivedSubmission, RequestProfile, SlowQuery
 )
 
+# Inbox counters above the app list (core_api/templates/core_api/admin_index.html)
+admin.site.index_template = 'core_api/admin_index.html'
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug')
@@ -32,6 +40,15 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'submitted_at')
     search_fields = ('name', 'email', 'subject', 'message')
     readonly_fields = ('submitted_at',)
+    actions = ['mark_read', 'mark_unread']
+
+    def mark_read(self, request, queryset):
+        counters.bulk_update(queryset, is_read=True)
+    mark_read.short_description = "Mark selected messages as read"
+
+    def mark_unread(self, request, queryset):
+        counters.bulk_update(queryset, is_read=False)
+    mark_unread.short_description = "Mark selected messages as unread"
 
 @admin.register(NewsletterSubscriber)
 class NewsletterSubscriberAdmin(admin.ModelAdmin):
@@ -41,9 +58,10 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
 
 @admin.register(Resource)
 class ResourceAdmin(admin.ModelAdmin):
-    list_display = ('title', 'uploaded_at', 'is_public')
-    list_filter = ('is_public', 'uploaded_at')
+    list_display = ('title', 'uploaded_at', 'is_public', 'text_status')
+    list_filter = ('is_public', 'uploaded_at', 'text_status')
     search_fields = ('title', 'description')
+    readonly_fields = ('text_status', 'text_extracted_at')
 
 @admin.register(VolunteerApplication)
 class VolunteerApplicationAdmin(admin.ModelAdmin):
@@ -54,11 +72,11 @@ class VolunteerApplicationAdmin(admin.ModelAdmin):
     actions = ['mark_reviewed', 'mark_contacted']
 
     def mark_reviewed(self, request, queryset):
-        queryset.update(status='Reviewed')
+        counters.bulk_update(queryset, status='Reviewed')
     mark_reviewed.short_description = "Mark selected applications as Reviewed"
 
     def mark_contacted(self, request, queryset):
-        queryset.update(status='Contacted')
+        counters.bulk_update(queryset, status='Contacted')
     mark_contacted.short_description = "Mark selected applications as Contacted"
 
 @admin.register(PartnershipInquiry)
@@ -70,11 +88,11 @@ class PartnershipInquiryAdmin(admin.ModelAdmin):
     actions = ['mark_reviewed', 'mark_contacted']
 
     def mark_reviewed(self, request, queryset):
-        queryset.update(status='Reviewed')
+        counters.bulk_update(queryset, status='Reviewed')
     mark_reviewed.short_description = "Mark selected inquiries as Reviewed"
 
     def mark_contacted(self, request, queryset):
-        queryset.update(status='Contacted')
+        counters.bulk_update(queryset, status='Contacted')
     mark_contacted.short_description = "Mark selected inquiries as Contacted"
 
 @admin.register(TeamMember)
@@ -104,7 +122,7 @@ class GalleryItemAdmin(admin.ModelAdmin):
 
 @admin.register(ImpactStat)
 class ImpactStatAdmin(admin.ModelAdmin):
-    list_display = ('title', 'value', 'order')
+    list_display = ('title', 'value', 'metric', 'value_format', 'order')
     list_editable = ('order',)
 
 @admin.register(TransformationStory)
@@ -112,3 +130,138 @@ class TransformationStoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'location', 'is_published', 'created_at')
     list_filter = ('is_published',)
     search_fields = ('name', 'location', 'story')
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'references', 'created_at')
+    search_fields = ('name', 'sha256')
+    readonly_fields = ('name', 'sha256', 'size', 'references', 'created_at')
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'shard', 'value', 'updated_at')
+    readonly_fields = ('name', 'shard', 'value', 'updated_at')
+    actions = ['reconcile']
+
+    def has_add_permission(self, request):
+        return False
+
+    def reconcile(self, request, queryset):
+        for name in set(queryset.values_list('name', flat=True)):
+            if name in counters.COUNTERS:
+                counters.reconcile(name)
+    reconcile.short_description = "Recount selected counters"
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'original_id', 'email', 'submitted_at', 'archived_at')
+    list_filter = ('kind',)
+    search_fields = ('=email',)
+    date_hierarchy = 'submitted_at'
+    readonly_fields = ('kind', 'original_id', 'email', 'submitted_at', 'archived_at', 'data')
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'status', 'duration_ms', 'query_count', 'query_ms', 'user', 'downloads')
+    list_filter = ('method', 'status')
+    search_fields = ('path', 'user')
+    date_hierarchy = 'created_at'
+    readonly_fields = (
+        'method', 'path', 'status', 'duration_ms', 'query_count', 'query_ms', 'user', 'created_at', 'downloads',
+        'functions', 'repeated_queries', 'queries',
+    )
+    exclude = ('key', 'size')
+
+    # Profiles show who requested what and how; superusers only, whatever the model permissions say.
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        download = self.admin_site.admin_view(self.download)
+        return [
+            path('<int:pk>/download/<str:kind>/', download, name='core_api_requestprofile_download'),
+        ] + super().get_urls()
+
+    def download(self, request, pk, kind):
+        profile = RequestProfile.objects.filter(pk=pk).first()
+        if profile is None or kind not in ('prof', 'sql') or not self.has_view_permission(request, profile):
+            raise Http404
+        file_path = profiling.paths(profile.key)[0 if kind == 'prof' else 1]
+        try:
+            return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=f"profile-{pk}.{kind}{'' if kind == 'prof' else '.json'}")
+        except FileNotFoundError:
+            raise Http404
+
+    def downloads(self, obj):
+        return format_html_join(' | ', '<a href="{}">{}</a>', [
+            (reverse('admin:core_api_requestprofile_download', args=[obj.pk, kind]), label)
+            for kind, label in [('prof', 'cProfile'), ('sql', 'SQL trace')]
+        ])
+    downloads.short_description = "Download"
+
+    def functions(self, obj):
+        return format_html('<pre>{}</pre>', profiling.report(obj))
+    functions.short_description = "Slowest functions (cumulative)"
+
+    def repeated_queries(self, obj):
+        rows = profiling.repeated(profiling.load_queries(obj))
+        return format_html('<pre>{}</pre>', "\n\n".join(f"{count}x  {ms:.1f} ms\n{sql}" for count, ms, sql in rows) or "None")
+    repeated_queries.short_description = "Repeated statements"
+
+    def queries(self, obj):
+        text = "\n\n".join(
+            f"{query['ms']:.2f} ms  [{query['alias']}]  {query['source']}\n{query['sql']}"
+            for query in profiling.load_queries(obj)
+        )
+        return format_html('<pre>{}</pre>', text or "No queries")
+    queries.short_description = "SQL trace"
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'short_statement', 'count', 'total_ms', 'mean', 'max_ms', 'route', 'last_seen')
+    list_filter = ('alias',)
+    search_fields = ('statement', 'route')
+    readonly_fields = (
+        'fingerprint', 'statement', 'count', 'total_ms', 'mean', 'max_ms', 'example', 'params', 'alias', 'route',
+        'explain', 'plan_captured_at', 'last_seen',
+    )
+    exclude = ('plan',)
+    actions = ['recapture_plan']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def short_statement(self, obj):
+        return obj.statement[:120]
+    short_statement.short_description = "Statement"
+
+    def mean(self, obj):
+        return f"{obj.mean_ms:.1f}"
+    mean.short_description = "Mean ms"
+
+    def explain(self, obj):
+        return format_html('<pre>{}</pre>', obj.plan or "Pending (captured on the next flush)")
+    explain.short_description = "Plan"
+
+    def recapture_plan(self, request, queryset):
+        # Cleared plans are captured again the next time the statement is slow (e.g. after adding an index).
+        queryset.update(plan='', plan_captured_at=None)
+    recapture_plan.short_description = "Capture the plan again on the next slow run"
@@ -0,0 +1,235 @@
+# core_api/assets.py
+"""
+Production serving of static and media files from the app server (SERVE_ASSETS=True).
+
+* ``collectstatic`` runs through CompressedManifestStaticFilesStorage: every
+  file gets a content-hashed copy (``app.3f9a1c2b0d4e.css``), recorded in
+  staticfiles.json, and text assets get ``.gz`` (and, with the optional
+  ``brotli`` package, ``.br``) variants written next to them.
+* AssetMiddleware indexes STATIC_ROOT once when the worker starts (in the
+  preloaded master under gunicorn), so a static request is a dict lookup
+  plus an open(): no stat, no walk of the URLconf, session or auth. Hashed
+  names are served ``immutable`` for a year, other names for
+  STATIC_CACHE_SECONDS. The best precompressed variant the client accepts
+  is sent with ``Vary: Accept-Encoding``.
+* Media is served from MEDIA_ROOT with its Content-Type, an ETag and
+  Last-Modified, and answers If-None-Match / If-Modified-Since with 304.
+  Content-addressed names (MEDIA_CONTENT_ADDRESSED) are immutable too.
+
+The index is not refreshed: restart workers after ``collectstatic``.
+"""
+import gzip
+import json
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .storage import is_content_addressed
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico', '.eot', '.otf', '.ttf',
+}
+MIN_COMPRESS_BYTES = 256
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]  # Preference order
+TEXT_TYPES = {'application/javascript', 'application/json', 'image/svg+xml'}
+
+# Not in every system mime.types
+for _type, _extension in [
+    ('text/javascript', '.js'), ('text/javascript', '.mjs'), ('application/json', '.map'),
+    ('font/woff', '.woff'), ('font/woff2', '.woff2'), ('image/webp', '.webp'), ('image/avif', '.avif'),
+]:
+    mimetypes.add_type(_type, _extension)
+
+
+def content_type_for(name):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in TEXT_TYPES:
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def make_etag(size, mtime, encoding=None):
+    """Strong validator from size and mtime; each encoding is a different representation."""
+    return f'"{int(mtime):x}-{size:x}{"-" + encoding if encoding else ""}"'
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+# --- collectstatic ---
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def compress_file(path):
+    """Write ``path.gz`` (and ``path.br`` when brotli is installed) where they save space. Returns paths written."""
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return []
+    compressors = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    brotli = _brotli()
+    if brotli is not None:
+        compressors.insert(0, ('.br', lambda raw: brotli.compress(raw, quality=11)))
+    written = []
+    for suffix, compress in compressors:
+        compressed = compress(data)
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            written.append(path + suffix)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)  # Stale variant from an older build
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest (hashed-name) storage that also precompresses text assets after hashing."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(paths) | set(self.hashed_files.values())):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE and self.exists(name):
+                compress_file(self.path(name))
+
+
+# --- Serving ---
+class StaticFile:
+    __slots__ = ('representations', 'content_type', 'cache_control')
+
+    def __init__(self, path, stat, variants, cache_control):
+        # encoding (None for identity) -> (path, size, etag, last modified)
+        self.representations = {None: (path, stat.st_size, make_etag(stat.st_size, stat.st_mtime), stat.st_mtime)}
+        for encoding, (variant_path, variant_stat) in variants.items():
+            self.representations[encoding] = (
+                variant_path, variant_stat.st_size,
+                make_etag(stat.st_size, stat.st_mtime, encoding), stat.st_mtime,
+            )
+        self.content_type = content_type_for(path)
+        self.cache_control = cache_control
+
+
+class FileIndex:
+    """URL path -> StaticFile for everything under a static root, built once."""
+
+    def __init__(self, root, url_prefix, immutable_names=(), cache_seconds=0):
+        self.files = {}
+        if not root or not os.path.isdir(root):
+            return
+        found = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                found[os.path.relpath(path, root).replace(os.sep, '/')] = path
+        for name, path in found.items():
+            if any(name.endswith(suffix) and name[:-len(suffix)] in found for _, suffix in ENCODINGS):
+                continue  # A variant; reachable through its original only
+            variants = {
+                encoding: (found[name + suffix], os.stat(found[name + suffix]))
+                for encoding, suffix in ENCODINGS if name + suffix in found
+            }
+            cache_control = IMMUTABLE if name in immutable_names else f'public, max-age={cache_seconds}'
+            self.files[url_prefix + name] = StaticFile(path, os.stat(path), variants, cache_control)
+
+    @classmethod
+    def for_static_root(cls):
+        root = settings.STATIC_ROOT
+        manifest = os.path.join(root or '', ManifestStaticFilesStorage.manifest_name)
+        immutable_names = set()
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                immutable_names = set(json.load(f).get('paths', {}).values())
+        return cls(root, settings.STATIC_URL, immutable_names, settings.STATIC_CACHE_SECONDS)
+
+    def get(self, url_path):
+        return self.files.get(url_path)
+
+
+def file_response(request, representations, content_type, cache_control):
+    """
+    Response for one file given its ``{encoding: (path, size, etag, mtime)}``
+    representations: picks an accepted encoding, then answers conditionals.
+    """
+    encoding = None
+    if len(representations) > 1:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        encoding = next((coding for coding, _ in ENCODINGS if coding in representations and coding in accepted), None)
+    path, size, etag, mtime = representations[encoding]
+    response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if response is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.headers.pop('Content-Disposition', None)
+        response['Content-Length'] = size
+        response['Last-Modified'] = http_date(mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    if len(representations) > 1:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def serve_media_file(request, path, document_root=None):
+    """Media file under ``document_root`` (MEDIA_ROOT) with Content-Type, ETag and conditional handling."""
+    try:
+        full_path = safe_join(document_root or settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("File not found.")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found.")
+    cache_control = IMMUTABLE if is_content_addressed(path) else f'public, max-age={settings.MEDIA_CACHE_SECONDS}'
+    representations = {None: (full_path, stat.st_size, make_etag(stat.st_size, stat.st_mtime), stat.st_mtime)}
+    return file_response(request, representations, content_type_for(path), cache_control)
+
+
+class AssetMiddleware:
+    """Answers STATIC_URL and MEDIA_URL requests before the rest of the stack runs."""
+
+    def __init__(self, get_response):
+        if not settings.SERVE_ASSETS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.static = FileIndex.for_static_root()
+        # Only local prefixes; absolute (CDN) URLs are not ours to serve.
+        self.static_prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else None
+        self.media_prefix = settings.MEDIA_URL if settings.MEDIA_URL.startswith('/') else None
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            path = request.path_info
+            if self.static_prefix and path.startswith(self.static_prefix):
+                static_file = self.static.get(path)
+                if static_file is not None:
+                    return file_response(
+                        request, static_file.representations, static_file.content_type, static_file.cache_control,
+                    )
+            elif self.media_prefix and path.startswith(self.media_prefix):
+                return serve_media_file(request, path[len(self.media_prefix):])
+        return self.get_response(request)
@@ -0,0 +1,67 @@
+# core_api/cache.py
+"""
+Version counters for cached renderings.
+
+Cached bytes are stored under a key that includes the current version of
+their scope; bumping the version (from a model signal) makes every old key
+unreachable, so nothing has to be deleted explicitly. Versions and renderings
+live in the shared default cache (settings.CACHES), so a bump in one worker
+invalidates every worker's copy.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, quote_etag
+
+VERSION_TIMEOUT = None  # versions never expire on their own
+
+
+def get_version(scope):
+    key = f'version:{scope}'
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a cache flush can't resurrect an old version.
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(*scopes):
+    for scope in scopes:
+        key = f'version:{scope}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), VERSION_TIMEOUT)
+
+
+def cached_conditional_response(request, key, timeout, render):
+    """
+    Serve the bytes of ``render()`` (an HttpResponse) from the cache under
+    ``key``, with an ETag and the rendered Last-Modified, answering matching
+    conditional requests with a 304 before anything is rendered.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        rendered = render()
+        if rendered.status_code != 200:
+            return rendered
+        entry = {
+            'body': rendered.content,
+            'content_type': rendered['Content-Type'],
+            'etag': quote_etag(hashlib.md5(rendered.content).hexdigest()),
+            'last_modified': rendered.get('Last-Modified'),
+        }
+        cache.set(key, entry, timeout)
+    last_modified = parse_http_date_safe(entry['last_modified']) if entry['last_modified'] else None
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry['body'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    if entry['last_modified']:
+        response['Last-Modified'] = entry['last_modified']
+    return response
@@ -0,0 +1,223 @@
+# core_api/changes.py
+"""
+Change log behind ``/api/changes/?since=<token>`` (delta sync).
+
+Every write to a public model appends a ChangeLogEntry: ``upsert`` while the
+object is visible, ``delete`` (a tombstone) when it is deleted or hidden
+(is_active / is_published / is_public flipped off). The entry id is the sync
+position, so a sync is one range read on the primary key plus one query per
+kind for the current records.
+
+``compact_changelog`` keeps only the newest entry per object and purges
+tombstones older than CHANGELOG_TOMBSTONE_DAYS. Tokens older than the newest
+purged tombstone could miss deletions, so they get 410 and must resync.
+"""
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateTimeField, ExpressionWrapper, Max, Min
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import (
+    BlogPost, Category, ChangeLogEntry, Counter, Event, GalleryItem, ImpactStat, Resource, TeamMember,
+    TransformationStory,
+)
+
+HORIZON_COUNTER = 'changelog-horizon'
+
+
+class SyncSource:
+    def __init__(self, kind, model, visible, serializer):
+        self.kind = kind
+        self.model = model
+        self.visible = visible  # Filter kwargs for publicly visible rows
+        self.serializer = serializer  # Name in core_api.serializers, imported on first sync
+
+    def is_visible(self, instance):
+        return all(getattr(instance, field) == value for field, value in self.visible.items())
+
+    def queryset(self):
+        return self.model._default_manager.filter(**self.visible)
+
+    def serializer_class(self):
+        from . import serializers
+        return getattr(serializers, self.serializer)
+
+
+SOURCES = {source.kind: source for source in [
+    SyncSource('blogpost', BlogPost, {'is_active': True}, 'BlogPostSerializer'),
+    SyncSource('event', Event, {'is_active': True}, 'EventSerializer'),
+    SyncSource('gallery-item', GalleryItem, {'is_published': True}, 'GalleryItemSerializer'),
+    SyncSource('team-member', TeamMember, {'is_active': True}, 'TeamMemberSerializer'),
+    SyncSource('impact-stat', ImpactStat, {}, 'ImpactStatSerializer'),
+    SyncSource('transformation-story', TransformationStory, {'is_published': True}, 'TransformationStorySerializer'),
+    SyncSource('resource', Resource, {'is_public': True}, 'ResourceSerializer'),
+    SyncSource('category', Category, {}, 'CategorySerializer'),
+]}
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES.values()}
+
+
+# --- Tokens ---
+def encode_token(position):
+    return base64.urlsafe_b64encode(f'v1:{position}'.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Position for ``token``; raises ValueError for anything malformed."""
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+    version, _, position = raw.partition(':')
+    if version != 'v1':
+        raise ValueError(token)
+    return int(position)
+
+
+def current_position():
+    return ChangeLogEntry.objects.aggregate(position=Max('pk'))['position'] or 0
+
+
+def horizon():
+    """Oldest position a client can still sync from without missing a deletion."""
+    return Counter.objects.filter(name=HORIZON_COUNTER).values_list('value', flat=True).first() or 0
+
+
+# --- Writing (connected in core_api/signals.py) ---
+def record(kind, object_id, action):
+    # Appended after commit so positions are (near enough) in commit order; the
+    # read side also holds back the last CHANGES_SETTLE_SECONDS to absorb the rest.
+    transaction.on_commit(
+        lambda: ChangeLogEntry.objects.create(kind=kind, object_id=object_id, action=action)
+    )
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    source = SOURCES_BY_MODEL[sender]
+    if source.is_visible(instance):
+        record(source.kind, instance.pk, ChangeLogEntry.UPSERT)
+    elif not created:
+        # Hidden: clients that have it must drop it. Never-public objects are not logged.
+        record(source.kind, instance.pk, ChangeLogEntry.DELETE)
+
+
+def record_delete(sender, instance, **kwargs):
+    record(SOURCES_BY_MODEL[sender].kind, instance.pk, ChangeLogEntry.DELETE)
+
+
+def record_all(sources=None, batch_size=2000):
+    """
+    Append an upsert for every visible object of ``sources`` (default: all),
+    for rows written without signals (bulk inserts). Returns entries written.
+    """
+    written = 0
+    for source in sources or SOURCES.values():
+        ids = source.queryset().order_by('pk').values_list('pk', flat=True)
+        batch = []
+        for object_id in ids.iterator(chunk_size=batch_size):
+            batch.append(ChangeLogEntry(kind=source.kind, object_id=object_id, action=ChangeLogEntry.UPSERT))
+            if len(batch) >= batch_size:
+                written += len(ChangeLogEntry.objects.bulk_create(batch))
+                batch = []
+        written += len(ChangeLogEntry.objects.bulk_create(batch))
+    return written
+
+
+# --- Reading ---
+def settled_entries(kinds=None):
+    """
+    Log entries below the first one still inside the settle window. Stopping
+    there, rather than skipping it, keeps a page from returning a later
+    position that settled first (a slow commit) and moving a client's token
+    past an entry it would then never see. Both sides use the database clock.
+    """
+    cutoff = ExpressionWrapper(Now() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS), output_field=DateTimeField())
+    first_unsettled = (
+        ChangeLogEntry.objects.filter(changed_at__gte=cutoff).aggregate(position=Min('pk'))['position']
+    )
+    entries = ChangeLogEntry.objects.all()
+    if first_unsettled is not None:
+        entries = entries.filter(pk__lt=first_unsettled)
+    return entries.filter(kind__in=kinds) if kinds is not None else entries
+
+
+def entries_after(position, limit, kinds=None):
+    """(pk, kind, object_id, action) tuples after ``position``, oldest first."""
+    return list(
+        settled_entries(kinds).filter(pk__gt=position).order_by('pk')
+        .values_list('pk', 'kind', 'object_id', 'action')[:limit]
+    )
+
+
+def changes_since(position, limit, narrow=None):
+    """
+    (records, deleted, next_position, has_more) for up to ``limit`` log
+    entries after ``position``. ``records`` maps kind to model instances,
+    ``deleted`` maps kind to ids. ``narrow(source, queryset)`` may restrict
+    the record queries (e.g. to a serializer's columns and joins).
+    """
+    entries = entries_after(position, limit + 1)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    latest = {}
+    for pk, kind, object_id, action in entries:
+        latest[kind, object_id] = action  # Later entries win
+    upserts, deleted = {}, {}
+    for (kind, object_id), action in latest.items():
+        if kind not in SOURCES:
+            continue
+        (upserts if action == ChangeLogEntry.UPSERT else deleted).setdefault(kind, []).append(object_id)
+
+    records = {}
+    for kind, ids in upserts.items():
+        queryset = SOURCES[kind].queryset().filter(pk__in=ids)
+        if narrow:
+            queryset = narrow(SOURCES[kind], queryset)
+        objects = list(queryset)
+        records[kind] = objects
+        found = {obj.pk for obj in objects}
+        # Hidden or deleted since the entry was written; its tombstone follows later in the log.
+        missing = [object_id for object_id in ids if object_id not in found]
+        if missing:
+            deleted.setdefault(kind, []).extend(missing)
+    next_position = entries[-1][0] if entries else position
+    return records, deleted, next_position, has_more
+
+
+# --- Compaction (manage.py compact_changelog) ---
+def compact(tombstone_days=None, batch_size=500):
+    """
+    Delete entries superseded by a newer entry for the same object, then
+    tombstones older than ``tombstone_days``. Returns (superseded, purged).
+
+    One grouped pass over the (kind, object_id, -id) index finds the newest
+    entry of every object logged more than once; each such object then loses
+    its older entries with one index range delete, ``batch_size`` objects per
+    transaction. Entries written meanwhile are newer and never touched.
+    """
+    tombstone_days = settings.CHANGELOG_TOMBSTONE_DAYS if tombstone_days is None else tombstone_days
+    duplicated = list(
+        ChangeLogEntry.objects.order_by().values('kind', 'object_id')
+        .annotate(newest=Max('pk'), entries=Count('pk')).filter(entries__gt=1)
+        .values_list('kind', 'object_id', 'newest')
+    )
+    superseded = 0
+    for start in range(0, len(duplicated), batch_size):
+        with transaction.atomic():
+            for kind, object_id, newest in duplicated[start:start + batch_size]:
+                superseded += ChangeLogEntry.objects.filter(kind=kind, object_id=object_id, pk__lt=newest).delete()[0]
+
+    cutoff = timezone.now() - timedelta(days=tombstone_days)
+    expired = ChangeLogEntry.objects.filter(action=ChangeLogEntry.DELETE, changed_at__lt=cutoff)
+    purged = 0
+    with transaction.atomic():
+        last_purged = expired.aggregate(position=Max('pk'))['position']
+        if last_purged is not None:
+            counter, _ = Counter.objects.select_for_update().get_or_create(name=HORIZON_COUNTER)
+            Counter.objects.filter(pk=counter.pk).update(
+                value=max(counter.value, last_purged), updated_at=timezone.now(),
+            )
+            purged = expired.filter(pk__lte=last_purged).delete()[0]
+    return superseded, purged
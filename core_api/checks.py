@@ -0,0 +1,34 @@
+# core_api/checks.py
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+DATABASE_CACHE = 'django.core.cache.backends.db.DatabaseCache'
+
+
+@register(Tags.caches)
+def shared_cache_check(app_configs, **kwargs):
+    """Idempotency keys and cache versions only work when every worker sees the same cache."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in PER_PROCESS_CACHES:
+        return [Error(
+            f"The default cache ({backend}) is not shared between worker processes.",
+            hint="Use Redis (REDIS_URL) or django.core.cache.backends.db.DatabaseCache.",
+            obj='CACHES', id='core_api.E001',
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def database_cache_check(app_configs, **kwargs):
+    """The DatabaseCache fallback is shared, but every idempotency replay and cache version read is a query."""
+    if settings.CACHES.get('default', {}).get('BACKEND', '') == DATABASE_CACHE:
+        return [Warning(
+            "The default cache is the DatabaseCache fallback; idempotent replays and cache reads query the database.",
+            hint="Set REDIS_URL in production.",
+            obj='CACHES', id='core_api.W002',
+        )]
+    return []
@@ -0,0 +1,98 @@
+# core_api/ckeditor.py
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+from ckeditor_uploader import utils
+
+
+class OptimizingImageBackend:
+    """
+    CKEditor upload backend that downscales images to CKEDITOR_IMAGE_MAX_SIZE
+    and re-encodes them at CKEDITOR_IMAGE_QUALITY before they are stored.
+
+    Animated images and non-images are stored untouched, and the original is
+    kept when re-encoding would not make it smaller. Every image also gets the
+    ``<name>_thumb<ext>`` the upload browser links to, as ckeditor_uploader's
+    own Pillow backend writes it (outside the blob store under
+    ContentAddressedStorage). Pillow is only imported when an upload arrives.
+    """
+
+    def __init__(self, storage_engine, file_object):
+        self.file_object = file_object
+        self.storage_engine = storage_engine
+
+    @cached_property
+    def is_image(self):
+        return utils.is_valid_image_extension(self.file_object.name)
+
+    def save_as(self, filepath):
+        if not self.is_image:
+            return self.storage_engine.save(filepath, self.file_object)
+        optimized = self._optimize()
+        if optimized is not None:
+            content, ext = optimized
+            saved_path = self.storage_engine.save(f"{os.path.splitext(filepath)[0]}{ext}", content)
+        else:
+            saved_path = self.storage_engine.save(filepath, self.file_object)
+        self.create_thumbnail(saved_path)
+        return saved_path
+
+    def create_thumbnail(self, file_path):
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        thumb_name, storage = utils.get_thumb_filename(file_path), self.storage_engine
+        if getattr(storage, 'immutable', False):
+            # Content-addressed storage would rename the thumbnail after its own hash, away from the
+            # name the upload browser asks for. The original's name is its hash, so the thumb's is stable.
+            if storage.exists(thumb_name):
+                return thumb_name
+            storage = FileSystemStorage(location=storage.location, base_url=storage.base_url, allow_overwrite=True)
+        size = tuple(getattr(settings, 'CKEDITOR_THUMBNAIL_SIZE', (75, 75)))
+        try:
+            with self.storage_engine.open(file_path, 'rb') as stored, Image.open(stored) as image:
+                image.draft('RGB', size)
+                thumbnail = ImageOps.exif_transpose(image).convert('RGB')  # First frame of animations
+                thumbnail.thumbnail(size, Image.Resampling.LANCZOS)
+                output = BytesIO()
+                thumbnail.save(output, format='JPEG', optimize=True)
+        except (UnidentifiedImageError, OSError, ValueError):
+            return None
+        return storage.save(thumb_name, ContentFile(output.getvalue()))
+
+    def _optimize(self):
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        max_size = tuple(getattr(settings, 'CKEDITOR_IMAGE_MAX_SIZE', (1600, 1600)))
+        quality = getattr(settings, 'CKEDITOR_IMAGE_QUALITY', 80)
+        try:
+            self.file_object.seek(0)
+            image = Image.open(self.file_object)
+            if getattr(image, 'is_animated', False):
+                return None
+            # Let the JPEG decoder skip detail we are about to throw away.
+            image.draft('RGB', max_size)
+            image = ImageOps.exif_transpose(image)
+            resized = image.width > max_size[0] or image.height > max_size[1]
+            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+            output = BytesIO()
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            if has_alpha:
+                image.save(output, format='PNG', optimize=True)
+                ext = '.png'
+            else:
+                image.convert('RGB').save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+                ext = '.jpg'
+        except (UnidentifiedImageError, OSError, ValueError):
+            return None
+        finally:
+            self.file_object.seek(0)
+
+        if not resized and output.tell() >= self.file_object.size:
+            return None
+        return ContentFile(output.getvalue()), ext
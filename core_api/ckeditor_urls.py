@@ -0,0 +1,26 @@
+# core_api/ckeditor_urls.py
+"""
+Drop-in replacement for ``ckeditor_uploader.urls``.
+
+The upstream urlconf imports ``ckeditor_uploader.views`` at URL load, which
+pulls in the Pillow backend on every worker. These routes keep the same names
+and decorators but import the views on the first upload/browse request.
+"""
+from django.contrib.admin.views.decorators import staff_member_required
+from django.urls import re_path
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+
+
+def _lazy_view(name):
+    def view(request, *args, **kwargs):
+        from ckeditor_uploader import views
+        return getattr(views, name)(request, *args, **kwargs)
+    view.__name__ = name
+    return view
+
+
+urlpatterns = [
+    re_path(r'^upload/', csrf_exempt(staff_member_required(_lazy_view('upload'))), name='ckeditor_upload'),
+    re_path(r'^browse/', never_cache(staff_member_required(_lazy_view('browse'))), name='ckeditor_browse'),
+]
@@ -0,0 +1,256 @@
+# core_api/counters.py
+"""
+Incrementally maintained counts (unread messages, pending applications, ...).
+
+Each CounterDefinition names a filtered count over one model. Instead of
+running that COUNT(*) on every admin page view, Counter rows are adjusted by
+the delta of each write: post_init snapshots the watched field, post_save and
+post_delete compare it with the new value. The delta goes to one of
+COUNTER_SHARDS rows picked at random, so concurrent writes inside their
+request transactions rarely wait on each other's row lock; reads sum the
+shards. ``bulk_update`` does the same for
+``QuerySet.update()`` (the admin bulk actions), which sends no signals.
+``reconcile_counters`` recounts periodically and repairs any drift.
+
+Besides the staff inbox counts, the same mechanism backs the public impact
+metrics an ImpactStat can link to; ``format_metric`` renders them at read
+time. Metrics over submission tables also count the rows retention moved to
+ArchivedSubmission, so archiving (core_api/retention.py) leaves them as they
+were. Whenever a metric moves, the stats showing it get a change-log upsert,
+so delta sync and live clients pick up the new figure; which stats show
+which metric is cached until an ImpactStat changes.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .models import (
+    ArchivedSubmission, ChangeLogEntry, ContactMessage, Counter, Event, ImpactStat, NewsletterSubscriber,
+    PartnershipInquiry, TransformationStory, VolunteerApplication,
+)
+
+_archiving = ContextVar('counters_archiving', default=False)
+
+
+class CounterDefinition:
+    def __init__(self, name, label, model, field, value, archived=None):
+        self.name = name
+        self.label = label
+        self.model = model
+        self.field = field  # Counted rows have ``field == value``; None counts every row
+        self.value = value
+        self.archived = archived  # ArchivedSubmission kind whose rows still count, if any
+
+    def matches(self, field_value):
+        return self.field is None or field_value == self.value
+
+    def queryset(self):
+        if self.field is None:
+            return self.model._default_manager.all()
+        return self.model._default_manager.filter(**{self.field: self.value})
+
+    def count(self):
+        count = self.queryset().count()
+        if self.archived:
+            archived = ArchivedSubmission.objects.filter(kind=self.archived)
+            if self.field is not None:
+                archived = archived.filter(**{f'data__{self.field}': self.value})
+            count += archived.count()
+        return count
+
+    def changelist_url(self):
+        opts = self.model._meta
+        changelist = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        if self.field is None:
+            return changelist
+        value = int(self.value) if isinstance(self.value, bool) else self.value  # Admin boolean filters use 0/1
+        query = urlencode({f'{self.field}__exact': value})
+        return f"{changelist}?{query}"
+
+
+COUNTERS = {definition.name: definition for definition in [
+    CounterDefinition('contact-unread', "Unread messages", ContactMessage, 'is_read', False),
+    CounterDefinition('volunteer-pending', "Pending volunteer applications", VolunteerApplication, 'status', 'Pending'),
+    CounterDefinition('partnership-new', "New partnership inquiries", PartnershipInquiry, 'status', 'New'),
+    # Impact metrics (ImpactStat.metric)
+    CounterDefinition(
+        'volunteers-accepted', "Volunteers accepted", VolunteerApplication, 'status', 'Accepted', archived='volunteer',
+    ),
+    CounterDefinition(
+        'volunteer-applications', "Volunteer applications received", VolunteerApplication, None, None,
+        archived='volunteer',
+    ),
+    CounterDefinition('events-held', "Events held", Event, 'is_active', True),
+    CounterDefinition('stories-published', "Transformation stories published", TransformationStory, 'is_published', True),
+    CounterDefinition('subscribers', "Newsletter subscribers", NewsletterSubscriber, 'is_active', True),
+]}
+INBOX_COUNTERS = ['contact-unread', 'volunteer-pending', 'partnership-new']
+METRICS = {name for name, _ in ImpactStat.METRIC_CHOICES}
+COUNTERS_BY_MODEL = {}
+for _definition in COUNTERS.values():
+    COUNTERS_BY_MODEL.setdefault(_definition.model, []).append(_definition)
+
+
+def adjust(name, delta):
+    """Add ``delta`` to a counter; a counter that does not exist yet is counted from scratch."""
+    if not delta:
+        return
+    key = {'name': name, 'shard': random.randrange(settings.COUNTER_SHARDS)}
+    if not Counter.objects.filter(**key).update(value=F('value') + delta, updated_at=timezone.now()):
+        if not Counter.objects.filter(name=name).exists():
+            reconcile(name)
+            return
+        try:
+            with transaction.atomic():
+                Counter.objects.create(value=delta, **key)
+        except IntegrityError:
+            # Created concurrently; add to it instead.
+            Counter.objects.filter(**key).update(value=F('value') + delta, updated_at=timezone.now())
+    publish_metric(name)
+
+
+def reconcile(name):
+    """Recount one counter and store the result. Returns the drift that was repaired."""
+    definition = COUNTERS[name]
+    with transaction.atomic():
+        shards = list(Counter.objects.select_for_update().filter(name=name).order_by('shard'))
+        if not shards:
+            shards = [Counter.objects.select_for_update().get_or_create(name=name, shard=0)[0]]
+        actual = definition.count()
+        drift = actual - sum(shard.value for shard in shards)
+        if drift:
+            Counter.objects.filter(pk=shards[0].pk).update(value=F('value') + drift, updated_at=timezone.now())
+    if drift:
+        publish_metric(name)
+    return drift
+
+
+METRIC_STATS_KEY = 'counters:metric-stats'
+
+
+def metric_stats():
+    """{metric: [ImpactStat pks showing it]}, from the cache until an ImpactStat is saved or deleted."""
+    mapping = cache.get(METRIC_STATS_KEY)
+    if mapping is None:
+        mapping = {}
+        stats = ImpactStat.objects.filter(Q(metric__in=METRICS) | Q(metric_total__in=METRICS))
+        for pk, metric, metric_total in stats.values_list('pk', 'metric', 'metric_total'):
+            for name in {metric, metric_total} & METRICS:
+                mapping.setdefault(name, []).append(pk)
+        cache.set(METRIC_STATS_KEY, mapping, None)
+    return mapping
+
+
+def publish_metric(name):
+    """Log an upsert for every impact stat showing metric ``name`` (a no-op for other counters)."""
+    if name not in METRICS:
+        return
+    from . import changes
+
+    kind = changes.SOURCES_BY_MODEL[ImpactStat].kind
+    for pk in metric_stats().get(name, []):
+        changes.record(kind, pk, ChangeLogEntry.UPSERT)
+
+
+class archiving:
+    """Context manager for deletes that move rows to ArchivedSubmission, which metrics still count."""
+
+    def __enter__(self):
+        self._token = _archiving.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _archiving.reset(self._token)
+
+
+def get_counts(names=None):
+    """{name: value} for the given counters (all by default) in one query."""
+    names = list(names or COUNTERS)
+    counts = dict(
+        Counter.objects.filter(name__in=names).order_by().values('name').annotate(total=Sum('value'))
+        .values_list('name', 'total')
+    )
+    for name in names:
+        if name not in counts:
+            reconcile(name)
+            counts[name] = Counter.objects.filter(name=name).aggregate(total=Sum('value'))['total']
+    return {name: counts[name] for name in names}
+
+
+def bulk_update(queryset, **values):
+    """``queryset.update(**values)`` that keeps the model's counters (and daily rollups) in step."""
+    from . import rollups
+
+    definitions = [d for d in COUNTERS_BY_MODEL.get(queryset.model, []) if d.field in values]
+    with transaction.atomic():
+        rollups.bulk_update(queryset, values)
+        before = {d.name: queryset.filter(**{d.field: d.value}).count() for d in definitions}
+        updated = queryset.update(**values)
+        for definition in definitions:
+            after = updated if definition.matches(values[definition.field]) else 0
+            # Rows not matched before but matched after, minus the reverse.
+            adjust(definition.name, after - before[definition.name])
+    return updated
+
+
+# --- Signal handlers (connected in core_api/signals.py) ---
+def snapshot(sender, instance, **kwargs):
+    # Deferred fields are left out; saving such an instance triggers a recount.
+    instance._counter_snapshot = {
+        d.field: instance.__dict__[d.field] for d in COUNTERS_BY_MODEL[sender] if d.field and d.field in instance.__dict__
+    }
+
+
+def track_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = getattr(instance, '_counter_snapshot', {})
+    for definition in COUNTERS_BY_MODEL[sender]:
+        now = definition.matches(getattr(instance, definition.field) if definition.field else None)
+        if created:
+            adjust(definition.name, int(now))
+        elif definition.field is None:
+            continue
+        elif definition.field in old_values:
+            adjust(definition.name, int(now) - int(definition.matches(old_values[definition.field])))
+        else:
+            reconcile(definition.name)
+    snapshot(sender, instance)
+
+
+def forget_metric_stats(sender, **kwargs):
+    # After commit, so a worker reading in between can't cache the old mapping again.
+    transaction.on_commit(lambda: cache.delete(METRIC_STATS_KEY))
+
+
+def track_delete(sender, instance, **kwargs):
+    old_values = getattr(instance, '_counter_snapshot', {})
+    for definition in COUNTERS_BY_MODEL[sender]:
+        if definition.archived and _archiving.get():
+            continue  # Moved to the archive, where it is still counted
+        if definition.field is None:
+            adjust(definition.name, -1)
+        elif definition.field in old_values:
+            adjust(definition.name, -int(definition.matches(old_values[definition.field])))
+        else:
+            reconcile(definition.name)
+
+
+# --- Impact metrics ---
+def format_metric(value, value_format, total=None):
+    """Render a metric for display: ``number`` 12,345 / ``rounded`` 12,000+ / ``percent`` 85%."""
+    if value_format == 'percent':
+        return f"{round(100 * value / total) if total else 0}%"
+    if value_format == 'rounded' and value >= 100:
+        # Keep two significant figures and round down, so the figure is never overstated.
+        step = 10 ** (len(str(value)) - 2)
+        rounded = value // step * step
+        return f"{rounded:,}+" if rounded != value else f"{value:,}"
+    return f"{value:,}"
@@ -0,0 +1,150 @@
+# core_api/db_router.py
+"""
+Primary/replica database routing with read-your-writes stickiness.
+
+Only requests read from replicas: reads go to the aliases in
+DATABASE_REPLICAS (round robin, or the least lagging one) unless the request
+is pinned to the primary. A request is pinned when it writes (any non-safe
+method), when it hits the admin or the CKEditor upload views, or when the
+client wrote within the last READ_YOUR_WRITES_SECONDS (tracked with a
+short-lived cookie).
+
+Everything outside a request (management commands, background threads and
+workers) reads from the primary, and so does any read inside a transaction
+on the primary, where a lagging copy would be read under the primary's
+locks and written back.
+"""
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_pinned = ContextVar('use_primary_database', default=True)  # ReadYourWritesMiddleware unpins requests
+PIN_COOKIE = 'db_pin_primary'
+PRIMARY_PATH_PREFIXES = ('/admin/', '/ckeditor/')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class use_primary:
+    """Context manager (and decorator) forcing reads in its block to the primary."""
+
+    def __enter__(self):
+        self._token = _pinned.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _pinned.reset(self._token)
+
+    def __call__(self, func):
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class ReplicaSelector:
+    def __init__(self):
+        self._cycle = None
+        self._aliases = None
+        self._lag = {}
+        self._lock = threading.Lock()
+
+    def round_robin(self, aliases):
+        with self._lock:
+            if self._aliases != aliases:
+                self._aliases = list(aliases)
+                self._cycle = itertools.cycle(self._aliases)
+            return next(self._cycle)
+
+    def least_lag(self, aliases):
+        now = time.monotonic()
+        ttl = getattr(settings, 'DATABASE_REPLICA_LAG_CACHE_SECONDS', 5)
+        best, best_lag = aliases[0], None
+        for alias in aliases:
+            checked_at, lag = self._lag.get(alias, (0, None))
+            if now - checked_at > ttl:
+                lag = self.measure_lag(alias)
+                self._lag[alias] = (now, lag)
+            if lag is not None and (best_lag is None or lag < best_lag):
+                best, best_lag = alias, lag
+        return best
+
+    def measure_lag(self, alias):
+        """Seconds behind the primary, or None when the replica can't be asked."""
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return 0.0
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                )
+                return float(cursor.fetchone()[0])
+        except Exception:
+            return None
+
+    def choose(self, aliases):
+        if getattr(settings, 'DATABASE_REPLICA_STRATEGY', 'round-robin') == 'least-lag':
+            return self.least_lag(aliases)
+        return self.round_robin(aliases)
+
+
+selector = ReplicaSelector()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if model._meta.app_label == 'django_cache':
+            return DEFAULT_DB_ALIAS  # DatabaseCache: a lagging copy would miss idempotency keys and version bumps
+        if not aliases or _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return selector.choose(aliases)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReadYourWritesMiddleware:
+    """Pin requests to the primary around writes; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = (
+            request.method not in SAFE_METHODS
+            or request.path.startswith(PRIMARY_PATH_PREFIXES)
+            or self.recently_wrote(request)
+        )
+        token = _pinned.set(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            window = getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time() + window)), max_age=window, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def recently_wrote(self, request):
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -0,0 +1,192 @@
+# core_api/documents.py
+"""
+Full-text search inside uploaded Resource files.
+
+Saving a Resource with a new file (an upload, or a changed file name) marks
+it ``pending``; nothing is read on the request path. ``manage.py
+extract_resource_text --loop`` works through pending resources: it copies
+the file to a temporary file while hashing it and, when the SHA-256 matches
+the file the stored text came from, keeps that text. Otherwise it runs
+core_api/textextract.py in a child process capped at RESOURCE_TEXT_MEMORY_MB
+of memory and RESOURCE_TEXT_TIMEOUT seconds, and stores at most
+RESOURCE_TEXT_MAX_CHARS characters. Files over RESOURCE_TEXT_MAX_BYTES and
+types the extractor doesn't read are marked ``skipped``; crashes, timeouts
+and memory-limit kills are marked ``failed`` and not retried until the file
+changes.
+
+On PostgreSQL ``Resource.search_vector`` (GIN-indexed) weights the title A,
+the description B and the file's text C, and ``?search=`` on
+/api/resources/ ranks by it. Other databases fall back to substring
+matching. The text also feeds the shared search index (core_api/search.py).
+"""
+import hashlib
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import search as search_index
+from .models import Resource
+from .textextract import UNSUPPORTED
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+# --- Signal handlers (connected in core_api/signals.py) ---
+def snapshot(sender, instance, **kwargs):
+    # Deferred files are left out; saving such an instance leaves the status alone.
+    if 'file' in instance.__dict__:
+        value = instance.__dict__['file']
+        instance._text_source_name = getattr(value, 'name', value)
+
+
+def mark_pending(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_file = instance.file
+    if not field_file:
+        instance.text_status, instance.content_text, instance.file_sha256 = Resource.TEXT_SKIPPED, '', ''
+    elif not field_file._committed or field_file.name != getattr(instance, '_text_source_name', field_file.name):
+        instance.text_status = Resource.TEXT_PENDING  # The old text stays searchable until the worker replaces it
+
+
+def update_vector(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._text_source_name = instance.file.name
+    refresh_vectors(Resource.objects.filter(pk=instance.pk))
+
+
+def refresh_vectors(queryset):
+    """Recompute the weighted tsvector (title A, description B, file text C) for ``queryset``."""
+    if not search_index.is_postgres():
+        return
+    from django.contrib.postgres.search import SearchVector
+
+    queryset.update(search_vector=(
+        SearchVector('title', weight='A') + SearchVector('description', weight='B')
+        + SearchVector('content_text', weight='C')
+    ))
+
+
+# --- Extraction (manage.py extract_resource_text) ---
+def copy_and_hash(field_file, destination):
+    """Copy a stored file into ``destination``; returns its SHA-256 hex digest."""
+    digest = hashlib.sha256()
+    with field_file.storage.open(field_file.name, 'rb') as source:
+        for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            destination.write(chunk)
+    destination.flush()
+    return digest.hexdigest()
+
+
+def run_extractor(name, source):
+    """(status, text) from the extractor child reading the open file ``source``."""
+    command = [
+        sys.executable, '-m', 'core_api.textextract', name,
+        '--memory-mb', str(settings.RESOURCE_TEXT_MEMORY_MB),
+        '--cpu-seconds', str(settings.RESOURCE_TEXT_TIMEOUT),
+        '--max-chars', str(settings.RESOURCE_TEXT_MAX_CHARS),
+    ]
+    source.seek(0)
+    try:
+        result = subprocess.run(
+            command, stdin=source, capture_output=True, timeout=settings.RESOURCE_TEXT_TIMEOUT,
+            cwd=settings.BASE_DIR,
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning("Text extraction of %s timed out", name)
+        return Resource.TEXT_FAILED, ''
+    if result.returncode == UNSUPPORTED:
+        return Resource.TEXT_SKIPPED, ''
+    if result.returncode != 0:
+        logger.warning(
+            "Text extraction of %s failed (exit %s): %s", name, result.returncode,
+            result.stderr.decode('utf-8', 'replace')[-500:],
+        )
+        return Resource.TEXT_FAILED, ''
+    return Resource.TEXT_DONE, result.stdout.decode('utf-8', 'replace')
+
+
+def process(resource):
+    """Extract text for one pending resource. Returns the status stored, or None if it changed meanwhile."""
+    field_file, name = resource.file, resource.file.name
+    values = {'text_extracted_at': timezone.now()}
+    try:
+        size = field_file.storage.size(name)
+    except OSError:
+        size = None  # Missing from storage
+    if size is None:
+        values.update(text_status=Resource.TEXT_FAILED)
+    elif size > settings.RESOURCE_TEXT_MAX_BYTES:
+        values.update(text_status=Resource.TEXT_SKIPPED, content_text='', file_sha256='')
+    else:
+        with tempfile.TemporaryFile() as copy:
+            sha256 = copy_and_hash(field_file, copy)
+            if sha256 == resource.file_sha256:
+                values.update(text_status=Resource.TEXT_DONE)  # Same content re-uploaded; keep its text
+            else:
+                status, text = run_extractor(name, copy)
+                # The hash is only kept for text worth reusing; a failed file is retried when uploaded again.
+                values.update(
+                    text_status=status, content_text=text, file_sha256=sha256 if status == Resource.TEXT_DONE else '',
+                )
+    # Only if the file wasn't replaced while we read it; that save marked it pending again.
+    updated = Resource.objects.filter(pk=resource.pk, file=name, text_status=Resource.TEXT_PENDING).update(**values)
+    if not updated:
+        return None
+    refresh_vectors(Resource.objects.filter(pk=resource.pk))
+    if 'content_text' in values:
+        search_index.index_instance(Resource.objects.get(pk=resource.pk))
+    return values['text_status']
+
+
+def pending():
+    return Resource.objects.filter(text_status=Resource.TEXT_PENDING).order_by('uploaded_at', 'pk')
+
+
+def run(batch_size=20, stdout=None):
+    """Process up to ``batch_size`` pending resources; returns how many were processed."""
+    count = 0
+    for resource in pending().defer('content_text', 'search_vector')[:batch_size]:
+        started = time.monotonic()
+        status = process(resource)
+        count += 1
+        if stdout is not None:
+            stdout.write(f"{resource.file.name}: {status or 'changed, left pending'} ({time.monotonic() - started:.1f}s)")
+    return count
+
+
+def loop(batch_size=20, stdout=None):
+    from django.db import close_old_connections
+
+    while True:
+        close_old_connections()
+        if not run(batch_size, stdout):
+            time.sleep(settings.RESOURCE_TEXT_POLL_SECONDS)
+
+
+# --- Search (ResourceViewSet) ---
+def search(queryset, query):
+    """``queryset`` filtered to resources matching ``query``, best matches first."""
+    if search_index.is_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type='websearch')
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', '-uploaded_at', 'pk')
+        )
+    # Development databases: substring match.
+    return queryset.filter(
+        Q(title__icontains=query) | Q(description__icontains=query) | Q(content_text__icontains=query)
+    )
@@ -0,0 +1,107 @@
+# core_api/downloads.py
+"""
+Bulk downloads streamed as ZIP archives (core_api/zipstream.py).
+
+* ``/api/categories/<slug>/gallery.zip``: every published gallery image and
+  video in the category.
+* ``/api/resources/press-kit.zip``: every public resource file.
+
+Rows are read in chunks and files are streamed from storage as the archive
+is written, so a worker's memory doesn't grow with the archive beyond one
+small central-directory record per file. Up to DOWNLOAD_PRESIZE_MAX_ROWS
+rows, every file's size is looked up before the first byte so the response
+can carry Content-Length; larger archives start at once and look each file
+up as they reach it (chunked, no Content-Length). Files missing from storage
+are left out. Each download keeps a sync worker busy for its whole duration,
+so put a rate limit in front of these in production.
+"""
+import posixpath
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from .models import Category, GalleryItem, Resource
+from .zipstream import Member, ZipStream
+
+
+def file_member(field_file, name, modified):
+    storage, stored_name = field_file.storage, field_file.name
+    try:
+        size = storage.size(stored_name)
+    except OSError:
+        return None  # Missing from storage
+    return Member(
+        name, size, lambda: storage.open(stored_name, 'rb'),
+        modified=timezone.localtime(modified) if timezone.is_aware(modified) else modified,
+    )
+
+
+def unique_name(name, taken):
+    stem, extension = posixpath.splitext(name)
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem} ({n}){extension}"
+    taken.add(candidate)
+    return candidate
+
+
+def zip_response(members, rows, filename):
+    """Stream the ``members`` generator; small archives (by ``rows``) are listed first for Content-Length."""
+    if rows <= settings.DOWNLOAD_PRESIZE_MAX_ROWS:
+        members = list(members)
+    archive = ZipStream(members)
+    response = StreamingHttpResponse(archive, content_type='application/zip')
+    size = archive.size()
+    if size is not None:
+        response['Content-Length'] = size
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def gallery_members(items):
+    taken = set()
+    for item in items.iterator(chunk_size=500):
+        for folder, field_file in [('images', item.image), ('videos', item.video)]:
+            if not field_file:
+                continue
+            name = unique_name(f"{folder}/{posixpath.basename(field_file.name)}", taken)
+            member = file_member(field_file, name, item.upload_date)
+            if member is not None:
+                yield member
+
+
+def resource_members(resources):
+    taken = set()
+    for resource in resources.iterator(chunk_size=500):
+        if not resource.file:
+            continue
+        name = unique_name(posixpath.basename(resource.file.name), taken)
+        member = file_member(resource.file, name, resource.uploaded_at)
+        if member is not None:
+            yield member
+
+
+@require_safe
+def gallery_zip(request, slug):
+    category = get_object_or_404(Category.objects.only('pk', 'slug'), slug=slug)
+    items = (
+        GalleryItem.objects.filter(category=category, is_published=True)
+        .order_by('upload_date', 'pk').only('image', 'video', 'upload_date')
+    )
+    rows = items.count()
+    if not rows:
+        raise Http404("No published media in this category.")
+    return zip_response(gallery_members(items), rows, f"{category.slug}-gallery.zip")
+
+
+@require_safe
+def press_kit_zip(request):
+    resources = Resource.objects.filter(is_public=True).order_by('title', 'pk').only('file', 'uploaded_at')
+    rows = resources.count()
+    if not rows:
+        raise Http404("No public resources.")
+    return zip_response(resource_members(resources), rows, "press-kit.zip")
@@ -0,0 +1,154 @@
+# core_api/feeds.py
+import json
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed, SyndicationFeed
+
+from .cache import cached_conditional_response, get_version
+from .links import frontend_url
+from .models import BlogPost, Category, Event
+
+
+class JSONFeed(SyndicationFeed):
+    """JSON Feed 1.1 (https://www.jsonfeed.org/version/1.1/) generator."""
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'items': [
+                {
+                    'id': item['unique_id'] or item['link'],
+                    'url': item['link'],
+                    'title': item['title'],
+                    'summary': item['description'],
+                    'content_text': item['description'],
+                    'date_published': item['pubdate'].isoformat() if item['pubdate'] else None,
+                    'date_modified': item['updateddate'].isoformat() if item['updateddate'] else None,
+                    'authors': [{'name': item['author_name']}] if item['author_name'] else [],
+                    'tags': list(item['categories']),
+                }
+                for item in self.items
+            ],
+        }
+        outfile.write(json.dumps(feed, ensure_ascii=False).encode(encoding))
+
+
+FEED_TYPES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed, 'json': JSONFeed}
+
+
+# --- Blog posts (optionally per category) ---
+class BlogPostFeed(Feed):
+    def get_object(self, request, category=None):
+        if category is None:
+            return None
+        return get_object_or_404(Category, slug=category)
+
+    def title(self, obj):
+        return f"Blog: {obj.name}" if obj else "Blog"
+
+    def link(self, obj):
+        return frontend_url('category', slug=obj.slug) if obj else frontend_url('blog')
+
+    def description(self, obj):
+        return f"Latest posts in {obj.name}" if obj else "Latest blog posts"
+
+    def items(self, obj):
+        # Bodies are never read: items carry the stored excerpt only.
+        posts = (
+            BlogPost.objects.filter(is_active=True)
+            .select_related('category')
+            .only('title', 'slug', 'excerpt', 'author', 'published_date', 'updated_date', 'category__name')
+            .order_by('-published_date')
+        )
+        if obj is not None:
+            posts = posts.filter(category=obj)
+        return posts[:settings.FEED_ITEM_COUNT]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt or ''
+
+    def item_link(self, item):
+        return frontend_url('blogpost', slug=item.slug)
+
+    def item_author_name(self, item):
+        return item.author
+
+    def item_pubdate(self, item):
+        return item.published_date
+
+    def item_updateddate(self, item):
+        return item.updated_date
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+# --- Events ---
+class EventFeed(Feed):
+    title = "Events"
+    description = "Upcoming and recent events"
+
+    def link(self):
+        return frontend_url('events')
+
+    def items(self):
+        return (
+            Event.objects.filter(is_active=True)
+            .only('title', 'slug', 'description', 'location', 'event_date', 'created_at', 'updated_at')
+            .order_by('-event_date')[:settings.FEED_ITEM_COUNT]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return f"{item.event_date:%Y-%m-%d %H:%M} · {item.location}\n\n{item.description}"
+
+    def item_link(self, item):
+        return frontend_url('event', slug=item.slug)
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+def cached_feed(feed_class, scope):
+    """
+    View serving ``feed_class`` as RSS, Atom or JSON Feed. Rendered bytes are
+    cached until the scope's version is bumped by a model signal, and
+    ETag/Last-Modified let pollers revalidate with a 304.
+    """
+    feeds = {
+        fmt: type(f'{feed_class.__name__}{fmt.title()}', (feed_class,), {'feed_type': feed_type})()
+        for fmt, feed_type in FEED_TYPES.items()
+    }
+
+    def view(request, fmt, **kwargs):
+        if fmt not in feeds:
+            raise Http404("Unknown feed format.")
+        key = f'feed:{scope}:{get_version(scope)}:{request.path}'
+        response = cached_conditional_response(
+            request, key, settings.FEED_CACHE_TIMEOUT, lambda: feeds[fmt](request, **kwargs)
+        )
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+    return view
+
+
+blog_feed = cached_feed(BlogPostFeed, 'blog-feeds')
+event_feed = cached_feed(EventFeed, 'event-feeds')
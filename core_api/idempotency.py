@@ -0,0 +1,112 @@
+# core_api/idempotency.py
+"""
+``Idempotency-Key`` support for create endpoints.
+
+The first response to a key is stored in the cache for IDEMPOTENCY_KEY_TTL
+together with a fingerprint of the request payload. A retry with the same
+key costs one cache read and replays that response (marked with
+``Idempotent-Replayed: true``) without touching the application tables. That
+read is a Redis round trip, or a query on the cache table with the
+DatabaseCache fallback (``manage.py check --deploy`` warns about it). Keys
+are scoped per user, but requests without credentials (no session cookie or
+Authorization header) share the anonymous scope and never resolve the user.
+The same key with a different payload gets 422, and a retry that arrives
+while the first request is still running gets 409. Requests rejected by
+validation or that fail with a server error release the key, so a retry
+runs again.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+PENDING = 'pending'
+
+
+def _payload_value(value):
+    if isinstance(value, UploadedFile):
+        return {'file': value.name, 'size': value.size}
+    return value
+
+
+def fingerprint(request):
+    """Stable hash of the parsed request payload (uploaded files by name and size)."""
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = {key: [_payload_value(v) for v in values] for key, values in data.lists()}
+    body = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def has_credentials(request):
+    return 'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def cache_key(request, key):
+    # Resolving the user costs a session (and user) query; only requests that could have one pay for it.
+    user = request.user.pk if has_credentials(request) and request.user.is_authenticated else 'anon'
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'idempotency:{request.path}:{user}:{digest}'
+
+
+class IdempotentCreateMixin:
+    """Honour ``Idempotency-Key`` on ``create`` (CreateAPIView and ModelViewSet alike)."""
+
+    def perform_authentication(self, request):
+        pass  # Lazy: the user is resolved when a permission check or cache_key() first needs it
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({HEADER: f"Must be at most {MAX_KEY_LENGTH} characters."})
+
+        storage_key = cache_key(request, key)
+        request_fingerprint = fingerprint(request)
+        stored = cache.get(storage_key)
+        if stored is None and not cache.add(storage_key, {'state': PENDING, 'fingerprint': request_fingerprint},
+                                            settings.IDEMPOTENCY_PENDING_TTL):
+            stored = cache.get(storage_key)  # Lost the race to a concurrent first attempt
+        if stored is not None:
+            return self.replay(stored, request_fingerprint)
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            cache.delete(storage_key)
+            raise
+        if response.status_code >= 500:
+            cache.delete(storage_key)
+            return response
+        cache.set(storage_key, {
+            'state': 'done',
+            'fingerprint': request_fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+            'headers': {name: response[name] for name in ('Location',) if response.has_header(name)},
+        }, settings.IDEMPOTENCY_KEY_TTL)
+        return response
+
+    def replay(self, stored, request_fingerprint):
+        if stored['fingerprint'] != request_fingerprint:
+            return Response(
+                {"detail": f"{HEADER} was already used with a different request payload."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if stored['state'] == PENDING:
+            return Response(
+                {"detail": f"A request with this {HEADER} is still being processed."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        response = Response(stored['data'], status=stored['status'], headers=stored['headers'])
+        response[REPLAYED_HEADER] = 'true'
+        return response
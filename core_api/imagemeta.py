@@ -0,0 +1,159 @@
+# core_api/imagemeta.py
+"""
+Image metadata stored next to each image field (``<field>_meta``).
+
+When an image is uploaded (or its name changes) pre_save reads it once and
+stores width, height, byte size, MIME type, the average colour and a tiny
+JPEG preview (data URI, at most PLACEHOLDER_SIZE px) for blur-up loading.
+Serializers return the stored dict, so clients can reserve layout space
+without a HEAD request and nothing opens the file at read time.
+``backfill_image_meta`` fills it in for media uploaded before this existed.
+"""
+import base64
+import io
+
+from django.db import connections
+
+from .models import BlogPost, Event, GalleryItem, ImpactStat, TeamMember, TransformationStory
+
+PLACEHOLDER_SIZE = 16
+PUBLIC_KEYS = ['width', 'height', 'bytes', 'mime', 'color', 'placeholder']
+
+IMAGE_FIELDS = {
+    BlogPost: 'image',
+    Event: 'image',
+    GalleryItem: 'image',
+    TeamMember: 'profile_picture',
+    ImpactStat: 'icon',
+    TransformationStory: 'image',
+}
+
+
+def meta_field(model):
+    return f'{IMAGE_FIELDS[model]}_meta'
+
+
+def read_image(fileobj, name, size):
+    """Metadata dict for an open image file; only ``name`` and ``bytes`` if Pillow cannot read it."""
+    from PIL import Image, ImageOps  # Only needed when an image changes
+
+    meta = {'name': name, 'bytes': size}
+    try:
+        with Image.open(fileobj) as image:
+            mime = Image.MIME.get(image.format)
+            image = ImageOps.exif_transpose(image)  # Report the size the image is displayed at
+            width, height = image.size
+            preview = image.convert('RGB')
+            preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return meta
+    red, green, blue = preview.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+    buffer = io.BytesIO()
+    preview.save(buffer, 'JPEG', quality=50)
+    meta.update({
+        'width': width, 'height': height, 'mime': mime, 'color': f'#{red:02x}{green:02x}{blue:02x}',
+        'placeholder': 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode(),
+    })
+    return meta
+
+
+def extract(field_file):
+    """Metadata for a FieldFile (``{}`` when empty); reads an upload in memory, otherwise from storage."""
+    if not field_file:
+        return {}
+    try:
+        if not field_file._committed:
+            upload = field_file.file
+            upload.seek(0)
+            try:
+                return read_image(upload, field_file.name, upload.size)
+            finally:
+                upload.seek(0)  # Storage reads it again on save
+        with field_file.storage.open(field_file.name, 'rb') as stored:
+            return read_image(stored, field_file.name, field_file.storage.size(field_file.name))
+    except OSError:
+        return {'name': field_file.name}  # Missing from storage
+
+
+def is_stale(name, meta):
+    """True when ``meta`` was not extracted from the file currently called ``name``."""
+    return (meta or {}).get('name') != name
+
+
+def public_meta(meta):
+    """What the API shows: no internal keys, None for images without metadata."""
+    if not meta or 'width' not in meta:
+        return None
+    return {key: meta.get(key) for key in PUBLIC_KEYS}
+
+
+# --- Signal handler (connected in core_api/signals.py) ---
+def update_meta(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_file = getattr(instance, IMAGE_FIELDS[sender])
+    meta = getattr(instance, meta_field(sender))
+    if not field_file:
+        setattr(instance, meta_field(sender), {})
+    elif not field_file._committed:
+        meta = extract(field_file)
+        # Commit now, as FileField.pre_save would next, so the stored name is the final one.
+        field_file.save(field_file.name, field_file.file, save=False)
+        setattr(instance, meta_field(sender), {**meta, 'name': field_file.name})
+    elif is_stale(field_file.name, meta):
+        setattr(instance, meta_field(sender), extract(field_file))
+
+
+# --- Backfill (manage.py backfill_image_meta) ---
+def _init_worker():
+    # Forked workers only read media; they must not share the parent's database sockets.
+    connections.close_all()
+
+
+def _extract_rows(model, rows):
+    field = IMAGE_FIELDS[model]
+    results = []
+    for pk, name in rows:
+        instance = model(pk=pk, **{field: name})
+        results.append((pk, extract(getattr(instance, field))))
+    return results
+
+
+def backfill(model, workers=1, chunk_size=100, force=False, stdout=None):
+    """Store metadata for every ``model`` image missing it (all of them with ``force``). Returns rows updated."""
+    from . import changes
+    from .models import ChangeLogEntry
+
+    field, meta_name = IMAGE_FIELDS[model], meta_field(model)
+    rows = [
+        (pk, name) for pk, name, meta in
+        model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+        .order_by('pk').values_list('pk', field, meta_name).iterator(chunk_size=2000)
+        if force or is_stale(name, meta)
+    ]
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    source = changes.SOURCES_BY_MODEL.get(model)
+
+    def store(results):
+        # update() skips the save() side effects; visible rows are logged for delta sync instead.
+        for pk, meta in results:
+            model._default_manager.filter(pk=pk).update(**{meta_name: meta})
+        if source is not None:
+            visible = source.queryset().filter(pk__in=[pk for pk, _ in results]).values_list('pk', flat=True)
+            ChangeLogEntry.objects.bulk_create(
+                ChangeLogEntry(kind=source.kind, object_id=pk, action=ChangeLogEntry.UPSERT) for pk in visible
+            )
+
+    if workers > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for results in pool.map(_extract_rows, [model] * len(chunks), chunks):
+                store(results)
+    else:
+        for chunk in chunks:
+            store(_extract_rows(model, chunk))
+    if stdout is not None:
+        stdout.write(f"{model.__name__}.{field}: {len(rows)} images")
+    return len(rows)
@@ -0,0 +1,7 @@
+# core_api/links.py
+from django.conf import settings
+
+
+def frontend_url(kind, **params):
+    """Helper: public (frontend) URL for an object, from FRONTEND_URL and FRONTEND_PATHS."""
+    return settings.FRONTEND_URL.rstrip('/') + settings.FRONTEND_PATHS[kind].format(**params)
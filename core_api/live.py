@@ -0,0 +1,182 @@
+# core_api/live.py
+"""
+Server-sent events for live homepage updates (``/api/live/``, ASGI only).
+
+One Broadcaster per worker process polls the change log (core_api/changes.py)
+every LIVE_POLL_SECONDS while anyone is subscribed, formats each entry once
+and fans it out to every open stream through small per-connection queues, so
+thousands of idle connections cost one coroutine and one queue each and the
+database sees one query per interval per worker.
+
+Event ids are change-log positions: a client reconnecting with
+``Last-Event-ID`` first receives what it missed from the log, then live
+events. A client too far behind (or too slow to drain its queue) gets an
+``event: reset`` and should refetch before listening again.
+
+A failed poll is retried with exponential backoff (up to
+LIVE_ERROR_BACKOFF_MAX) from the same position, so nothing is skipped. If
+the broadcaster stops for any other reason, every open stream gets a reset.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+
+from . import changes
+
+logger = logging.getLogger(__name__)
+KINDS = ['impact-stat', 'blogpost', 'event', 'transformation-story']
+RESET = object()
+
+
+def format_event(pk, kind, object_id, action):
+    data = json.dumps({'kind': kind, 'id': object_id, 'action': action}, separators=(',', ':'))
+    return f"id: {changes.encode_token(pk)}\nevent: change\ndata: {data}\n\n".encode()
+
+
+def reset_event():
+    return b"event: reset\ndata: {}\n\n"
+
+
+def _fetch(position, limit):
+    close_old_connections()  # Polls run outside the request cycle
+    return changes.entries_after(position, limit, KINDS)
+
+
+def _settled_position():
+    close_old_connections()
+    return changes.settled_entries(KINDS).aggregate(position=Max('pk'))['position'] or 0
+
+
+def _backlog(position):
+    """(entries, reset) for a client resuming after ``position``."""
+    close_old_connections()
+    if position < changes.horizon():
+        return [], True
+    limit = settings.LIVE_BACKLOG_LIMIT
+    entries = changes.entries_after(position, limit + 1, KINDS)
+    if len(entries) > limit:
+        return [], True
+    return entries, False
+
+
+class Subscription:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+
+
+class Broadcaster:
+    """Per-process fan-out of change-log entries to open event streams."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        subscription = Subscription()
+        self.subscribers.add(subscription)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, pk, payload):
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait((pk, payload))
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and tell it to resync.
+                self.reset(subscription, pk)
+
+    def reset(self, subscription, pk=0):
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait((pk, RESET))
+
+    async def run(self):
+        try:
+            await self.poll()
+        except Exception:
+            logger.exception("Live update broadcaster stopped")
+        finally:
+            # Streams left behind would otherwise wait on queues nothing fills any more.
+            for subscription in list(self.subscribers):
+                self.reset(subscription)
+
+    async def poll(self):
+        # Starts from "now" whenever the first subscriber arrives; resuming
+        # clients catch up from the log themselves (see _backlog).
+        position, failures = None, 0
+        while self.subscribers:
+            try:
+                if position is None:
+                    position = await sync_to_async(_settled_position)()
+                else:
+                    entries = await sync_to_async(_fetch)(position, settings.LIVE_POLL_LIMIT)
+                    for entry in entries:
+                        position = entry[0]
+                        self.publish(position, format_event(*entry))
+                failures = 0
+            except DatabaseError:
+                failures += 1
+                logger.warning("Live update poll failed (%d in a row)", failures, exc_info=True)
+                await sync_to_async(close_old_connections)()  # Drops the broken connection
+            await asyncio.sleep(min(settings.LIVE_POLL_SECONDS * 2 ** failures, settings.LIVE_ERROR_BACKOFF_MAX))
+
+
+broadcaster = Broadcaster()
+
+
+async def event_stream(position):
+    subscription = broadcaster.subscribe()
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n".encode()
+        if position is not None:
+            entries, reset = await sync_to_async(_backlog)(position)
+            if reset:
+                yield reset_event()
+            for entry in entries:
+                position = entry[0]
+                yield format_event(*entry)
+        while True:
+            try:
+                pk, payload = await asyncio.wait_for(subscription.queue.get(), settings.LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"  # Keeps proxies from timing out idle connections
+                continue
+            if payload is RESET:
+                yield reset_event()
+                return
+            if position is not None and pk <= position:
+                continue  # Already sent from the backlog
+            yield payload
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def live_stream(request):
+    """``/api/live/``: change notifications for the homepage as text/event-stream."""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django drains async streams into a list before sending, so this
+        # endless stream would hold a sync worker until it is killed.
+        return HttpResponse("Live updates need the ASGI server.", status=501, content_type='text/plain')
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    position = None
+    if last_event_id:
+        try:
+            position = changes.decode_token(last_event_id)
+        except (ValueError, UnicodeDecodeError):
+            return HttpResponseBadRequest("Invalid Last-Event-ID.")
+    response = StreamingHttpResponse(event_stream(position), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
@@ -0,0 +1,38 @@
+# core_api/management/commands/archive_submissions.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core_api import retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Move form submissions older than SUBMISSION_RETENTION_DAYS into ArchivedSubmission, "
+        "in small batches with one short transaction each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kinds', nargs='*', help=f"Policies to apply (default: all of {', '.join(retention.POLICIES)}).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches per policy.")
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help="Seconds to sleep between batches (lets replicas and other writers keep up).")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows would be archived.")
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or list(retention.POLICIES)
+        unknown = [kind for kind in kinds if kind not in retention.POLICIES]
+        if unknown:
+            raise CommandError(f"Unknown policy: {', '.join(unknown)}")
+        for kind in kinds:
+            policy = retention.POLICIES[kind]
+            if policy.days is None:
+                self.stdout.write(f"{kind}: no retention configured, skipped")
+                continue
+            if options['dry_run']:
+                self.stdout.write(f"{kind}: {policy.expired().count()} rows older than {policy.days} days")
+                continue
+            total = retention.archive(
+                policy, batch_size=options['batch_size'], max_batches=options['max_batches'],
+                pause=options['pause'], stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+            self.stdout.write(self.style.SUCCESS(f"{kind}: archived {total} rows"))
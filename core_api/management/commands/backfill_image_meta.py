@@ -0,0 +1,32 @@
+# core_api/management/commands/backfill_image_meta.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core_api import imagemeta
+
+MODELS = {model.__name__.lower(): model for model in imagemeta.IMAGE_FIELDS}
+
+
+class Command(BaseCommand):
+    help = (
+        "Store dimensions, size, MIME type and placeholder (core_api/imagemeta.py) for images "
+        "uploaded before metadata was recorded, reading files across worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f"Default: all of {', '.join(MODELS)}.")
+        parser.add_argument('--workers', type=int, default=1, help="Worker processes reading images.")
+        parser.add_argument('--chunk-size', type=int, default=100)
+        parser.add_argument('--force', action='store_true', help="Re-read images that already have metadata.")
+
+    def handle(self, *args, **options):
+        names = options['models'] or list(MODELS)
+        unknown = [name for name in names if name not in MODELS]
+        if unknown:
+            raise CommandError(f"Unknown model: {', '.join(unknown)}")
+        total = 0
+        for name in names:
+            total += imagemeta.backfill(
+                MODELS[name], workers=options['workers'], chunk_size=options['chunk_size'],
+                force=options['force'], stdout=self.stdout,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Stored metadata for {total} images."))
@@ -0,0 +1,39 @@
+# core_api/management/commands/backfill_rollups.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core_api import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily stats rollups (core_api/rollups.py) from the submission tables and "
+        "ArchivedSubmission, one window of days per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('metrics', nargs='*', help=f"Default: all of {', '.join(rollups.SOURCES)}.")
+        parser.add_argument('--start', type=date.fromisoformat, help="First day (YYYY-MM-DD); default: earliest row.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day (YYYY-MM-DD); default: today.")
+        parser.add_argument('--window-days', type=int, default=31)
+
+    def handle(self, *args, **options):
+        metrics = options['metrics'] or list(rollups.SOURCES)
+        unknown = [metric for metric in metrics if metric not in rollups.SOURCES]
+        if unknown:
+            raise CommandError(f"Unknown metric: {', '.join(unknown)}")
+        for metric in metrics:
+            source = rollups.SOURCES[metric]
+            bounds = rollups.date_range(source)
+            if bounds is None and not options['start']:
+                self.stdout.write(f"{metric}: no submissions")
+                continue
+            start = options['start'] or bounds[0]
+            end = options['end'] or timezone.localdate()
+            written = rollups.backfill(
+                source, start, end, options['window_days'],
+                stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+            self.stdout.write(self.style.SUCCESS(f"{metric}: {written} rollup rows for {start}..{end}"))
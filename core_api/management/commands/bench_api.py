@@ -0,0 +1,214 @@
+# core_api/management/commands/bench_api.py
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+
+from core_api import urls as api_urls
+from core_api.models import Category
+
+API_PREFIX = '/api/'
+SAMPLE_QUERIES = {
+    'search': '?q=dental',
+    'blogpost-list': '?search=fluoride',
+}
+
+
+def write_payloads():
+    """POST bodies for the create endpoints, unique per call where the model needs it."""
+    token = uuid.uuid4().hex[:12]
+    return {
+        'contact-message-create': {'name': 'Bench', 'email': 'bench@example.com', 'message': 'Benchmark message'},
+        'newsletter-subscribe': {'email': f'bench-{token}@example.com'},
+        'volunteer-application-create': {'name': 'Bench', 'email': 'bench@example.com', 'area_of_interest': 'Other'},
+        'partnership-inquiry-create': {
+            'organization_name': 'Bench Org', 'contact_person': 'Bench', 'email': 'bench@example.com',
+            'partnership_type': 'Other',
+        },
+    }
+
+
+def discover_routes():
+    """
+    (name, method, path) for every route in core_api/urls.py: router list and
+    detail routes (with a real lookup value), their extra actions, and the
+    plain paths with sample values for their converters.
+    """
+    routes = []
+    category = Category.objects.order_by('pk').first()
+    for prefix, viewset, basename in api_urls.router.registry:
+        routes.append((f'{basename}-list', 'GET', f'{API_PREFIX}{prefix}/'))
+        lookup_field = getattr(viewset, 'lookup_field', 'pk')
+        obj = viewset.queryset.model.objects.filter(pk__in=viewset.queryset.values('pk')).order_by('pk').first()
+        if obj is None:
+            continue
+        lookup = getattr(obj, lookup_field)
+        routes.append((f'{basename}-detail', 'GET', f'{API_PREFIX}{prefix}/{lookup}/'))
+        for action in viewset.get_extra_actions():
+            if action.detail:
+                routes.append((f'{basename}-{action.url_name}', 'GET', f'{API_PREFIX}{prefix}/{lookup}/{action.url_path}/'))
+            else:
+                routes.append((f'{basename}-{action.url_name}', 'GET', f'{API_PREFIX}{prefix}/{action.url_path}/'))
+
+    samples = {'fmt': 'rss', 'category': category.slug if category else 'news', 'section': 'blog', 'chunk': 0}
+    payloads = write_payloads()
+    for pattern in api_urls.urlpatterns:
+        if isinstance(pattern, URLResolver) or not isinstance(pattern, URLPattern):
+            continue
+        route = str(pattern.pattern)
+        for name, value in samples.items():
+            for converter in ('str', 'slug', 'int'):
+                route = route.replace(f'<{converter}:{name}>', str(value))
+        if '<' in route:
+            continue
+        method = 'POST' if pattern.name in payloads else 'GET'
+        routes.append((pattern.name, method, f'{API_PREFIX}{route}'))
+    return [(name, method, path + SAMPLE_QUERIES.get(name, '')) for name, method, path in routes]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed, queries=None, errors=0):
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+    }
+    if queries is not None:
+        summary['queries_per_request'] = round(statistics.fmean(queries), 2)
+    return summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every core_api route in-process (latency percentiles, throughput, SQL query counts) "
+        "or over HTTP with concurrent clients (--url). Results can be saved and compared for regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--url', help="Base URL of a running server; enables HTTP mode.")
+        parser.add_argument('--concurrency', type=int, default=8, help="HTTP clients in HTTP mode.")
+        parser.add_argument('--writes', action='store_true', help="Also POST to the form endpoints.")
+        parser.add_argument('--only', help="Comma separated route names to run.")
+        parser.add_argument('--output', help="Write results as JSON to this file.")
+        parser.add_argument('--compare', help="Previous results JSON to compare against.")
+        parser.add_argument('--threshold', type=float, default=1.2,
+                            help="Flag endpoints whose p95 grew by more than this factor.")
+
+    def handle(self, *args, **options):
+        routes = discover_routes()
+        if not options['writes']:
+            routes = [route for route in routes if route[1] == 'GET']
+        if options['only']:
+            wanted = set(options['only'].split(','))
+            routes = [route for route in routes if route[0] in wanted]
+        if not routes:
+            raise CommandError("No routes to benchmark (seed data first with seed_demo_data).")
+
+        mode = 'http' if options['url'] else 'in-process'
+        results = {'mode': mode, 'requests_per_endpoint': options['requests'], 'endpoints': {}}
+        for name, method, path in routes:
+            if mode == 'http':
+                summary = self.run_http(options['url'].rstrip('/'), method, path, name, options)
+            else:
+                summary = self.run_in_process(method, path, name, options)
+            summary.update(method=method, path=path)
+            results['endpoints'][name] = summary
+            queries = summary.get('queries_per_request', '-')
+            self.stdout.write(
+                f"{name:<34} {summary['throughput_rps']:>9} rps  p50 {summary['p50_ms']:>8} ms  "
+                f"p95 {summary['p95_ms']:>8} ms  p99 {summary['p99_ms']:>8} ms  queries {queries}"
+                + (f"  errors {summary['errors']}" if summary['errors'] else '')
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options['compare'] and self.compare(results, options['compare'], options['threshold']):
+            raise CommandError("Latency regressions detected.")
+
+    def run_in_process(self, method, path, name, options):
+        client = Client()
+
+        def call():
+            if method == 'POST':
+                return client.post(path, write_payloads()[name], content_type='application/json')
+            return client.get(path)
+
+        # Writes are rolled back so repeated runs see the same data.
+        with transaction.atomic():
+            for _ in range(options['warmup']):
+                call()
+            latencies, queries, errors = [], [], 0
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    t0 = time.perf_counter()
+                    response = call()
+                    latencies.append(time.perf_counter() - t0)
+                queries.append(len(captured))
+                errors += response.status_code >= 400
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return summarize(latencies, elapsed, queries, errors)
+
+    def run_http(self, base_url, method, path, name, options):
+        def call(_):
+            data = json.dumps(write_payloads()[name]).encode() if method == 'POST' else None
+            request = Request(base_url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+            t0 = time.perf_counter()
+            try:
+                with urlopen(request, timeout=30) as response:
+                    response.read()
+                    failed = False
+            except HTTPError as exc:
+                exc.read()
+                failed = True
+            return time.perf_counter() - t0, failed
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(call, range(options['warmup'])))
+            started = time.perf_counter()
+            outcomes = list(pool.map(call, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+        return summarize([latency for latency, _ in outcomes], elapsed, errors=sum(failed for _, failed in outcomes))
+
+    def compare(self, results, path, threshold):
+        with open(path) as fh:
+            baseline = json.load(fh)['endpoints']
+        regressed = False
+        self.stdout.write(f"\nCompared with {path} (p95):")
+        for name, current in results['endpoints'].items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            ratio = current['p95_ms'] / previous['p95_ms'] if previous['p95_ms'] else 1.0
+            flag = ''
+            if ratio > threshold:
+                regressed = True
+                flag = '  REGRESSION'
+            extra = ''
+            if 'queries_per_request' in current and 'queries_per_request' in previous:
+                extra = f"  queries {previous['queries_per_request']} -> {current['queries_per_request']}"
+            self.stdout.write(f"{name:<34} {previous['p95_ms']:>8} -> {current['p95_ms']:>8} ms (x{ratio:.2f}){extra}{flag}")
+        return regressed
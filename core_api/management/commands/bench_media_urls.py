@@ -0,0 +1,65 @@
+# core_api/management/commands/bench_media_urls.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core_api.models import GalleryItem
+from core_api.serializers import GalleryItemSerializer
+
+
+def legacy_absolute_url_for_field(instance, field_name, request):
+    """The pre-cache implementation: storage.url() + build_absolute_uri() per call."""
+    f = getattr(instance, field_name, None)
+    if not f:
+        return None
+    try:
+        url = f.url
+    except ValueError:
+        return None
+    return request.build_absolute_uri(url)
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark media URL building for a gallery list (no database access)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        items = [
+            GalleryItem(
+                pk=i, title=f"Item {i}",
+                image=f"gallery_images/photo_{i}.jpg",
+                video=f"gallery_videos/clip_{i}.mp4",
+            )
+            for i in range(rows)
+        ]
+        request = RequestFactory().get('/api/gallery-items/', HTTP_HOST='api.example.org')
+
+        def legacy():
+            for item in items:
+                legacy_absolute_url_for_field(item, 'image', request)
+                legacy_absolute_url_for_field(item, 'video', request)
+
+        def cached():
+            serializer = GalleryItemSerializer(context={'request': request})
+            for item in items:
+                serializer.get_image_url(item)
+                serializer.get_video_url(item)
+
+        def full_list():
+            GalleryItemSerializer(items, many=True, context={'request': request}).data
+
+        for label, fn in (('legacy url fields', legacy), ('cached url fields', cached), ('full serializer', full_list)):
+            best = min(self._time(fn) for _ in range(options['repeat']))
+            self.stdout.write(
+                f"{label:<20} {best * 1000:9.1f} ms total  {best / rows * 1e6:7.2f} us/row"
+            )
+
+    def _time(self, fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
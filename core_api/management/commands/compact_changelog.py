@@ -0,0 +1,23 @@
+# core_api/management/commands/compact_changelog.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core_api import changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the delta-sync change log: keep only the newest entry per object and purge "
+        "tombstones older than CHANGELOG_TOMBSTONE_DAYS. Meant to run periodically, e.g. daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tombstone-days', type=float, default=settings.CHANGELOG_TOMBSTONE_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500, help="Objects compacted per transaction.")
+
+    def handle(self, *args, **options):
+        superseded, purged = changes.compact(options['tombstone_days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {superseded} superseded entries and {purged} expired tombstones "
+            f"(tokens before position {changes.horizon()} must now resync)."
+        ))
@@ -0,0 +1,35 @@
+# core_api/management/commands/extract_resource_text.py
+from django.core.management.base import BaseCommand
+
+from core_api import documents
+from core_api.models import Resource
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract searchable text from pending Resource files (core_api/documents.py), each in a child "
+        "process with a time and memory limit. Run with --loop as a long-lived worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling for newly uploaded files.")
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument(
+            '--retry-failed', action='store_true', help="Queue files that failed or were skipped again first.",
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = Resource.objects.filter(
+                text_status__in=[Resource.TEXT_FAILED, Resource.TEXT_SKIPPED],
+            ).update(text_status=Resource.TEXT_PENDING)
+            self.stdout.write(f"Queued {requeued} resources again.")
+        if options['loop']:
+            documents.loop(options['batch_size'], stdout=self.stdout)
+        total = 0
+        while True:
+            count = documents.run(options['batch_size'], stdout=self.stdout)
+            if not count:
+                break
+            total += count
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} resources."))
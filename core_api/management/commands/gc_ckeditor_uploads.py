@@ -0,0 +1,162 @@
+# core_api/management/commands/gc_ckeditor_uploads.py
+import os
+import re
+import shutil
+import time
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ckeditor_uploader.utils import get_thumb_filename
+
+from core_api.models import BlogPost, MediaBlob
+
+URL_ATTRIBUTE = re.compile(r'''(?:src|href)\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Quarantine (or delete) CKEditor uploads that no BlogPost.content references. "
+        "Walks the upload directory incrementally and resumes where the last run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=float, default=settings.CKEDITOR_UPLOAD_GC_GRACE_DAYS,
+                            help="Leave files modified more recently than this alone.")
+        parser.add_argument('--delete', action='store_true',
+                            help="Delete orphans instead of moving them to the quarantine directory.")
+        parser.add_argument('--quarantine-dir', default=os.path.join(settings.MEDIA_ROOT, 'uploads_quarantine'))
+        parser.add_argument('--max-files', type=int, default=0,
+                            help="Stop after examining this many files (0 = no limit); the next run resumes.")
+        parser.add_argument('--purge-quarantine', action='store_true',
+                            help="Also delete quarantined files older than the grace period.")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        upload_root = os.path.join(settings.MEDIA_ROOT, settings.CKEDITOR_UPLOAD_PATH)
+        quarantine_dir = options['quarantine_dir']
+        checkpoint_path = os.path.join(quarantine_dir, '.gc-checkpoint')
+        cutoff = time.time() - options['grace_days'] * 86400
+        dry_run = options['dry_run']
+
+        referenced = self.referenced_uploads()
+        self.stdout.write(f"{len(referenced)} upload paths referenced by blog posts.")
+
+        checkpoint = self.read_checkpoint(checkpoint_path)
+        examined = orphaned = 0
+        last = None
+        finished = True
+        for rel_path, entry in self.walk(upload_root, checkpoint):
+            if options['max_files'] and examined >= options['max_files']:
+                finished = False
+                break
+            examined += 1
+            last = rel_path
+            name = f"{settings.CKEDITOR_UPLOAD_PATH.rstrip('/')}/{rel_path}"
+            if self.original_of(entry.path) is not None or not os.path.exists(entry.path):
+                continue  # A thumbnail goes (or stays, or already went) with its original
+            if name in referenced or entry.stat().st_mtime > cutoff:
+                continue
+            orphaned += 1
+            if dry_run:
+                self.stdout.write(f"would remove {name}")
+                continue
+            self.remove(upload_root, rel_path, quarantine_dir, options['delete'])
+            if os.path.exists(get_thumb_filename(entry.path)):
+                self.remove(upload_root, get_thumb_filename(rel_path), quarantine_dir, options['delete'])
+
+        if not dry_run:
+            os.makedirs(quarantine_dir, exist_ok=True)
+            if finished:
+                if os.path.exists(checkpoint_path):
+                    os.unlink(checkpoint_path)
+            elif last is not None:
+                with open(checkpoint_path, 'w') as fh:
+                    fh.write(last)
+            if options['purge_quarantine']:
+                self.purge(quarantine_dir, cutoff)
+
+        action = 'deleted' if options['delete'] else 'quarantined'
+        state = 'complete' if finished else 'partial, will resume'
+        self.stdout.write(self.style.SUCCESS(
+            f"Examined {examined} files, {action if not dry_run else 'found'} {orphaned} orphans ({state})."
+        ))
+
+    def referenced_uploads(self):
+        """Stream every post body and collect the upload names it points at."""
+        marker = settings.MEDIA_URL + settings.CKEDITOR_UPLOAD_PATH
+        referenced = set()
+        contents = BlogPost.objects.order_by().values_list('content', flat=True)
+        for content in contents.iterator(chunk_size=200):
+            if not content or marker not in content:
+                continue
+            for url in URL_ATTRIBUTE.findall(content):
+                index = url.find(marker)
+                if index == -1:
+                    continue
+                name = unquote(url[index + len(settings.MEDIA_URL):].split('?', 1)[0].split('#', 1)[0])
+                referenced.add(name)
+                referenced.add(get_thumb_filename(name))
+        return referenced
+
+    def remove(self, upload_root, rel_path, quarantine_dir, delete):
+        path = os.path.join(upload_root, rel_path)
+        if delete:
+            os.unlink(path)
+        else:
+            target = os.path.join(quarantine_dir, rel_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(path, target)
+            # Quarantine age (for --purge-quarantine) starts now.
+            os.utime(target)
+        MediaBlob.objects.filter(name=f"{settings.CKEDITOR_UPLOAD_PATH.rstrip('/')}/{rel_path}").delete()
+
+    def original_of(self, path):
+        """Path of the image ``path`` is the ``_thumb`` of, if that image still exists."""
+        stem, ext = os.path.splitext(path)
+        if not stem.endswith('_thumb'):
+            return None
+        original = stem[:-len('_thumb')] + ext
+        return original if os.path.exists(original) else None
+
+    def walk(self, root, checkpoint):
+        """
+        Yield (relative path, DirEntry) for every file under ``root`` in sorted
+        depth-first order, skipping everything at or before ``checkpoint``.
+        Only one directory listing is held in memory per level.
+        """
+        start = tuple(checkpoint.split('/')) if checkpoint else ()
+        yield from self._walk(root, (), start)
+
+    def _walk(self, path, parts, start):
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            entry_parts = parts + (entry.name,)
+            if entry.is_dir(follow_symlinks=False):
+                # Skip subtrees that sort entirely before the checkpoint.
+                if start and entry_parts < start[:len(entry_parts)]:
+                    continue
+                yield from self._walk(entry.path, entry_parts, start)
+            elif entry.is_file(follow_symlinks=False):
+                if (start and entry_parts <= start) or entry.name.startswith('.upload-'):
+                    continue
+                yield '/'.join(entry_parts), entry
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def purge(self, quarantine_dir, cutoff):
+        for dirpath, _, filenames in os.walk(quarantine_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename != '.gc-checkpoint' and os.stat(path).st_mtime < cutoff:
+                    os.unlink(path)
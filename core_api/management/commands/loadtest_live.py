@@ -0,0 +1,159 @@
+# core_api/management/commands/loadtest_live.py
+import asyncio
+import json
+import resource
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+
+from core_api.management.commands.bench_api import percentile
+from core_api.models import ImpactStat
+
+LIVE_PATH = '/api/live/'
+
+
+class SSEParser:
+    """Incremental text/event-stream parser that records change events as they arrive."""
+
+    def __init__(self, on_event):
+        self.buffer = b''
+        self.on_event = on_event
+        self.connected = asyncio.Event()
+
+    def feed(self, chunk):
+        self.connected.set()
+        self.buffer += chunk
+        while b'\n\n' in self.buffer:
+            block, self.buffer = self.buffer.split(b'\n\n', 1)
+            for line in block.split(b'\n'):
+                # Over HTTP/1.1 chunk-size lines are interleaved; anything else is ignored.
+                if line.startswith(b'data: {'):
+                    self.on_event(json.loads(line[len(b'data: '):]))
+
+
+async def asgi_subscriber(app, parser, stop):
+    """Open the stream directly against the ASGI application (no server needed)."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': LIVE_PATH, 'raw_path': LIVE_PATH.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'accept', b'text/event-stream')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await stop.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            parser.feed(message.get('body', b''))
+
+    await app(scope, receive, send)
+
+
+async def http_subscriber(url, parser, stop):
+    """Open the stream over a real TCP connection to a running ASGI server."""
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(
+        f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    try:
+        while not stop.is_set():
+            reader_task = asyncio.ensure_future(reader.read(65536))
+            stop_task = asyncio.ensure_future(stop.wait())
+            done, _ = await asyncio.wait({reader_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            if reader_task not in done:
+                reader_task.cancel()
+                break
+            stop_task.cancel()
+            chunk = reader_task.result()
+            if not chunk:
+                break
+            parser.feed(chunk)
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many concurrent /api/live/ subscribers, publish ImpactStat changes and report connection "
+        "cost and delivery latency. Runs against the ASGI application in-process, or a server with --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=1000)
+        parser.add_argument('--writes', type=int, default=5, help="Changes to publish while subscribers listen.")
+        parser.add_argument('--interval', type=float, default=0.5, help="Seconds between writes.")
+        parser.add_argument('--timeout', type=float, default=15.0, help="Seconds to wait for deliveries.")
+        parser.add_argument('--url', help=f"Stream URL of a running server, e.g. http://127.0.0.1:8000{LIVE_PATH}")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        count, writes = options['subscribers'], options['writes']
+        app = None if options['url'] else get_asgi_application()
+        stop = asyncio.Event()
+        written = {}  # ImpactStat id -> time written
+        latencies = []
+
+        def on_event(event):
+            if event.get('kind') == 'impact-stat' and event['id'] in written:
+                latencies.append(time.perf_counter() - written[event['id']])
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        parsers = [SSEParser(on_event) for _ in range(count)]
+        started = time.perf_counter()
+        if app:
+            tasks = [asyncio.create_task(asgi_subscriber(app, parser, stop)) for parser in parsers]
+        else:
+            tasks = [asyncio.create_task(http_subscriber(options['url'], parser, stop)) for parser in parsers]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(parser.connected.wait() for parser in parsers)), options['timeout'])
+        except asyncio.TimeoutError:
+            stop.set()
+            connected = sum(parser.connected.is_set() for parser in parsers)
+            raise CommandError(f"Only {connected}/{count} subscribers connected within {options['timeout']}s.")
+        connect_seconds = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(
+            f"{count} subscribers connected in {connect_seconds:.2f}s "
+            f"(~{(rss_after - rss_before) / count:.1f} KiB peak RSS per connection in this process)"
+        )
+
+        create = sync_to_async(lambda n: ImpactStat.objects.create(title=f"Load test {n}", value=str(n)))
+        created = []
+        try:
+            for n in range(writes):
+                stat = await create(n)
+                written[stat.pk] = time.perf_counter()
+                created.append(stat.pk)
+                await asyncio.sleep(options['interval'])
+            deadline = time.perf_counter() + options['timeout']
+            while len(latencies) < count * writes and time.perf_counter() < deadline:
+                await asyncio.sleep(0.1)
+        finally:
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await sync_to_async(lambda: ImpactStat.objects.filter(pk__in=created).delete())()
+
+        expected = count * writes
+        self.stdout.write(f"Delivered {len(latencies)}/{expected} events")
+        if latencies:
+            self.stdout.write(
+                f"Delivery latency p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+                f"p95 {percentile(latencies, 95) * 1000:.0f} ms, max {max(latencies) * 1000:.0f} ms "
+                "(includes LIVE_POLL_SECONDS and CHANGES_SETTLE_SECONDS)"
+            )
+        if len(latencies) < expected:
+            raise CommandError("Some events were not delivered before the timeout.")
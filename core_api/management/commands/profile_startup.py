@@ -0,0 +1,61 @@
+# core_api/management/commands/profile_startup.py
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from core_api.startup import HEAVY_MODULES, measure_boot
+
+
+class Command(BaseCommand):
+    help = "Profile worker boot: wall time, peak RSS and an import-time breakdown by module and package."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help="Boot this many times and report the fastest.")
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--no-admin', action='store_true', help="Boot with DJANGO_ADMIN_ENABLED=False.")
+        parser.add_argument('--json', action='store_true', help="Print the measurements as JSON.")
+
+    def handle(self, *args, **options):
+        env = {'DJANGO_ADMIN_ENABLED': 'False'} if options['no_admin'] else None
+        runs = [measure_boot(importtime=True, env=env) for _ in range(max(1, options['runs']))]
+        best = min(runs, key=lambda run: run['import_us'])
+        top = options['top']
+
+        by_package = defaultdict(int)
+        for row in best['imports']:
+            by_package[row.module.split('.')[0]] += row.self_us
+        packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        modules = sorted(best['imports'], key=lambda row: row.cumulative_us, reverse=True)[:top]
+        heavy = [name for name in HEAVY_MODULES if name in best['modules']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'seconds': best['seconds'],
+                'import_ms': best['import_us'] / 1000,
+                'maxrss_kb': best['maxrss_kb'],
+                'module_count': len(best['modules']),
+                'heavy_modules': heavy,
+                'packages': [{'package': name, 'self_ms': us / 1000} for name, us in packages],
+                'modules': [
+                    {'module': row.module, 'self_ms': row.self_us / 1000, 'cumulative_ms': row.cumulative_us / 1000}
+                    for row in modules
+                ],
+            }, indent=2))
+            return
+
+        self.stdout.write(
+            f"Boot: {best['seconds'] * 1000:.0f} ms wall, {best['import_us'] / 1000:.0f} ms importing, "
+            f"{best['maxrss_kb'] / 1024:.1f} MiB peak RSS, {len(best['modules'])} modules "
+            f"(best of {len(runs)})"
+        )
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"Heavy modules loaded at boot: {', '.join(heavy)}"))
+
+        self.stdout.write(f"\n{'package':<30} {'self ms':>9}")
+        for name, us in packages:
+            self.stdout.write(f"{name:<30} {us / 1000:>9.1f}")
+
+        self.stdout.write(f"\n{'module':<50} {'self ms':>9} {'cumul ms':>9}")
+        for row in modules:
+            self.stdout.write(f"{row.module:<50} {row.self_us / 1000:>9.1f} {row.cumulative_us / 1000:>9.1f}")
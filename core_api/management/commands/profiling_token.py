@@ -0,0 +1,28 @@
+# core_api/management/commands/profiling_token.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core_api import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        "Print a signed X-Profile-Token for a superuser: requests sending it are profiled "
+        "(core_api/profiling.py) and listed under Request Profiles in the admin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        user = get_user_model()._default_manager.filter(
+            **{get_user_model().USERNAME_FIELD: options['username']}
+        ).first()
+        if user is None or not user.is_superuser or not user.is_active:
+            raise CommandError(f"No active superuser {options['username']!r}.")
+        self.stdout.write(profiling.make_token(user))
+        self.stderr.write(
+            f"Valid for {settings.PROFILING_TOKEN_MAX_AGE // 3600} hours, e.g. "
+            f"curl -H 'X-Profile-Token: ...' https://.../api/gallery-items/"
+        )
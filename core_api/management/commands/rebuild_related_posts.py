@@ -0,0 +1,15 @@
+# core_api/management/commands/rebuild_related_posts.py
+from django.core.management.base import BaseCommand
+
+from core_api import related
+
+
+class Command(BaseCommand):
+    help = "Rebuild the related-posts index for every active blog post."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Worker processes used to score posts.")
+        parser.add_argument('--chunk-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        related.rebuild(workers=options['workers'], chunk_size=options['chunk_size'], stdout=self.stdout)
@@ -0,0 +1,14 @@
+# core_api/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from core_api import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the shared search index from the public content tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        search.rebuild(batch_size=options['batch_size'], stdout=self.stdout)
@@ -0,0 +1,27 @@
+# core_api/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core_api import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the incrementally maintained counters (inbox counts and ImpactStat metrics, "
+        "core_api/counters.py) from their source tables and repair any drift. "
+        "Meant to run periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Counters to reconcile (default: all).")
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(counters.COUNTERS)
+        unknown = [name for name in names if name not in counters.COUNTERS]
+        if unknown:
+            raise CommandError(f"Unknown counter(s): {', '.join(unknown)}")
+        for name in names:
+            drift = counters.reconcile(name)
+            if drift:
+                self.stdout.write(self.style.WARNING(f"{name}: repaired drift of {drift:+d}"))
+            else:
+                self.stdout.write(f"{name}: ok")
@@ -0,0 +1,298 @@
+# core_api/management/commands/seed_demo_data.py
+import random
+import struct
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import slugify
+from django.utils import timezone
+
+from core_api import changes
+from core_api.models import (
+    BlogPost, Event, ContactMessage, NewsletterSubscriber, Resource,
+    VolunteerApplication, PartnershipInquiry, TeamMember, GalleryItem,
+    Category, ImpactStat, TransformationStory, ArchivedSubmission, DailyRollup
+)
+
+# Row counts at --scale 1.
+BASE_COUNTS = {
+    'categories': 12,
+    'posts': 2000,
+    'gallery': 5000,
+    'events': 500,
+    'team': 40,
+    'resources': 300,
+    'stories': 200,
+    'subscribers': 200000,
+    'contacts': 100000,
+    'volunteers': 50000,
+    'partnerships': 20000,
+}
+WORDS = """
+    dental oral health teeth gum enamel fluoride cavity clinic community outreach school children screening
+    hygiene brushing flossing plaque dentist volunteer village program treatment prevention education smile
+    care nutrition sugar water workshop training nurse hospital patient rural mobile free check family
+    """.split()
+CATEGORY_NAMES = [
+    'Oral Health', 'Community Outreach', 'Education', 'Events', 'Research', 'Volunteers', 'Partnerships',
+    'Prevention', 'Nutrition', 'Children', 'Stories', 'News',
+]
+PLACES = ['Accra', 'Kumasi', 'Tamale', 'Cape Coast', 'Ho', 'Takoradi', 'Sunyani', 'Bolgatanga']
+
+
+def tiny_png(rgb):
+    """A valid 1x1 PNG of one colour, built without Pillow."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    header = struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(b'\x00' + bytes(rgb))) + chunk(b'IEND', b'')
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk inserts set auto_now/auto_now_add fields to spread-out dates."""
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset for load testing (bulk inserts; then recounts counters, backfills rollups "
+        "and image metadata, logs the new content for delta sync and rebuilds the derived indexes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for the row counts in BASE_COUNTS.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--flush', action='store_true', help="Delete existing content and submissions first.")
+        parser.add_argument('--skip-indexes', action='store_true', help="Don't rebuild search/related indexes.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        counts = {name: max(1, int(count * options['scale'])) for name, count in BASE_COUNTS.items()}
+        if options['flush']:
+            # Signals still log tombstones for the deleted content (clients drop it) and adjust the counters,
+            # which are recounted below. Rollups keep deleted rows by design, so they go with the submissions.
+            for model in (BlogPost, GalleryItem, Event, TeamMember, Resource, TransformationStory, ImpactStat,
+                          NewsletterSubscriber, ContactMessage, VolunteerApplication, PartnershipInquiry, Category,
+                          ArchivedSubmission, DailyRollup):
+                model.objects.all().delete()
+
+        images = self.image_fixtures()
+        categories = self.seed_categories(counts['categories'])
+        self.seed_posts(counts['posts'], categories, images)
+        self.seed_gallery(counts['gallery'], categories, images)
+        self.seed_events(counts['events'], images)
+        self.seed_team(counts['team'], images)
+        self.seed_resources(counts['resources'])
+        self.seed_stories(counts['stories'], images)
+        self.seed_impact_stats()
+        self.seed_subscribers(counts['subscribers'])
+        self.seed_submissions(counts['contacts'], counts['volunteers'], counts['partnerships'])
+
+        # Bulk inserts skip model signals: rebuild what they would have maintained.
+        call_command('reconcile_counters', stdout=self.stdout)
+        call_command('backfill_rollups', stdout=self.stdout)
+        call_command('backfill_image_meta', stdout=self.stdout)
+        self.stdout.write(f"ChangeLogEntry: {changes.record_all(batch_size=self.batch_size)} upserts")
+        if not options['skip_indexes']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+            call_command('rebuild_related_posts', stdout=self.stdout)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS("Seeding complete."))
+
+    # --- helpers ---
+    def words(self, low, high):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def sentence(self):
+        return self.words(8, 20).capitalize() + '.'
+
+    def html_body(self):
+        parts = []
+        for _ in range(self.rng.randint(3, 8)):
+            kind = self.rng.random()
+            if kind < 0.15:
+                parts.append(f"<h2>{self.words(2, 6).title()}</h2>")
+            elif kind < 0.3:
+                items = ''.join(f"<li>{self.words(3, 9)}</li>" for _ in range(self.rng.randint(2, 5)))
+                parts.append(f"<ul>{items}</ul>")
+            else:
+                text = ' '.join(self.sentence() for _ in range(self.rng.randint(2, 6)))
+                parts.append(f"<p>{text} <strong>{self.words(1, 3)}</strong></p>")
+        return '\n'.join(parts)
+
+    def past(self, days):
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def bulk(self, model, rows):
+        batch, total = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        total += len(batch)
+        self.stdout.write(f"{model.__name__}: {total} rows")
+
+    def image_fixtures(self):
+        names = []
+        for i in range(8):
+            rgb = (self.rng.randrange(256), self.rng.randrange(256), self.rng.randrange(256))
+            names.append(default_storage.save(f'seed_images/fixture_{i}.png', ContentFile(tiny_png(rgb))))
+        return names
+
+    # --- content ---
+    def seed_categories(self, count):
+        existing = set(Category.objects.values_list('name', flat=True))
+        names = [name for name in CATEGORY_NAMES + [f"Topic {i}" for i in range(count)] if name not in existing][:count]
+        Category.objects.bulk_create(Category(name=name, slug=slugify(name)) for name in names)
+        return list(Category.objects.all())
+
+    def seed_posts(self, count, categories, images):
+        fields = [BlogPost._meta.get_field('published_date'), BlogPost._meta.get_field('updated_date')]
+        offset = BlogPost.objects.count()
+
+        def rows():
+            for i in range(count):
+                title = self.words(3, 8).title()
+                published = self.past(1500)
+                yield BlogPost(
+                    title=title, slug=f"{slugify(title)[:180]}-{offset + i}", content=self.html_body(),
+                    excerpt=self.sentence(), author=self.rng.choice(['Dr. Mensah', 'Ama Owusu', 'Kofi Boateng']),
+                    published_date=published, updated_date=published + timedelta(days=self.rng.randint(0, 30)),
+                    image=self.rng.choice(images) if self.rng.random() < 0.7 else None,
+                    is_active=self.rng.random() < 0.95, category=self.rng.choice(categories),
+                )
+        with explicit_timestamps(*fields):
+            self.bulk(BlogPost, rows())
+
+    def seed_gallery(self, count, categories, images):
+        self.bulk(GalleryItem, (
+            GalleryItem(
+                title=self.words(2, 6).title(), description=self.sentence(), image=self.rng.choice(images),
+                upload_date=self.past(1500), category=self.rng.choice(categories),
+                is_published=self.rng.random() < 0.9,
+            )
+            for _ in range(count)
+        ))
+
+    def seed_events(self, count, images):
+        fields = [Event._meta.get_field('created_at'), Event._meta.get_field('updated_at')]
+        offset = Event.objects.count()
+
+        def rows():
+            for i in range(count):
+                title = self.words(2, 6).title()
+                created = self.past(1000)
+                yield Event(
+                    title=title, slug=f"{slugify(title)[:180]}-{offset + i}", description=self.sentence(),
+                    event_date=created + timedelta(days=self.rng.randint(1, 120)), location=self.rng.choice(PLACES),
+                    image=self.rng.choice(images), is_active=self.rng.random() < 0.9,
+                    created_at=created, updated_at=created,
+                )
+        with explicit_timestamps(*fields):
+            self.bulk(Event, rows())
+
+    def seed_team(self, count, images):
+        self.bulk(TeamMember, (
+            TeamMember(
+                name=f"{self.words(1, 1).title()} {self.words(1, 1).title()}", role=self.words(1, 3).title(),
+                bio=self.sentence(), profile_picture=self.rng.choice(images), order=i,
+                email=f"member{i}@example.org",
+            )
+            for i in range(count)
+        ))
+
+    def seed_resources(self, count):
+        name = default_storage.save('resources/seed_resource.txt', ContentFile(self.sentence().encode()))
+        fields = [Resource._meta.get_field('uploaded_at')]
+
+        def rows():
+            for _ in range(count):
+                yield Resource(
+                    title=self.words(2, 6).title(), description=self.sentence(), file=name,
+                    uploaded_at=self.past(1500), is_public=self.rng.random() < 0.9,
+                )
+        with explicit_timestamps(*fields):
+            self.bulk(Resource, rows())
+
+    def seed_stories(self, count, images):
+        fields = [TransformationStory._meta.get_field('created_at')]
+
+        def rows():
+            for _ in range(count):
+                yield TransformationStory(
+                    name=self.words(1, 2).title(), location=self.rng.choice(PLACES),
+                    story=' '.join(self.sentence() for _ in range(5)), image=self.rng.choice(images),
+                    created_at=self.past(1500), is_published=self.rng.random() < 0.9,
+                )
+        with explicit_timestamps(*fields):
+            self.bulk(TransformationStory, rows())
+
+    def seed_impact_stats(self):
+        stats = [('Patients screened', '10,000+'), ('Schools visited', '120'), ('Volunteers', '450+'),
+                 ('Communities', '85'), ('Caries reduction', '35%')]
+        self.bulk(ImpactStat, (ImpactStat(title=title, value=value, order=i) for i, (title, value) in enumerate(stats)))
+
+    # --- submissions ---
+    def seed_subscribers(self, count):
+        fields = [NewsletterSubscriber._meta.get_field('subscribed_at')]
+        offset = NewsletterSubscriber.objects.count()
+
+        def rows():
+            for i in range(count):
+                yield NewsletterSubscriber(
+                    email=f"subscriber{offset + i}@example.com", subscribed_at=self.past(1500),
+                    is_active=self.rng.random() < 0.85,
+                )
+        with explicit_timestamps(*fields):
+            self.bulk(NewsletterSubscriber, rows())
+
+    def seed_submissions(self, contacts, volunteers, partnerships):
+        fields = [ContactMessage._meta.get_field('submitted_at')]
+        with explicit_timestamps(*fields):
+            self.bulk(ContactMessage, (
+                ContactMessage(
+                    name=self.words(2, 2).title(), email=f"contact{i}@example.com", subject=self.words(3, 6),
+                    message=self.sentence(), submitted_at=self.past(1500), is_read=self.rng.random() < 0.8,
+                )
+                for i in range(contacts)
+            ))
+        areas = [choice for choice, _ in VolunteerApplication._meta.get_field('area_of_interest').choices]
+        statuses = [choice for choice, _ in VolunteerApplication._meta.get_field('status').choices]
+        self.bulk(VolunteerApplication, (
+            VolunteerApplication(
+                name=self.words(2, 2).title(), email=f"volunteer{i}@example.com", phone='0200000000',
+                area_of_interest=self.rng.choice(areas), message=self.sentence(),
+                application_date=self.past(1500), status=self.rng.choice(statuses),
+            )
+            for i in range(volunteers)
+        ))
+        types = [choice for choice, _ in PartnershipInquiry._meta.get_field('partnership_type').choices]
+        statuses = [choice for choice, _ in PartnershipInquiry._meta.get_field('status').choices]
+        self.bulk(PartnershipInquiry, (
+            PartnershipInquiry(
+                organization_name=self.words(2, 4).title(), contact_person=self.words(2, 2).title(),
+                email=f"partner{i}@example.org", partnership_type=self.rng.choice(types),
+                message=self.sentence(), inquiry_date=self.past(1500), status=self.rng.choice(statuses),
+            )
+            for i in range(partnerships)
+        ))
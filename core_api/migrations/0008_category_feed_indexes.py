@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0007_impactstat_transformationstory_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['category', '-published_date', '-id'], name='blogpost_category_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='galleryitem',
+            index=models.Index(fields=['category', '-upload_date', '-id'], name='galleryitem_category_feed_idx'),
+        ),
+    ]
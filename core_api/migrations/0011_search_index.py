@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0010_related_posts_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('title_normalized', models.CharField(max_length=255)),
+                ('slug', models.CharField(blank=True, max_length=200)),
+                ('summary', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Search Entries',
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='searchentry_vector_idx'), models.Index(fields=['title_normalized'], name='searchentry_prefix_idx', opclasses=['varchar_pattern_ops']), django.contrib.postgres.indexes.GinIndex(fields=['title_normalized'], name='searchentry_trigram_idx', opclasses=['gin_trgm_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-submitted_at'], name='contactmessage_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partnershipinquiry',
+            index=models.Index(condition=models.Q(('status', 'New')), fields=['-inquiry_date'], name='partnership_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteerapplication',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['-application_date'], name='volunteer_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:23
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0012_inbox_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('original_id', models.BigIntegerField()),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('submitted_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'verbose_name': 'Archived Submission',
+                'verbose_name_plural': 'Archived Submissions',
+                'ordering': ['-submitted_at'],
+                'indexes': [models.Index(fields=['kind', '-submitted_at'], name='archive_kind_submitted_idx'), models.Index(fields=['email'], name='archive_email_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'original_id'), name='unique_archived_submission')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0014_changelog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='impactstat',
+            name='metric',
+            field=models.CharField(blank=True, choices=[('volunteers-accepted', 'Volunteers accepted'), ('volunteer-applications', 'Volunteer applications received'), ('events-held', 'Events held'), ('stories-published', 'Transformation stories published'), ('subscribers', 'Newsletter subscribers')], max_length=50),
+        ),
+        migrations.AddField(
+            model_name='impactstat',
+            name='metric_total',
+            field=models.CharField(blank=True, choices=[('volunteers-accepted', 'Volunteers accepted'), ('volunteer-applications', 'Volunteer applications received'), ('events-held', 'Events held'), ('stories-published', 'Transformation stories published'), ('subscribers', 'Newsletter subscribers')], help_text='Denominator for the percentage format.', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='impactstat',
+            name='value_format',
+            field=models.CharField(choices=[('number', 'Number (12,345)'), ('rounded', 'Rounded down with plus (12,000+)'), ('percent', 'Percentage of the total metric (85%)')], default='number', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='impactstat',
+            name='value',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
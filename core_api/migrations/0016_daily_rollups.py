@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0015_impactstat_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(blank=True, max_length=50)),
+                ('dimension_value', models.CharField(blank=True, max_length=100)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'dimension', 'day', 'dimension_value'), name='unique_daily_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:45
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0019_slow_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resource',
+            name='content_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='file_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='text_extracted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='text_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('done', 'Extracted'), ('failed', 'Failed (timeout, memory limit or unreadable)'), ('skipped', 'Skipped (unsupported type or too large)')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resource_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('text_status', 'pending')), fields=['uploaded_at'], name='resource_text_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_api', '0022_changelog_db_clock'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='counter',
+            options={'ordering': ['name', 'shard']},
+        ),
+        migrations.AddField(
+            model_name='counter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='counter',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='counter',
+            constraint=models.UniqueConstraint(fields=('name', 'shard'), name='counter_name_shard_unique'),
+        ),
+    ]
@@ -1,9 +1,27 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.db.models.functions import Now
 from django.utils import timezone
 from ckeditor_uploader.fields import RichTextUploadingField
 from django.template.defaultfilters import slugify
 
 
+class AtomicSaveMixin:
+    """
+    Run save() and its post_save receivers in one transaction, so counters
+    (core_api/counters.py) change together with the row they count. Deletes
+    already run their post_delete receivers inside the deletion transaction.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
 # --- Category Model ---
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -31,11 +49,15 @@ class BlogPost(models.Model):
     published_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     is_active = models.BooleanField(default=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='blog_posts')
 
     class Meta:
         ordering = ['-published_date']
+        indexes = [
+            models.Index(fields=['category', '-published_date', '-id'], name='blogpost_category_feed_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -47,13 +69,14 @@ class BlogPost(models.Model):
 
 
 # --- Event Model ---
-class Event(models.Model):
+class Event(AtomicSaveMixin, models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     description = models.TextField()
     event_date = models.DateTimeField()
     location = models.CharField(max_length=255)
     image = models.ImageField(upload_to='event_images/', blank=True, null=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -66,7 +89,7 @@ class Event(models.Model):
 
 
 # --- ContactMessage Model ---
-class ContactMessage(models.Model):
+class ContactMessage(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     subject = models.CharField(max_length=200, blank=True, null=True)
@@ -76,13 +99,17 @@ class ContactMessage(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Unread inbox changelist; also backs the contact-unread counter reconciliation
+            models.Index(fields=['-submitted_at'], condition=models.Q(is_read=False), name='contactmessage_unread_idx'),
+        ]
 
     def __str__(self):
         return f"Message from {self.name} ({self.email})"
 
 
 # --- NewsletterSubscriber Model ---
-class NewsletterSubscriber(models.Model):
+class NewsletterSubscriber(AtomicSaveMixin, models.Model):
     email = models.EmailField(unique=True)
     subscribed_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
@@ -96,21 +123,43 @@ class NewsletterSubscriber(models.Model):
 
 # --- Resource Model ---
 class Resource(models.Model):
+    # Text extraction state (core_api/documents.py)
+    TEXT_PENDING = 'pending'
+    TEXT_DONE = 'done'
+    TEXT_FAILED = 'failed'
+    TEXT_SKIPPED = 'skipped'
+    TEXT_STATUS_CHOICES = [
+        (TEXT_PENDING, 'Pending'),
+        (TEXT_DONE, 'Extracted'),
+        (TEXT_FAILED, 'Failed (timeout, memory limit or unreadable)'),
+        (TEXT_SKIPPED, 'Skipped (unsupported type or too large)'),
+    ]
+
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     file = models.FileField(upload_to='resources/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
     is_public = models.BooleanField(default=True)
+    file_sha256 = models.CharField(max_length=64, blank=True, editable=False)  # Of the file content_text came from
+    content_text = models.TextField(blank=True, editable=False)
+    text_status = models.CharField(max_length=10, choices=TEXT_STATUS_CHOICES, default=TEXT_PENDING, editable=False)
+    text_extracted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)  # title A, description B, content_text C
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='resource_vector_idx'),
+            # The extraction worker's queue
+            models.Index(fields=['uploaded_at'], condition=models.Q(text_status='pending'), name='resource_text_pending_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
 # --- Volunteer Application Model ---
-class VolunteerApplication(models.Model):
+class VolunteerApplication(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
@@ -135,13 +184,16 @@ class VolunteerApplication(models.Model):
         verbose_name = "Volunteer Application"
         verbose_name_plural = "Volunteer Applications"
         ordering = ['-application_date']
+        indexes = [
+            models.Index(fields=['-application_date'], condition=models.Q(status='Pending'), name='volunteer_pending_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.area_of_interest}"
 
 
 # --- Partnership Inquiry Model ---
-class PartnershipInquiry(models.Model):
+class PartnershipInquiry(AtomicSaveMixin, models.Model):
     organization_name = models.CharField(max_length=255)
     contact_person = models.CharField(max_length=255)
     email = models.EmailField()
@@ -166,6 +218,9 @@ class PartnershipInquiry(models.Model):
         verbose_name = "Partnership Inquiry"
         verbose_name_plural = "Partnership Inquiries"
         ordering = ['-inquiry_date']
+        indexes = [
+            models.Index(fields=['-inquiry_date'], condition=models.Q(status='New'), name='partnership_new_idx'),
+        ]
 
     def __str__(self):
         return f"{self.organization_name} - {self.contact_person}"
@@ -177,6 +232,7 @@ class TeamMember(models.Model):
     role = models.CharField(max_length=255)
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='team_members/', blank=True, null=True)
+    profile_picture_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     linkedin_url = models.URLField(max_length=500, blank=True, null=True)
     twitter_url = models.URLField(max_length=500, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
@@ -195,6 +251,7 @@ class TeamMember(models.Model):
 # --- Gallery Item Model ---
 class GalleryItem(models.Model):
     image = models.ImageField(upload_to='gallery_images/', blank=True, null=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     video = models.FileField(upload_to='gallery_videos/', blank=True, null=True)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
@@ -206,6 +263,9 @@ class GalleryItem(models.Model):
         verbose_name = "Gallery Item"
         verbose_name_plural = "Gallery Items"
         ordering = ['-upload_date']
+        indexes = [
+            models.Index(fields=['category', '-upload_date', '-id'], name='galleryitem_category_feed_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.category.name})" if self.category else self.title
@@ -213,24 +273,50 @@ class GalleryItem(models.Model):
 
 # --- NEW: ImpactStat Model ---
 class ImpactStat(models.Model):
+    # Computed figures an ImpactStat can show instead of its hand-written value (see core_api/counters.py)
+    METRIC_CHOICES = [
+        ('volunteers-accepted', 'Volunteers accepted'),
+        ('volunteer-applications', 'Volunteer applications received'),
+        ('events-held', 'Events held'),
+        ('stories-published', 'Transformation stories published'),
+        ('subscribers', 'Newsletter subscribers'),
+    ]
+    FORMAT_CHOICES = [
+        ('number', 'Number (12,345)'),
+        ('rounded', 'Rounded down with plus (12,000+)'),
+        ('percent', 'Percentage of the total metric (85%)'),
+    ]
+
     title = models.CharField(max_length=100)
-    value = models.CharField(max_length=50)  # e.g. "10,000+", "85%"
+    value = models.CharField(max_length=50, blank=True)  # e.g. "10,000+", "85%"; ignored when a metric is set
+    metric = models.CharField(max_length=50, blank=True, choices=METRIC_CHOICES)
+    metric_total = models.CharField(max_length=50, blank=True, choices=METRIC_CHOICES,
+                                    help_text="Denominator for the percentage format.")
+    value_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='number')
     icon = models.ImageField(upload_to='impact_icons/', null=True, blank=True)
+    icon_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     order = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['order']
 
     def __str__(self):
-        return f"{self.title}: {self.value}"
+        return f"{self.title}: {self.metric or self.value}"
+
+    def clean(self):
+        if not self.metric and not self.value:
+            raise ValidationError("Enter a value or choose a metric.")
+        if self.metric and self.value_format == 'percent' and not self.metric_total:
+            raise ValidationError({'metric_total': "The percentage format needs a total metric."})
 
 
 # --- NEW: TransformationStory Model ---
-class TransformationStory(models.Model):
+class TransformationStory(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=100)
     location = models.CharField(max_length=100, blank=True)
     story = models.TextField()
     image = models.ImageField(upload_to='transformation_stories/', null=True, blank=True)
+    image_meta = models.JSONField(default=dict, blank=True, editable=False)  # core_api/imagemeta.py
     created_at = models.DateTimeField(auto_now_add=True)
     is_published = models.BooleanField(default=True)
 
@@ -239,3 +325,223 @@ class TransformationStory(models.Model):
 
     def __str__(self):
         return f"Story by {self.name}"
+
+
+# --- MediaBlob Model (content-addressed storage reference tracking) ---
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Media Blob"
+        verbose_name_plural = "Media Blobs"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.references} refs)"
+
+
+# --- Counter Model (incrementally maintained counts, see core_api/counters.py) ---
+class Counter(models.Model):
+    name = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)  # Writes spread over COUNTER_SHARDS rows, summed on read
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name', 'shard']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'shard'], name='counter_name_shard_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.shard}: {self.value}"
+
+
+# --- Related posts index (see core_api/related.py) ---
+class PostTerm(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'term'], name='unique_post_term'),
+        ]
+        indexes = [
+            models.Index(fields=['term'], name='postterm_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.weight:.3f})"
+
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score'], name='relatedpost_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.3f})"
+
+
+# --- SearchEntry Model (shared search index, see core_api/search.py) ---
+class SearchEntry(models.Model):
+    # Only visible (active/published/public) objects have an entry.
+    kind = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=255)
+    title_normalized = models.CharField(max_length=255)
+    slug = models.CharField(max_length=200, blank=True)
+    summary = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True)
+
+    class Meta:
+        verbose_name_plural = "Search Entries"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_entry'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='searchentry_vector_idx'),
+            # Prefix (LIKE 'abc%') typeahead and trigram fuzzy matching on titles.
+            models.Index(fields=['title_normalized'], name='searchentry_prefix_idx', opclasses=['varchar_pattern_ops']),
+            GinIndex(fields=['title_normalized'], name='searchentry_trigram_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+# --- ArchivedSubmission Model (retention, see core_api/retention.py) ---
+class ArchivedSubmission(models.Model):
+    kind = models.CharField(max_length=32)
+    original_id = models.BigIntegerField()
+    email = models.EmailField(blank=True)
+    submitted_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)  # Every column of the original row
+
+    class Meta:
+        verbose_name = "Archived Submission"
+        verbose_name_plural = "Archived Submissions"
+        ordering = ['-submitted_at']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'original_id'], name='unique_archived_submission'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', '-submitted_at'], name='archive_kind_submitted_idx'),
+            models.Index(fields=['email'], name='archive_email_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.original_id} ({self.submitted_at:%Y-%m-%d})"
+
+
+# --- ChangeLogEntry Model (delta sync, see core_api/changes.py) ---
+class ChangeLogEntry(models.Model):
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+
+    id = models.BigAutoField(primary_key=True)  # Sync position; sync tokens encode it
+    kind = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=8, choices=[(UPSERT, 'Upsert'), (DELETE, 'Delete')])
+    changed_at = models.DateTimeField(db_default=Now())  # Database clock, like the settle window that reads it
+
+    class Meta:
+        verbose_name = "Change Log Entry"
+        verbose_name_plural = "Change Log Entries"
+        indexes = [
+            # Compaction: newest entry per object
+            models.Index(fields=['kind', 'object_id', '-id'], name='changelog_object_idx'),
+            # Settle window: first entry that is still too recent
+            models.Index(fields=['changed_at'], name='changelog_changed_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.kind}:{self.object_id}"
+
+
+# --- DailyRollup Model (staff analytics, see core_api/rollups.py) ---
+class DailyRollup(models.Model):
+    metric = models.CharField(max_length=50)
+    day = models.DateField()
+    dimension = models.CharField(max_length=50, blank=True)  # '' for the daily total
+    dimension_value = models.CharField(max_length=100, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Rollup"
+        verbose_name_plural = "Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'dimension', 'day', 'dimension_value'], name='unique_daily_rollup'),
+        ]
+
+    def __str__(self):
+        label = f"{self.dimension}={self.dimension_value}" if self.dimension else "total"
+        return f"{self.metric} {self.day} {label}: {self.count}"
+
+
+# --- RequestProfile Model (on-demand profiling, see core_api/profiling.py) ---
+class RequestProfile(models.Model):
+    key = models.CharField(max_length=32, unique=True)  # File names in PROFILING_DIR
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    user = models.CharField(max_length=150, blank=True)  # Username at the time; profiles outlive accounts
+    size = models.PositiveIntegerField(default=0)  # Bytes on disk (profile + SQL trace)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+# --- SlowQuery Model (slow-query log, see core_api/slowqueries.py) ---
+class SlowQuery(models.Model):
+    fingerprint = models.CharField(max_length=16, unique=True)
+    statement = models.TextField()  # Normalized: literals and IN lists collapsed
+    count = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    # The slowest occurrence so far
+    example = models.TextField()
+    params = models.TextField(blank=True)  # Parameter types only; values may be session keys or form data
+    alias = models.CharField(max_length=50)
+    route = models.CharField(max_length=255, blank=True)
+    plan = models.TextField(blank=True)  # EXPLAIN of the first example captured
+    plan_captured_at = models.DateTimeField(null=True, blank=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+        ordering = ['-total_ms']
+
+    def __str__(self):
+        return f"{self.fingerprint}: {self.count}x, max {self.max_ms:.0f} ms"
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0
@@ -0,0 +1,61 @@
+# core_api/pagination.py
+import base64
+import heapq
+from datetime import datetime
+
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(*values):
+    """Helper: opaque, URL-safe cursor for a keyset position."""
+    raw = '|'.join(v.isoformat() if isinstance(v, datetime) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Helper: inverse of encode_cursor for (timestamp, rank, id) cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, rank, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(rank), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def after_cursor(date_field, rank, cursor):
+    """
+    Q selecting rows that sort after ``cursor`` in a stream ordered by
+    (date, rank, id) descending, for a source whose rows all carry ``rank``.
+    """
+    if cursor is None:
+        return Q()
+    c_date, c_rank, c_id = cursor
+    if rank < c_rank:
+        return Q(**{f'{date_field}__lte': c_date})
+    if rank > c_rank:
+        return Q(**{f'{date_field}__lt': c_date})
+    return Q(**{f'{date_field}__lt': c_date}) | Q(**{date_field: c_date, 'pk__lt': c_id})
+
+
+def merge_keyset_sources(sources, cursor, limit):
+    """
+    Merge several querysets into one time-ordered page.
+
+    ``sources`` is a list of ``(rank, date_field, queryset)``. Each source is
+    read with one indexed range query of at most ``limit + 1`` rows; the
+    merged page and the cursor of its last row (or None) are returned.
+    """
+    streams = []
+    for rank, date_field, queryset in sources:
+        # The timestamp is annotated so it is read even from a narrowed (only()) queryset.
+        rows = (
+            queryset.filter(after_cursor(date_field, rank, cursor))
+            .annotate(keyset_date=F(date_field))
+            .order_by(f'-{date_field}', '-pk')[:limit + 1]
+        )
+        streams.append([((obj.keyset_date, rank, obj.pk), obj) for obj in rows])
+    merged = list(heapq.merge(*streams, key=lambda row: row[0], reverse=True))
+    page = merged[:limit]
+    next_cursor = encode_cursor(*page[-1][0]) if len(merged) > limit else None
+    return [obj for _, obj in page], next_cursor
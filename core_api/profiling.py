@@ -0,0 +1,219 @@
+# core_api/profiling.py
+"""
+On-demand profiling of single requests, for superusers.
+
+A request is profiled when it carries ``X-Profile-Token`` (a signed token
+from ``manage.py profiling_token <username>``, for curl and API clients) or
+``?_profile=1`` with a superuser session. ProfilingMiddleware sits first in
+MIDDLEWARE, so the profile covers the other middleware, the view,
+serialization and rendering, and every SQL statement on every database alias
+is traced with its duration and the code that issued it. Parameters are
+never stored: they include session keys (SessionMiddleware runs inside the
+profile) and submitted form data. Other requests cost one header lookup and
+one substring test.
+
+Each profile is a cProfile dump (``<key>.prof``, for pstats or snakeviz) and
+an SQL trace (``<key>.sql.json``) in PROFILING_DIR, indexed by a
+RequestProfile row. The oldest are evicted beyond PROFILING_MAX_PROFILES or
+PROFILING_MAX_BYTES. Browse and download them in the admin; profiled
+responses carry ``X-Profile-Id``. Streaming bodies are produced after the
+response leaves the middleware and are not profiled.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import uuid
+from collections import Counter as Tally
+from contextlib import ExitStack
+from importlib import import_module
+from types import SimpleNamespace
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user, get_user_model
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .models import RequestProfile
+
+TOKEN_META_KEY = 'HTTP_X_PROFILE_TOKEN'  # X-Profile-Token
+QUERY_TRIGGER = '_profile='  # Cheap pre-test; the parameter must be exactly 1
+SIGNING_SALT = 'core_api.profiling'
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DJANGO_DIR = os.path.dirname(django.__file__)
+
+
+# --- Who may profile ---
+def make_token(user):
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(str(user.pk))
+
+
+def user_for_token(token):
+    """Active superuser a valid, unexpired token was issued to, or None."""
+    try:
+        pk = signing.TimestampSigner(salt=SIGNING_SALT).unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return get_user_model()._default_manager.filter(pk=pk, is_active=True, is_superuser=True).first()
+
+
+def session_user(request):
+    """Superuser of the request's session cookie, or None (looked up before the session middleware runs)."""
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+    engine = import_module(settings.SESSION_ENGINE)
+    user = get_user(SimpleNamespace(session=engine.SessionStore(session_key)))
+    return user if user.is_active and user.is_superuser else None
+
+
+# --- Recording ---
+def caller():
+    """``file:line in function`` of the innermost frame outside Django's ORM that issued a query."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(DJANGO_DIR) and filename != __file__:
+            if filename.startswith(PROJECT_DIR):
+                filename = os.path.relpath(filename, PROJECT_DIR)
+            else:
+                filename = filename.rpartition('site-packages' + os.sep)[2]
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ''
+
+
+class QueryTrace:
+    """execute_wrapper recording every statement with its duration and origin (not its parameters)."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'sql': sql,
+                'many': many,
+                'source': caller(),
+            })
+
+
+def paths(key):
+    return (
+        os.path.join(settings.PROFILING_DIR, f'{key}.prof'),
+        os.path.join(settings.PROFILING_DIR, f'{key}.sql.json'),
+    )
+
+
+def store(profiler, queries, request, response, user, duration_ms):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    key = uuid.uuid4().hex
+    profile_path, trace_path = paths(key)
+    profiler.dump_stats(profile_path)
+    with open(trace_path, 'w') as f:
+        json.dump({'method': request.method, 'path': request.get_full_path(), 'queries': queries}, f, indent=1)
+    profile = RequestProfile.objects.create(
+        key=key, method=request.method, path=request.get_full_path()[:500], status=response.status_code,
+        duration_ms=round(duration_ms, 2), query_count=len(queries),
+        query_ms=round(sum(query['ms'] for query in queries), 2), user=user.get_username(),
+        size=os.path.getsize(profile_path) + os.path.getsize(trace_path),
+    )
+    evict()
+    return profile
+
+
+def evict():
+    """Delete the oldest profiles beyond PROFILING_MAX_PROFILES or PROFILING_MAX_BYTES."""
+    total, stale = 0, []
+    for index, (pk, size) in enumerate(RequestProfile.objects.order_by('-created_at', '-pk').values_list('pk', 'size')):
+        total += size
+        if index >= settings.PROFILING_MAX_PROFILES or total > settings.PROFILING_MAX_BYTES:
+            stale.append(pk)
+    if stale:
+        RequestProfile.objects.filter(pk__in=stale).delete()  # Files go in remove_files
+
+
+# --- Signal handler (connected in core_api/signals.py) ---
+def remove_files(sender, instance, **kwargs):
+    for path in paths(instance.key):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# --- Reading (admin) ---
+def report(profile, sort='cumulative', limit=40):
+    """pstats text report of the slowest functions."""
+    stream = io.StringIO()
+    try:
+        stats = pstats.Stats(paths(profile.key)[0], stream=stream)
+    except (OSError, EOFError, ValueError):
+        return "Profile file is missing."
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def load_queries(profile):
+    try:
+        with open(paths(profile.key)[1]) as f:
+            return json.load(f)['queries']
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def repeated(queries, minimum=2):
+    """(count, total ms, sql) for statements run ``minimum`` times or more; N+1 patterns show up here."""
+    counts, times = Tally(), Tally()
+    for query in queries:
+        counts[query['sql']] += 1
+        times[query['sql']] += query['ms']
+    return [(count, round(times[sql], 3), sql) for sql, count in counts.most_common() if count >= minimum]
+
+
+# --- Middleware ---
+class ProfilingMiddleware:
+    """Profiles requests carrying a superuser trigger; passes every other request straight through."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get(TOKEN_META_KEY)
+        if not token and (
+            QUERY_TRIGGER not in request.META.get('QUERY_STRING', '') or request.GET.get('_profile') != '1'
+        ):
+            return self.get_response(request)
+        user = user_for_token(token) if token else session_user(request)
+        if user is None:
+            return self.get_response(request)
+        return self.profile(request, user)
+
+    def profile(self, request, user):
+        trace = QueryTrace()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(trace))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        profile = store(profiler, trace.queries, request, response, user, duration_ms)
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
@@ -0,0 +1,202 @@
+# core_api/related.py
+"""
+Precomputed related-posts index.
+
+Each active BlogPost is reduced to its strongest terms (title and excerpt
+weighted above the body) and stored as PostTerm rows, which double as an
+inverted index. Two posts score
+
+    sum over shared terms t of  w_a(t) * w_b(t) * idf(t)^2  (+ a boost for a shared category)
+
+and every post keeps its best RELATED_POSTS_LIMIT neighbours in RelatedPost,
+so the API answers with one indexed read.
+"""
+import html
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils.html import strip_tags
+
+from .models import BlogPost, PostTerm, RelatedPost
+
+TERMS_PER_POST = 64
+CANDIDATES = 50
+WORD = re.compile(r'[a-z0-9]{3,}')
+STOPWORDS = frozenset("""
+    about above after again against all and any are because been before being below between both but can
+    could did does doing down during each few for from further had has have having her here hers herself
+    him himself his how into its itself just more most myself nor not now off once only other our ours
+    out over own same she should some such than that the their theirs them then there these they this
+    those through too under until very was were what when where which while who whom why will with would
+    you your yours also may one two new
+""".split())
+
+
+def related_limit():
+    return getattr(settings, 'RELATED_POSTS_LIMIT', 5)
+
+
+def category_boost():
+    return getattr(settings, 'RELATED_POSTS_CATEGORY_BOOST', 0.15)
+
+
+def tokenize(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def term_weights(post):
+    """L2-normalised, log-scaled term frequencies for a post's strongest terms."""
+    counts = Counter()
+    for weight, text in ((3, post.title), (2, post.excerpt or ''), (1, html.unescape(strip_tags(post.content or '')))):
+        for word in tokenize(text):
+            counts[word[:64]] += weight
+    top = counts.most_common(TERMS_PER_POST)
+    weights = {term: 1 + math.log(count) for term, count in top}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+def index_terms(post):
+    """Replace the PostTerm rows of one post."""
+    PostTerm.objects.filter(post=post).delete()
+    PostTerm.objects.bulk_create(
+        PostTerm(post=post, term=term, weight=weight) for term, weight in term_weights(post).items()
+    )
+
+
+def score_candidates(post_id, category_id, total_posts):
+    """
+    Score every post sharing a term with ``post_id`` through the inverted
+    index; returns the best CANDIDATES as {post_id: score}.
+    """
+    own = dict(PostTerm.objects.filter(post_id=post_id).values_list('term', 'weight'))
+    if not own:
+        return {}
+    doc_freq = dict(
+        PostTerm.objects.filter(term__in=own).order_by().values('term').annotate(df=Count('id')).values_list('term', 'df')
+    )
+    idf2 = {}
+    for term, df in doc_freq.items():
+        # In a real archive, terms in more than half the posts carry no
+        # signal and are expensive to join on.
+        if df > 1 and (total_posts < 20 or df * 2 <= total_posts):
+            idf2[term] = (math.log((1 + total_posts) / (1 + df)) + 1) ** 2
+    scores = defaultdict(float)
+    postings = PostTerm.objects.filter(term__in=idf2).exclude(post_id=post_id).values_list('post_id', 'term', 'weight')
+    for other_id, term, weight in postings.iterator(chunk_size=2000):
+        scores[other_id] += own[term] * weight * idf2[term]
+    best = dict(sorted(scores.items(), key=lambda item: item[1], reverse=True)[:CANDIDATES])
+    if category_id is not None and best:
+        boost = category_boost()
+        same_category = BlogPost.objects.filter(pk__in=best, category_id=category_id).values_list('pk', flat=True)
+        for other_id in same_category:
+            best[other_id] += boost
+    return best
+
+
+def top_related(scores, limit):
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def update_post(post_id):
+    """
+    Incrementally re-index one post after it was saved: refresh its terms and
+    its own neighbour list, and insert it into the lists of the posts it now
+    beats. Other posts are not rescored; ``rebuild_related_posts`` does that.
+    """
+    post = BlogPost.objects.filter(pk=post_id).only('pk', 'title', 'excerpt', 'content', 'category_id', 'is_active').first()
+    if post is None:
+        return
+    if not post.is_active:
+        remove_post(post_id)
+        return
+    limit = related_limit()
+    with transaction.atomic():
+        index_terms(post)
+        total = BlogPost.objects.filter(is_active=True).count()
+        scores = score_candidates(post.pk, post.category_id, total)
+        RelatedPost.objects.filter(related_id=post.pk).delete()
+        RelatedPost.objects.filter(post_id=post.pk).delete()
+        best = top_related(scores, limit)
+        RelatedPost.objects.bulk_create(RelatedPost(post_id=post.pk, related_id=other, score=score) for other, score in best)
+
+        # Scores are symmetric: offer this post to each candidate's list.
+        current = defaultdict(list)
+        for other_id, score in RelatedPost.objects.filter(post_id__in=scores).values_list('post_id', 'score'):
+            current[other_id].append(score)
+        added = []
+        for other_id, score in scores.items():
+            existing = current[other_id]
+            if len(existing) < limit or score > min(existing):
+                added.append(RelatedPost(post_id=other_id, related_id=post.pk, score=score))
+        RelatedPost.objects.bulk_create(added)
+        for row in added:
+            trim(row.post_id, limit)
+
+
+def trim(post_id, limit):
+    keep = RelatedPost.objects.filter(post_id=post_id).order_by('-score').values_list('pk', flat=True)[:limit]
+    RelatedPost.objects.filter(post_id=post_id).exclude(pk__in=list(keep)).delete()
+
+
+def remove_post(post_id):
+    """Drop a post that was deactivated from the index and from every neighbour list."""
+    with transaction.atomic():
+        PostTerm.objects.filter(post_id=post_id).delete()
+        RelatedPost.objects.filter(post_id=post_id).delete()
+        RelatedPost.objects.filter(related_id=post_id).delete()
+
+
+def _compute_chunk(post_ids, total, limit):
+    """Worker: neighbour lists for a chunk of posts, read from the shared index."""
+    categories = dict(BlogPost.objects.filter(pk__in=post_ids).values_list('pk', 'category_id'))
+    rows = []
+    for post_id in post_ids:
+        scores = score_candidates(post_id, categories.get(post_id), total)
+        rows.extend((post_id, other, score) for other, score in top_related(scores, limit))
+    return rows
+
+
+def _init_worker():
+    # Forked workers must not share the parent's database sockets.
+    connections.close_all()
+
+
+def rebuild(workers=1, chunk_size=200, stdout=None):
+    """Re-index every active post, then recompute all neighbour lists across ``workers`` processes."""
+    posts = BlogPost.objects.filter(is_active=True).only('pk', 'title', 'excerpt', 'content')
+    PostTerm.objects.all().delete()
+    batch = []
+    for post in posts.iterator(chunk_size=chunk_size):
+        batch.extend(PostTerm(post_id=post.pk, term=term, weight=w) for term, w in term_weights(post).items())
+        if len(batch) >= 5000:
+            PostTerm.objects.bulk_create(batch)
+            batch = []
+    PostTerm.objects.bulk_create(batch)
+
+    ids = list(BlogPost.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True))
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    total, limit = len(ids), related_limit()
+    if workers > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = pool.map(_compute_chunk, chunks, [total] * len(chunks), [limit] * len(chunks))
+            rows = [row for chunk in results for row in chunk]
+    else:
+        rows = [row for chunk in chunks for row in _compute_chunk(chunk, total, limit)]
+
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(
+            (RelatedPost(post_id=post_id, related_id=other, score=score) for post_id, other, score in rows),
+            batch_size=5000,
+        )
+    if stdout is not None:
+        stdout.write(f"Indexed {total} posts, stored {len(rows)} related links.")
+    return len(rows)
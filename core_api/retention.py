@@ -0,0 +1,94 @@
+# core_api/retention.py
+"""
+Retention policies for the form submission tables.
+
+Rows older than a policy's SUBMISSION_RETENTION_DAYS are copied into
+ArchivedSubmission and deleted from the hot table in small batches, one short
+transaction per batch. Rows another transaction has locked are skipped
+(SKIP LOCKED) instead of waited for. Untriaged rows (unread messages,
+Pending/New applications and inquiries) and active subscribers are never
+archived, so the inbox counters are unaffected; the impact metrics over
+volunteer applications count archived rows too (core_api/counters.py).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+from .models import (
+    ArchivedSubmission, ContactMessage, NewsletterSubscriber, PartnershipInquiry, VolunteerApplication,
+)
+
+
+class RetentionPolicy:
+    def __init__(self, kind, model, date_field, keep):
+        self.kind = kind
+        self.model = model
+        self.date_field = date_field
+        self.keep = keep  # Filter for rows that are never archived, whatever their age
+
+    @property
+    def days(self):
+        return settings.SUBMISSION_RETENTION_DAYS.get(self.kind)
+
+    def expired(self, now=None):
+        cutoff = (now or timezone.now()) - timedelta(days=self.days)
+        return (
+            self.model._default_manager
+            .filter(**{f'{self.date_field}__lt': cutoff})
+            .exclude(**self.keep)
+            .order_by('pk')
+        )
+
+    def archive_row(self, obj):
+        return ArchivedSubmission(
+            kind=self.kind,
+            original_id=obj.pk,
+            email=getattr(obj, 'email', '') or '',
+            submitted_at=getattr(obj, self.date_field),
+            data={field.attname: getattr(obj, field.attname) for field in self.model._meta.concrete_fields},
+        )
+
+
+POLICIES = {policy.kind: policy for policy in [
+    RetentionPolicy('contact', ContactMessage, 'submitted_at', {'is_read': False}),
+    RetentionPolicy('volunteer', VolunteerApplication, 'application_date', {'status': 'Pending'}),
+    RetentionPolicy('partnership', PartnershipInquiry, 'inquiry_date', {'status': 'New'}),
+    RetentionPolicy('newsletter', NewsletterSubscriber, 'subscribed_at', {'is_active': True}),
+]}
+
+
+def archive_batch(policy, batch_size, now=None):
+    """Archive and delete up to ``batch_size`` expired rows in one transaction. Returns the count."""
+    with transaction.atomic():
+        pks = list(
+            policy.expired(now).select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return 0
+        rows = list(policy.model._default_manager.filter(pk__in=pks))
+        ArchivedSubmission.objects.bulk_create(
+            [policy.archive_row(obj) for obj in rows], ignore_conflicts=True,
+        )
+        with counters.archiving():
+            policy.model._default_manager.filter(pk__in=pks).delete()
+    return len(pks)
+
+
+def archive(policy, batch_size=500, max_batches=None, pause=0.0, now=None, stdout=None):
+    """Archive expired rows batch by batch, pausing between batches. Returns the total archived."""
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(policy, batch_size, now)
+        if not archived:
+            break
+        total += archived
+        batches += 1
+        if stdout:
+            stdout.write(f"{policy.kind}: archived {total} rows")
+        if pause:
+            time.sleep(pause)
+    return total
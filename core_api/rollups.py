@@ -0,0 +1,201 @@
+# core_api/rollups.py
+"""
+Daily rollups of form submissions for the staff stats dashboard.
+
+DailyRollup holds one row per (metric, day, dimension, value): the number of
+submissions received that day, in total (dimension '') and broken down by
+each dimension field. Rows are adjusted as submissions arrive or change
+dimension (e.g. an application moving from Pending to Accepted stays on its
+submission day but changes status bucket). Deletes, including archival,
+leave the history alone. ``backfill_rollups`` recomputes any date range
+from the live tables plus ArchivedSubmission, one window at a time.
+"""
+from collections import Counter as Tally
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    ArchivedSubmission, ContactMessage, DailyRollup, NewsletterSubscriber, PartnershipInquiry,
+    VolunteerApplication,
+)
+
+TOTAL = ''
+
+
+class RollupSource:
+    def __init__(self, metric, model, date_field, dimensions, archive_kind):
+        self.metric = metric
+        self.model = model
+        self.date_field = date_field
+        self.dimensions = dimensions  # Fields broken down per day, besides the total
+        self.archive_kind = archive_kind  # ArchivedSubmission.kind for rows moved out by retention
+
+    def day_of(self, value):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+    def buckets(self, values):
+        """(dimension, dimension_value) pairs one row with ``values`` counts towards."""
+        return [(TOTAL, '')] + [(field, str(values[field])) for field in self.dimensions]
+
+
+SOURCES = {source.metric: source for source in [
+    RollupSource('contact-messages', ContactMessage, 'submitted_at', [], 'contact'),
+    RollupSource('volunteer-applications', VolunteerApplication, 'application_date',
+                 ['area_of_interest', 'status'], 'volunteer'),
+    RollupSource('partnership-inquiries', PartnershipInquiry, 'inquiry_date',
+                 ['partnership_type', 'status'], 'partnership'),
+    RollupSource('subscribers', NewsletterSubscriber, 'subscribed_at', ['is_active'], 'newsletter'),
+]}
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES.values()}
+
+
+def add(metric, day, dimension, value, delta):
+    if not delta:
+        return
+    key = {'metric': metric, 'day': day, 'dimension': dimension, 'dimension_value': value}
+    if DailyRollup.objects.filter(**key).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(count=delta, **key)
+    except IntegrityError:
+        # Created concurrently; add to it instead.
+        DailyRollup.objects.filter(**key).update(count=F('count') + delta)
+
+
+# --- Signal handlers (connected in core_api/signals.py) ---
+def snapshot(sender, instance, **kwargs):
+    source = SOURCES_BY_MODEL[sender]
+    instance._rollup_snapshot = {
+        field: instance.__dict__[field] for field in [source.date_field, *source.dimensions] if field in instance.__dict__
+    }
+
+
+def track_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    source = SOURCES_BY_MODEL[sender]
+    day = source.day_of(getattr(instance, source.date_field))
+    if created:
+        for dimension, value in source.buckets(instance.__dict__):
+            add(source.metric, day, dimension, value, 1)
+    else:
+        old = getattr(instance, '_rollup_snapshot', {})
+        old_day = source.day_of(old[source.date_field]) if source.date_field in old else day
+        for field in source.dimensions:
+            if field not in old:
+                continue  # Deferred when loaded; backfill_rollups repairs the odd miss
+            before, after = str(old[field]), str(getattr(instance, field))
+            if before != after or old_day != day:
+                add(source.metric, old_day, field, before, -1)
+                add(source.metric, day, field, after, 1)
+        if old_day != day:
+            add(source.metric, old_day, TOTAL, '', -1)
+            add(source.metric, day, TOTAL, '', 1)
+    snapshot(sender, instance)
+
+
+def bulk_update(queryset, values):
+    """Move rows between dimension buckets for ``queryset.update(**values)``; call before updating."""
+    source = SOURCES_BY_MODEL.get(queryset.model)
+    if source is None:
+        return
+    for field in source.dimensions:
+        if field not in values:
+            continue
+        groups = (
+            queryset.exclude(**{field: values[field]})
+            .annotate(rollup_day=TruncDate(source.date_field))
+            .values('rollup_day', field).annotate(n=Count('pk')).order_by()
+        )
+        for group in groups:
+            add(source.metric, group['rollup_day'], field, str(group[field]), -group['n'])
+            add(source.metric, group['rollup_day'], field, str(values[field]), group['n'])
+
+
+# --- Backfill (manage.py backfill_rollups) ---
+def compute(source, start, end):
+    """Tally of (day, dimension, value) for submissions on days ``start``..``end`` inclusive."""
+    tally = Tally()
+    window = {f'{source.date_field}__date__gte': start, f'{source.date_field}__date__lte': end}
+    live = source.model._default_manager.filter(**window).annotate(rollup_day=TruncDate(source.date_field))
+    for dimension in [TOTAL, *source.dimensions]:
+        fields = ['rollup_day'] + ([dimension] if dimension else [])
+        for row in live.values(*fields).annotate(n=Count('pk')).order_by():
+            tally[row['rollup_day'], dimension, str(row[dimension]) if dimension else ''] += row['n']
+    archived = ArchivedSubmission.objects.filter(
+        kind=source.archive_kind, submitted_at__date__gte=start, submitted_at__date__lte=end,
+    ).values_list('submitted_at', 'data')
+    for submitted_at, data in archived.iterator(chunk_size=2000):
+        day = source.day_of(submitted_at)
+        for dimension, value in source.buckets(data):
+            tally[day, dimension, value] += 1
+    return tally
+
+
+def backfill(source, start, end, window_days=31, stdout=None):
+    """Recompute rollups for ``start``..``end``, one short transaction per window. Returns rows written."""
+    written = 0
+    window_start = start
+    while window_start <= end:
+        window_end = min(end, window_start + timedelta(days=window_days - 1))
+        tally = compute(source, window_start, window_end)
+        with transaction.atomic():
+            DailyRollup.objects.filter(
+                metric=source.metric, day__gte=window_start, day__lte=window_end,
+            ).delete()
+            DailyRollup.objects.bulk_create([
+                DailyRollup(metric=source.metric, day=day, dimension=dimension, dimension_value=value, count=n)
+                for (day, dimension, value), n in tally.items() if n
+            ])
+        written += len(tally)
+        if stdout:
+            stdout.write(f"{source.metric}: {window_start}..{window_end} -> {len(tally)} rows")
+        window_start = window_end + timedelta(days=1)
+    return written
+
+
+def date_range(source):
+    """(first day, last day) with submissions for ``source``, live or archived, or None."""
+    days = []
+    for queryset, field in [
+        (source.model._default_manager.all(), source.date_field),
+        (ArchivedSubmission.objects.filter(kind=source.archive_kind), 'submitted_at'),
+    ]:
+        first = queryset.order_by(field).values_list(field, flat=True).first()
+        last = queryset.order_by(f'-{field}').values_list(field, flat=True).first()
+        days += [source.day_of(value) for value in (first, last) if value is not None]
+    return (min(days), max(days)) if days else None
+
+
+# --- Reading (/api/stats/) ---
+INTERVALS = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+
+
+def series(metric, dimension, start, end, interval='day'):
+    """[(period start, {dimension value: count})] for ``start``..``end``, plus the overall totals."""
+    rows = DailyRollup.objects.filter(metric=metric, dimension=dimension, day__gte=start, day__lte=end)
+    trunc = INTERVALS[interval]
+    period = trunc('day') if trunc else F('day')
+    grouped = (
+        rows.annotate(period=period).values('period', 'dimension_value')
+        .annotate(total=Sum('count')).order_by('period', 'dimension_value')
+    )
+    points, totals = {}, Tally()
+    for row in grouped:
+        points.setdefault(row['period'], {})[row['dimension_value']] = row['total']
+        totals[row['dimension_value']] += row['total']
+    return sorted(points.items()), dict(totals)
+
+
+def total_before(metric, dimension, day):
+    """Per-value totals of every rollup before ``day`` (the starting point of a cumulative series)."""
+    rows = (
+        DailyRollup.objects.filter(metric=metric, dimension=dimension, day__lt=day)
+        .values('dimension_value').annotate(total=Sum('count')).order_by()
+    )
+    return {row['dimension_value']: row['total'] for row in rows}
@@ -0,0 +1,181 @@
+# core_api/search.py
+"""
+Shared search index over the public content types.
+
+Every visible BlogPost, Event, Resource, TeamMember, GalleryItem and
+TransformationStory has one SearchEntry row, kept current by the signals in
+core_api/signals.py. Hidden objects have no row at all, so visibility is
+enforced by the index itself rather than by filtering results.
+"""
+import html
+
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .models import (
+    BlogPost, Event, Resource, TeamMember, GalleryItem, TransformationStory, SearchEntry
+)
+
+
+def plain_text(value):
+    return html.unescape(strip_tags(value or '')).strip()
+
+
+class SearchSource:
+    def __init__(self, kind, model, visible, title, body, slug=None, published_at=None):
+        self.kind = kind
+        self.model = model
+        self.visible = visible  # queryset filter kwargs for the visible rows
+        self.title = title
+        self.body = body
+        self.slug = slug
+        self.published_at = published_at
+
+    def is_visible(self, instance):
+        return all(getattr(instance, field) == value for field, value in self.visible.items())
+
+    def entry_values(self, instance):
+        body = self.body(instance)
+        return {
+            'title': self.title(instance)[:255],
+            'title_normalized': self.title(instance).lower()[:255],
+            'slug': getattr(instance, self.slug) if self.slug else '',
+            'summary': Truncator(body).chars(280),
+            'body': body,
+            'published_at': getattr(instance, self.published_at) if self.published_at else None,
+        }
+
+
+SOURCES = {source.kind: source for source in [
+    SearchSource(
+        'blogpost', BlogPost, {'is_active': True},
+        title=lambda o: o.title,
+        body=lambda o: ' '.join(filter(None, [o.excerpt, plain_text(o.content), o.author])),
+        slug='slug', published_at='published_date',
+    ),
+    SearchSource(
+        'event', Event, {'is_active': True},
+        title=lambda o: o.title,
+        body=lambda o: f"{o.description} {o.location}",
+        slug='slug', published_at='event_date',
+    ),
+    SearchSource(
+        'resource', Resource, {'is_public': True},
+        title=lambda o: o.title,
+        body=lambda o: ' '.join(filter(None, [o.description, o.content_text])),  # File text: core_api/documents.py
+        published_at='uploaded_at',
+    ),
+    SearchSource(
+        'team-member', TeamMember, {'is_active': True},
+        title=lambda o: o.name,
+        body=lambda o: ' '.join(filter(None, [o.role, o.bio])),
+    ),
+    SearchSource(
+        'gallery-item', GalleryItem, {'is_published': True},
+        title=lambda o: o.title,
+        body=lambda o: o.description or '',
+        published_at='upload_date',
+    ),
+    SearchSource(
+        'transformation-story', TransformationStory, {'is_published': True},
+        title=lambda o: o.name,
+        body=lambda o: ' '.join(filter(None, [o.location, o.story])),
+        published_at='created_at',
+    ),
+]}
+SOURCES_BY_MODEL = {source.model: source for source in SOURCES.values()}
+
+
+def is_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def refresh_vectors(queryset):
+    """Recompute the weighted tsvector (title A, body B) for entries in ``queryset``."""
+    if not is_postgres():
+        return
+    from django.contrib.postgres.search import SearchVector
+
+    queryset.update(search_vector=SearchVector('title', weight='A') + SearchVector('body', weight='B'))
+
+
+def index_instance(instance):
+    """Create, update or drop the entry for one object according to its visibility."""
+    source = SOURCES_BY_MODEL[type(instance)]
+    entries = SearchEntry.objects.filter(kind=source.kind, object_id=instance.pk)
+    if not source.is_visible(instance):
+        entries.delete()
+        return
+    SearchEntry.objects.update_or_create(
+        kind=source.kind, object_id=instance.pk, defaults=source.entry_values(instance)
+    )
+    refresh_vectors(entries)
+
+
+def unindex_instance(instance):
+    source = SOURCES_BY_MODEL[type(instance)]
+    SearchEntry.objects.filter(kind=source.kind, object_id=instance.pk).delete()
+
+
+def rebuild(batch_size=500, stdout=None):
+    """Rebuild every entry from the source tables in batches."""
+    for kind, source in SOURCES.items():
+        SearchEntry.objects.filter(kind=kind).delete()
+        batch, count = [], 0
+        for instance in source.model.objects.filter(**source.visible).order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(SearchEntry(kind=kind, object_id=instance.pk, **source.entry_values(instance)))
+            if len(batch) >= batch_size:
+                count += len(SearchEntry.objects.bulk_create(batch))
+                batch = []
+        count += len(SearchEntry.objects.bulk_create(batch))
+        refresh_vectors(SearchEntry.objects.filter(kind=kind))
+        if stdout is not None:
+            stdout.write(f"{kind}: {count} entries")
+
+
+def search(query, kinds=None):
+    """Ranked full-text hits; ``rank`` is annotated on every entry."""
+    entries = SearchEntry.objects.all()
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    if is_postgres():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type='websearch')
+        return (
+            entries.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', '-published_at', 'pk')
+        )
+    # Development databases: substring match, title hits first.
+    return (
+        entries.filter(Q(title_normalized__contains=query.lower()) | Q(body__icontains=query))
+        .annotate(rank=Value(1.0))
+        .order_by('-published_at', 'pk')
+    )
+
+
+def typeahead(query, kinds=None, limit=10):
+    """Title suggestions: indexed prefix matches first, then trigram near-misses."""
+    normalized = query.lower()
+    entries = SearchEntry.objects.all()
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    hits = list(
+        entries.filter(title_normalized__startswith=normalized)
+        .annotate(rank=Value(1.0))
+        .order_by('title_normalized')[:limit]
+    )
+    if len(hits) < limit and is_postgres() and len(normalized) >= 3:
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        seen = [hit.pk for hit in hits]
+        hits += list(
+            entries.filter(title_normalized__trigram_similar=normalized)
+            .exclude(pk__in=seen)
+            .annotate(rank=TrigramSimilarity('title_normalized', normalized))
+            .order_by('-rank')[:limit - len(hits)]
+        )
+    return hits
@@ -1,34 +1,133 @@
 # core_api/serializers.py
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+from . import counters, imagemeta
 from .models import (
     BlogPost, Event, ContactMessage, NewsletterSubscriber, Resource,
     VolunteerApplication, PartnershipInquiry, TeamMember, GalleryItem,
-    Category, ImpactStat, TransformationStory
+    Category, ImpactStat, TransformationStory, SearchEntry, ArchivedSubmission
 )
 
-def absolute_url_for_field(instance, field_name, request):
+def media_base_url(storage, request, context=None):
+    """Helper: absolute base URL for a storage, resolved once per serializer context."""
+    cache = context.setdefault('media_base_urls', {}) if context is not None else {}
+    base = cache.get(storage.base_url)
+    if base is None:
+        base = cache[storage.base_url] = request.build_absolute_uri(storage.base_url)
+    return base
+
+
+def absolute_url_for_field(instance, field_name, request, context=None):
     """Helper: return absolute URL for an ImageField/FileField or None."""
     f = getattr(instance, field_name, None)
     if not f:
         return None
+    if request is None:
+        # fallback to MEDIA_URL
+        return settings.MEDIA_URL + str(f)
+    if isinstance(f.storage, FileSystemStorage) and f.storage.base_url is not None:
+        # Local storage: join the name onto the cached base instead of
+        # calling storage.url() and build_absolute_uri() for every row.
+        return media_base_url(f.storage, request, context) + filepath_to_uri(f.name).lstrip('/')
     try:
         url = f.url
     except ValueError:
         return None
-    if request is None:
-        # fallback to MEDIA_URL
-        return settings.MEDIA_URL + str(f)
     return request.build_absolute_uri(url)
 
+class ImageMetaField(serializers.ReadOnlyField):
+    """Stored image metadata (width, height, bytes, mime, color, placeholder), or None."""
+
+    def to_representation(self, value):
+        return imagemeta.public_meta(value)
+
+
+def parse_field_list(value):
+    """Helper: split a comma separated query parameter into field names."""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,title`` limits the output to the named fields and
+    ``?expand=category`` opts into the nested relations listed in
+    ``Meta.expandable_fields``. Without ``?fields=`` the full field list is
+    returned, nested relations included.
+
+    Method fields declare the model fields they read in ``Meta.field_sources``
+    so the view can narrow its queryset with ``narrow_queryset``.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_root_serializer():
+            return fields
+        params = getattr(request, 'query_params', request.GET)
+        requested = parse_field_list(params.get('fields'))
+        if not requested:
+            return fields
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+        keep = set(requested) | {name for name in parse_field_list(params.get('expand')) if name in expandable}
+        return {name: field for name, field in fields.items() if name in keep}
+
+    def _is_root_serializer(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def narrow_queryset(self, queryset):
+        """Restrict ``queryset`` to the columns and joins the selected fields read."""
+        columns, related = set(), set()
+        field_sources = getattr(self.Meta, 'field_sources', {})
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ModelSerializer):
+                # Nested relation: join it and read only the nested columns.
+                related.add(field.source)
+                columns.add(field.source)
+                columns.update(f"{field.source}__{child.source}" for child in field.fields.values() if not child.write_only)
+                continue
+            for source in field_sources.get(name, [field.source]):
+                try:
+                    model_field = queryset.model._meta.get_field(source)
+                except FieldDoesNotExist:
+                    model_field = None
+                if model_field is None or not model_field.concrete or model_field.many_to_many:
+                    # A property, method or to-many relation we can't narrow; read every column.
+                    return queryset.select_related(*related) if related else queryset
+                columns.add(source)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
 # --- Category Serializer ---
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug']
 
+# --- Category Serializer with content counts (CategoryViewSet) ---
+class CategoryWithCountsSerializer(CategorySerializer):
+    blog_post_count = serializers.IntegerField(read_only=True)
+    gallery_item_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['blog_post_count', 'gallery_item_count']
+        # Annotated by the view, no model columns to read.
+        field_sources = {'blog_post_count': [], 'gallery_item_count': []}
+
 # --- BlogPost Serializer ---
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(),
@@ -38,37 +137,42 @@ class BlogPostSerializer(serializers.ModelSerializer):
         allow_null=True
     )
     image_url = serializers.SerializerMethodField()
+    image_meta = ImageMetaField()
 
     class Meta:
         model = BlogPost
         fields = [
             'id', 'title', 'slug', 'content', 'excerpt', 'author',
-            'published_date', 'updated_date', 'image', 'image_url', 'is_active',
+            'published_date', 'updated_date', 'image', 'image_url', 'image_meta', 'is_active',
             'category', 'category_id'
         ]
         read_only_fields = ['slug', 'published_date', 'updated_date', 'category']
+        expandable_fields = ['category']
+        field_sources = {'image_url': ['image']}
 
     def get_image_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'image', request)
+        return absolute_url_for_field(obj, 'image', request, self.context)
 
 
 # --- Event Serializer ---
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_meta = ImageMetaField()
 
     class Meta:
         model = Event
-        fields = ['id', 'title', 'slug', 'description', 'event_date', 'location', 'image', 'image_url', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'slug', 'description', 'event_date', 'location', 'image', 'image_url', 'image_meta', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['slug', 'created_at', 'updated_at']
+        field_sources = {'image_url': ['image']}
 
     def get_image_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'image', request)
+        return absolute_url_for_field(obj, 'image', request, self.context)
 
 
 # --- ContactMessage Serializer ---
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = ['id', 'name', 'email', 'subject', 'message', 'submitted_at', 'is_read']
@@ -76,7 +180,7 @@ class ContactMessageSerializer(serializers.ModelSerializer):
 
 
 # --- NewsletterSubscriber Serializer ---
-class NewsletterSubscriberSerializer(serializers.ModelSerializer):
+class NewsletterSubscriberSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = NewsletterSubscriber
         fields = ['id', 'email', 'subscribed_at', 'is_active']
@@ -84,21 +188,22 @@ class NewsletterSubscriberSerializer(serializers.ModelSerializer):
 
 
 # --- Resource Serializer ---
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Resource
         fields = ['id', 'title', 'description', 'file', 'file_url', 'uploaded_at', 'is_public']
         read_only_fields = ['uploaded_at']
+        field_sources = {'file_url': ['file']}
 
     def get_file_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'file', request)
+        return absolute_url_for_field(obj, 'file', request, self.context)
 
 
 # --- Volunteer Application Serializer ---
-class VolunteerApplicationSerializer(serializers.ModelSerializer):
+class VolunteerApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = VolunteerApplication
         fields = ['id', 'name', 'email', 'phone', 'area_of_interest', 'message', 'application_date', 'status']
@@ -106,7 +211,7 @@ class VolunteerApplicationSerializer(serializers.ModelSerializer):
 
 
 # --- Partnership Inquiry Serializer ---
-class PartnershipInquirySerializer(serializers.ModelSerializer):
+class PartnershipInquirySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = PartnershipInquiry
         fields = ['id', 'organization_name', 'contact_person', 'email', 'partnership_type', 'message', 'inquiry_date', 'status']
@@ -114,22 +219,25 @@ class PartnershipInquirySerializer(serializers.ModelSerializer):
 
 
 # --- TeamMember Serializer ---
-class TeamMemberSerializer(serializers.ModelSerializer):
+class TeamMemberSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     profile_picture_url = serializers.SerializerMethodField()
+    profile_picture_meta = ImageMetaField()
 
     class Meta:
         model = TeamMember
-        fields = ['id', 'name', 'role', 'bio', 'profile_picture', 'profile_picture_url', 'linkedin_url', 'twitter_url', 'email', 'order', 'is_active']
+        fields = ['id', 'name', 'role', 'bio', 'profile_picture', 'profile_picture_url', 'profile_picture_meta', 'linkedin_url', 'twitter_url', 'email', 'order', 'is_active']
         read_only_fields = ['id']
+        field_sources = {'profile_picture_url': ['profile_picture']}
 
     def get_profile_picture_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'profile_picture', request)
+        return absolute_url_for_field(obj, 'profile_picture', request, self.context)
 
 
 # --- GalleryItem Serializer ---
-class GalleryItemSerializer(serializers.ModelSerializer):
+class GalleryItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_meta = ImageMetaField()
     video_url = serializers.SerializerMethodField()
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
@@ -142,34 +250,96 @@ class GalleryItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GalleryItem
-        fields = ['id', 'image', 'image_url', 'video', 'video_url', 'title', 'description', 'upload_date', 'category', 'category_id', 'is_published']
+        fields = ['id', 'image', 'image_url', 'image_meta', 'video', 'video_url', 'title', 'description', 'upload_date', 'category', 'category_id', 'is_published']
         read_only_fields = ['upload_date', 'category']
+        expandable_fields = ['category']
+        field_sources = {'image_url': ['image'], 'video_url': ['video']}
 
     def get_image_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'image', request)
+        return absolute_url_for_field(obj, 'image', request, self.context)
 
     def get_video_url(self, obj):
         request = self.context.get('request')
-        return absolute_url_for_field(obj, 'video', request)
+        return absolute_url_for_field(obj, 'video', request, self.context)
 
 
 # --- ImpactStat Serializer ---
-class ImpactStatSerializer(serializers.ModelSerializer):
+class ImpactStatSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    icon_meta = ImageMetaField()
+
     class Meta:
         model = ImpactStat
-        fields = '__all__'
+        fields = ['id', 'title', 'value', 'metric', 'metric_total', 'value_format', 'icon', 'icon_meta', 'order']
+        field_sources = {'value': ['value', 'metric', 'metric_total', 'value_format']}
+
+    def validate(self, attrs):
+        metric = attrs.get('metric', getattr(self.instance, 'metric', ''))
+        if not metric and not attrs.get('value', getattr(self.instance, 'value', '')):
+            raise serializers.ValidationError("Enter a value or choose a metric.")
+        value_format = attrs.get('value_format', getattr(self.instance, 'value_format', 'number'))
+        if metric and value_format == 'percent' and not attrs.get('metric_total', getattr(self.instance, 'metric_total', '')):
+            raise serializers.ValidationError({'metric_total': "The percentage format needs a total metric."})
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'value' in data and instance.metric:
+            # Precomputed counter rows, formatted at read time (core_api/counters.py)
+            values = self.metric_values()
+            data['value'] = counters.format_metric(
+                values[instance.metric], instance.value_format, values.get(instance.metric_total),
+            )
+        return data
+
+    def metric_values(self):
+        """All metric counters in one query, shared by every stat in a list."""
+        root = self.root
+        if not hasattr(root, '_metric_values'):
+            root._metric_values = counters.get_counts([name for name, _ in ImpactStat.METRIC_CHOICES])
+        return root._metric_values
 
 
 # --- TransformationStory Serializer ---
-class TransformationStorySerializer(serializers.ModelSerializer):
+class TransformationStorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_meta = ImageMetaField()
 
     class Meta:
         model = TransformationStory
-        fields = '__all__'
+        fields = ['id', 'image_url', 'image_meta', 'name', 'location', 'story', 'image', 'created_at', 'is_published']
+        field_sources = {'image_url': ['image']}
 
     def get_image_url(self, obj):
         request = self.context.get('request')
         # if TransformationStory has an image field name other than 'image', change accordingly
-        return absolute_url_for_field(obj, 'image', request)
+        return absolute_url_for_field(obj, 'image', request, self.context)
+
+
+# --- Category feed item serializers ---
+class BlogPostFeedSerializer(BlogPostSerializer):
+    class Meta(BlogPostSerializer.Meta):
+        fields = ['id', 'title', 'slug', 'excerpt', 'author', 'published_date', 'image_url', 'image_meta']
+
+
+class GalleryItemFeedSerializer(GalleryItemSerializer):
+    class Meta(GalleryItemSerializer.Meta):
+        fields = ['id', 'title', 'description', 'upload_date', 'image_url', 'image_meta', 'video_url']
+
+
+# --- Search hit serializer (SearchView) ---
+class SearchEntrySerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField(source='object_id')
+    rank = serializers.FloatField()
+
+    class Meta:
+        model = SearchEntry
+        fields = ['type', 'id', 'title', 'slug', 'summary', 'published_at', 'rank']
+
+
+# --- Archived submissions (staff-only, ArchivedSubmissionListView) ---
+class ArchivedSubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedSubmission
+        fields = ['id', 'kind', 'original_id', 'email', 'submitted_at', 'archived_at', 'data']
@@ -0,0 +1,109 @@
+# core_api/signals.py
+from django.apps import apps
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (
+    changes, counters, documents, imagemeta, profiling, related, rollups, search, sitemaps, slowqueries,
+    storage,
+)
+from .cache import bump_version
+from .models import BlogPost, Category, Event, ImpactStat, RequestProfile, Resource
+
+
+@receiver(post_save, sender=BlogPost)
+def reindex_related_posts(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: related.update_post(instance.pk))
+
+
+def update_search_entry(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_instance(instance)
+
+
+def remove_search_entry(sender, instance, **kwargs):
+    search.unindex_instance(instance)
+
+
+for model in search.SOURCES_BY_MODEL:
+    post_save.connect(update_search_entry, sender=model, dispatch_uid=f'search-save-{model.__name__}')
+    post_delete.connect(remove_search_entry, sender=model, dispatch_uid=f'search-delete-{model.__name__}')
+
+
+# Cached renderings (feeds) are keyed by a version bumped on every relevant write.
+CACHE_SCOPES = {
+    BlogPost: ['blog-feeds'],
+    Category: ['blog-feeds'],
+    Event: ['event-feeds'],
+}
+
+
+def bump_cache_scopes(sender, raw=False, **kwargs):
+    if raw:
+        return
+    # After commit: a worker rendering in between would cache the old rows under the new version.
+    transaction.on_commit(lambda: bump_version(*CACHE_SCOPES[sender]))
+
+
+for model in CACHE_SCOPES:
+    post_save.connect(bump_cache_scopes, sender=model, dispatch_uid=f'cache-save-{model.__name__}')
+    post_delete.connect(bump_cache_scopes, sender=model, dispatch_uid=f'cache-delete-{model.__name__}')
+
+
+def bump_sitemap_chunk(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sitemaps.bump_for_instance(instance)
+
+
+for model in sitemaps.SECTIONS_BY_MODEL:
+    post_save.connect(bump_sitemap_chunk, sender=model, dispatch_uid=f'sitemap-save-{model.__name__}')
+    post_delete.connect(bump_sitemap_chunk, sender=model, dispatch_uid=f'sitemap-delete-{model.__name__}')
+
+
+for model in counters.COUNTERS_BY_MODEL:
+    post_init.connect(counters.snapshot, sender=model, dispatch_uid=f'counters-init-{model.__name__}')
+    post_save.connect(counters.track_save, sender=model, dispatch_uid=f'counters-save-{model.__name__}')
+    post_delete.connect(counters.track_delete, sender=model, dispatch_uid=f'counters-delete-{model.__name__}')
+post_save.connect(counters.forget_metric_stats, sender=ImpactStat, dispatch_uid='counters-metric-stats-save')
+post_delete.connect(counters.forget_metric_stats, sender=ImpactStat, dispatch_uid='counters-metric-stats-delete')
+
+
+for model in changes.SOURCES_BY_MODEL:
+    post_save.connect(changes.record_save, sender=model, dispatch_uid=f'changes-save-{model.__name__}')
+    post_delete.connect(changes.record_delete, sender=model, dispatch_uid=f'changes-delete-{model.__name__}')
+
+
+for model in rollups.SOURCES_BY_MODEL:
+    post_init.connect(rollups.snapshot, sender=model, dispatch_uid=f'rollups-init-{model.__name__}')
+    post_save.connect(rollups.track_save, sender=model, dispatch_uid=f'rollups-save-{model.__name__}')
+
+
+# Content-addressed files (core_api/storage.py): empty unless ContentAddressedStorage is configured.
+# Connected before imagemeta, whose pre_save commits uploads early and would make them look assigned.
+for model in apps.get_models():
+    if storage.counted_fields(model):
+        post_init.connect(storage.snapshot, sender=model, dispatch_uid=f'blobs-init-{model.__name__}')
+        pre_save.connect(storage.note_assigned, sender=model, dispatch_uid=f'blobs-assign-{model.__name__}')
+        post_save.connect(storage.track_save, sender=model, dispatch_uid=f'blobs-save-{model.__name__}')
+        post_delete.connect(storage.track_delete, sender=model, dispatch_uid=f'blobs-delete-{model.__name__}')
+
+
+for model in imagemeta.IMAGE_FIELDS:
+    pre_save.connect(imagemeta.update_meta, sender=model, dispatch_uid=f'imagemeta-save-{model.__name__}')
+
+
+post_init.connect(documents.snapshot, sender=Resource, dispatch_uid='documents-init')
+pre_save.connect(documents.mark_pending, sender=Resource, dispatch_uid='documents-pending')
+post_save.connect(documents.update_vector, sender=Resource, dispatch_uid='documents-vector')
+
+
+post_delete.connect(profiling.remove_files, sender=RequestProfile, dispatch_uid='profiling-delete-files')
+
+
+connection_created.connect(slowqueries.install, dispatch_uid='slowqueries-install')
@@ -0,0 +1,153 @@
+# core_api/sitemaps.py
+"""
+Chunked sitemaps.
+
+Each section is split into fixed primary-key ranges of SITEMAP_CHUNK_SIZE
+(chunk ``k`` holds pks ``k*size .. (k+1)*size - 1``). A chunk is rendered
+with one keyset range scan and cached under a version that is bumped only
+when an object inside that range is saved or deleted; the index is cached
+per section in the same way. Versions are bumped after commit in the shared
+default cache, so every worker drops its stale chunk at once.
+"""
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+
+from .cache import bump_version, cached_conditional_response, get_version
+from .links import frontend_url
+from .models import BlogPost, Event, GalleryItem, Resource
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def _file_url(obj, request):
+    # Imported here: signals load this module at app ready, and the serializers
+    # (all of DRF) are not needed until a sitemap is actually rendered.
+    from .serializers import absolute_url_for_field
+    return absolute_url_for_field(obj, 'file', request)
+
+
+class SitemapSection:
+    def __init__(self, name, model, visible, lastmod_field, fields, location):
+        self.name = name
+        self.model = model
+        self.visible = visible
+        self.lastmod_field = lastmod_field
+        self.fields = fields
+        self.location = location  # (obj, request) -> absolute URL
+
+    def queryset(self):
+        return self.model.objects.filter(**self.visible)
+
+    def chunk_of(self, pk):
+        return pk // settings.SITEMAP_CHUNK_SIZE
+
+    def chunks(self):
+        """(chunk number, lastmod) for every non-empty chunk, from one grouped query."""
+        size = settings.SITEMAP_CHUNK_SIZE
+        return (
+            self.queryset()
+            .order_by()
+            .annotate(chunk=F('pk') / size)
+            .values('chunk')
+            .annotate(lastmod=Max(self.lastmod_field))
+            .order_by('chunk')
+            .values_list('chunk', 'lastmod')
+        )
+
+    def chunk_rows(self, chunk):
+        size = settings.SITEMAP_CHUNK_SIZE
+        rows = (
+            self.queryset()
+            .filter(pk__gte=chunk * size, pk__lt=(chunk + 1) * size)
+            .order_by('pk')
+            .only(*self.fields, self.lastmod_field)
+        )
+        return rows.iterator(chunk_size=1000)
+
+
+SECTIONS = {section.name: section for section in [
+    SitemapSection(
+        'blog', BlogPost, {'is_active': True}, 'updated_date', ['slug'],
+        lambda obj, request: frontend_url('blogpost', slug=obj.slug),
+    ),
+    SitemapSection(
+        'events', Event, {'is_active': True}, 'updated_at', ['slug'],
+        lambda obj, request: frontend_url('event', slug=obj.slug),
+    ),
+    SitemapSection(
+        'gallery', GalleryItem, {'is_published': True}, 'upload_date', [],
+        lambda obj, request: frontend_url('gallery-item', id=obj.pk),
+    ),
+    SitemapSection(
+        'resources', Resource, {'is_public': True}, 'uploaded_at', ['file'],
+        lambda obj, request: _file_url(obj, request),
+    ),
+]}
+SECTIONS_BY_MODEL = {section.model: section for section in SECTIONS.values()}
+
+
+def bump_for_instance(instance):
+    """Invalidate the section index and the one chunk holding ``instance`` once the transaction commits."""
+    section = SECTIONS_BY_MODEL[type(instance)]
+    # Scopes are worked out now: a deleted instance has lost its pk by commit time.
+    scopes = [f'sitemap:{section.name}', f'sitemap:{section.name}:{section.chunk_of(instance.pk)}']
+    transaction.on_commit(lambda: bump_version(*scopes))
+
+
+def _xml_response(body, lastmod=None):
+    response = HttpResponse(body, content_type='application/xml; charset=utf-8')
+    if lastmod is not None:
+        response['Last-Modified'] = http_date(lastmod.timestamp())
+    return response
+
+
+def sitemap_index(request):
+    versions = ':'.join(str(get_version(f'sitemap:{name}')) for name in SECTIONS)
+    key = f'sitemap-index:{versions}:{request.get_host()}'
+
+    def render():
+        parts = [XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+        latest = None
+        for name, section in SECTIONS.items():
+            for chunk, lastmod in section.chunks():
+                loc = request.build_absolute_uri(reverse('sitemap-chunk', kwargs={'section': name, 'chunk': chunk}))
+                parts.append(f'<sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n')
+                latest = lastmod if latest is None or lastmod > latest else latest
+        parts.append('</sitemapindex>\n')
+        return _xml_response(''.join(parts), latest)
+
+    response = cached_conditional_response(request, key, settings.SITEMAP_CACHE_TIMEOUT, render)
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+def sitemap_chunk(request, section, chunk):
+    if section not in SECTIONS:
+        raise Http404("Unknown sitemap section.")
+    sitemap = SECTIONS[section]
+    key = f'sitemap:{section}:{chunk}:{get_version(f"sitemap:{section}:{chunk}")}:{request.get_host()}'
+
+    def render():
+        parts = [XML_HEADER, f'<urlset xmlns="{SITEMAP_NS}">\n']
+        latest = None
+        for obj in sitemap.chunk_rows(chunk):
+            lastmod = getattr(obj, sitemap.lastmod_field)
+            loc = sitemap.location(obj, request)
+            parts.append(f'<url><loc>{escape(loc)}</loc><lastmod>{lastmod.isoformat()}</lastmod></url>\n')
+            latest = lastmod if latest is None or lastmod > latest else latest
+        if latest is None:
+            raise Http404("Empty sitemap chunk.")
+        parts.append('</urlset>\n')
+        return _xml_response(''.join(parts), latest)
+
+    response = cached_conditional_response(request, key, settings.SITEMAP_CACHE_TIMEOUT, render)
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
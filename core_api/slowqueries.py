@@ -0,0 +1,218 @@
+# core_api/slowqueries.py
+"""
+Slow-query log: every SQL statement is timed, and those slower than
+SLOW_QUERY_MS are aggregated per fingerprint in SlowQuery (admin).
+
+A timer is installed on each database connection as it is opened
+(``connection_created``). It only compares a duration against the threshold;
+slow statements go into a bounded per-process ring buffer (the oldest are
+dropped under a flood) together with the route being served, which
+SlowQueryRouteMiddleware keeps in a context variable. A daemon thread drains
+the buffer every SLOW_QUERY_FLUSH_SECONDS, adds to the per-fingerprint
+count / total / max, keeps the slowest example with its route, and runs
+``EXPLAIN`` (never ANALYZE) for fingerprints without a plan, on the alias
+the statement ran on. Nothing is written or explained on the request path.
+
+The fingerprint is the statement with literals and parameter lists
+collapsed, so ``pk IN (%s, %s)`` and ``pk IN (%s)`` count together.
+Parameter values are only held in memory for EXPLAIN; the stored example
+records their types, since values include session keys and form data.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import SlowQuery
+
+current_route = ContextVar('slow_query_route', default='')
+_local = threading.local()  # .suppressed: the flusher's own queries are not timed
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?|N)\s*,)*\s*(?:%s|\?|N)\s*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+EXPLAINABLE = ('SELECT', 'WITH')
+
+
+def normalize(sql):
+    sql = _STRING.sub("'S'", sql)
+    sql = _NUMBER.sub('N', sql)
+    sql = _LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(statement):
+    return hashlib.sha1(statement.encode()).hexdigest()[:16]
+
+
+# --- Timing (every query) ---
+class SlowQueryTimer:
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= settings.SLOW_QUERY_MS and not getattr(_local, 'suppressed', False):
+                recorder.add(context['connection'].alias, sql, None if many else params, elapsed_ms)
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver (core_api/signals.py); also runs after reconnects, hence the check."""
+    if settings.SLOW_QUERY_LOG and not any(isinstance(w, SlowQueryTimer) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryTimer())
+
+
+# --- Recording (flusher thread) ---
+class Recorder:
+    def __init__(self):
+        self.buffer = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def add(self, alias, sql, params, elapsed_ms):
+        self.buffer.append((alias, sql, params, elapsed_ms, current_route.get(), timezone.now()))
+        if self.pid != os.getpid():  # First slow query in this (possibly forked) process
+            self.start()
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            threading.Thread(target=self.run, name='slow-query-flusher', daemon=True).start()
+
+    def run(self):
+        _local.suppressed = True
+        while True:
+            time.sleep(settings.SLOW_QUERY_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except DatabaseError:
+                pass  # Next round; the buffer keeps the newest entries meanwhile
+            finally:
+                close_old_connections()
+
+    def drain(self):
+        entries = []
+        while True:
+            try:
+                entries.append(self.buffer.popleft())
+            except IndexError:
+                return entries
+
+    def flush(self):
+        """Write buffered slow queries and capture missing plans. Returns fingerprints updated."""
+        suppressed, _local.suppressed = getattr(_local, 'suppressed', False), True
+        try:
+            entries = self.drain()
+            if not entries:
+                return 0  # Idle processes don't touch the database
+            groups = {}
+            for alias, sql, params, elapsed_ms, route, seen_at in entries:
+                statement = normalize(sql)
+                group = groups.setdefault(fingerprint(statement), {
+                    'statement': statement, 'count': 0, 'total_ms': 0.0, 'last_seen': seen_at, 'slowest': None,
+                })
+                group['count'] += 1
+                group['total_ms'] += elapsed_ms
+                group['last_seen'] = max(group['last_seen'], seen_at)
+                if group['slowest'] is None or elapsed_ms > group['slowest'][3]:
+                    group['slowest'] = (alias, sql, params, elapsed_ms, route)
+            for key, group in groups.items():
+                save(key, group)
+            evict()
+            for slow_query in SlowQuery.objects.filter(fingerprint__in=list(groups), plan=''):
+                capture_plan(slow_query, *groups[slow_query.fingerprint]['slowest'][:3])
+            return len(groups)
+        finally:
+            _local.suppressed = suppressed
+
+
+def redact(params):
+    """Parameter types only, e.g. ``(str, int)``."""
+    if params is None:
+        return ''
+    values = params.values() if isinstance(params, dict) else params
+    return '(' + ', '.join(type(value).__name__ for value in values) + ')'
+
+
+def save(key, group):
+    alias, sql, params, elapsed_ms, route = group['slowest']
+    slowest = {
+        'example': sql, 'params': redact(params)[:2000], 'alias': alias, 'route': route[:255], 'max_ms': elapsed_ms,
+    }
+    totals = {
+        'count': F('count') + group['count'], 'total_ms': F('total_ms') + group['total_ms'],
+        'last_seen': group['last_seen'],
+    }
+    if not SlowQuery.objects.filter(fingerprint=key).update(**totals):
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=key, statement=group['statement'], count=group['count'],
+                    total_ms=group['total_ms'], last_seen=group['last_seen'], **slowest,
+                )
+            return
+        except IntegrityError:
+            # Created concurrently by another worker; add to it instead.
+            SlowQuery.objects.filter(fingerprint=key).update(**totals)
+    SlowQuery.objects.filter(fingerprint=key, max_ms__lt=elapsed_ms).update(**slowest)
+
+
+def capture_plan(slow_query, alias, sql, params):
+    if not sql.lstrip().upper().startswith(EXPLAINABLE) or params is None:
+        plan = "(not explained: only single SELECT statements are)"
+    else:
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+        except DatabaseError as e:
+            plan = f"(EXPLAIN failed: {e})"
+    SlowQuery.objects.filter(pk=slow_query.pk).update(plan=plan, plan_captured_at=timezone.now())
+
+
+def evict():
+    """Keep the SLOW_QUERY_MAX_FINGERPRINTS most recently seen fingerprints."""
+    stale = list(
+        SlowQuery.objects.order_by('-last_seen').values_list('pk', flat=True)[settings.SLOW_QUERY_MAX_FINGERPRINTS:]
+    )
+    if stale:
+        SlowQuery.objects.filter(pk__in=stale).delete()
+
+
+recorder = Recorder()
+
+
+# --- Middleware ---
+class SlowQueryRouteMiddleware:
+    """Tags queries with the request's method and URL pattern (its path until the view is resolved)."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_route.set(f'{request.method} {request.path_info}')
+        try:
+            return self.get_response(request)
+        finally:
+            current_route.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is not None:
+            current_route.set(f'{request.method} /{match.route} ({match.view_name})')
@@ -0,0 +1,84 @@
+# core_api/startup.py
+"""
+Worker boot profiling and pre-fork warm-up.
+
+``measure_boot`` starts a fresh interpreter that does what a gunicorn worker
+does before its first response (``django.setup()``, build the WSGI handler,
+load the URLconf) and reports wall time, peak RSS, the loaded modules and,
+optionally, the ``-X importtime`` tree. ``warm_up`` is called in the gunicorn
+master in preload mode (see gunicorn.conf.py).
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+from django.conf import settings
+
+# Modules that must not be imported by a worker that only serves JSON reads.
+HEAVY_MODULES = ['PIL', 'PIL.Image', 'ckeditor_uploader.views', 'ckeditor_uploader.backends']
+
+BOOT_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+seconds = time.perf_counter() - start
+sys.stdout.write(json.dumps({
+    'seconds': seconds,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': sorted(sys.modules),
+}))
+"""
+
+ImportRow = namedtuple('ImportRow', 'module depth self_us cumulative_us')
+
+
+def parse_importtime(stderr):
+    """Parse ``-X importtime`` output into ImportRow tuples (children before parents)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        stripped = name.lstrip(' ')
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append(ImportRow(stripped.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_boot(importtime=False, env=None):
+    """Boot the project in a fresh interpreter and return its measurements."""
+    child_env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    child_env.update(env or {})
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', BOOT_SCRIPT]
+    result = subprocess.run(
+        command, env=child_env, cwd=str(settings.BASE_DIR),
+        capture_output=True, text=True, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Boot failed:\n{result.stderr[-2000:]}")
+    data = json.loads(result.stdout)
+    data['imports'] = parse_importtime(result.stderr) if importtime else []
+    # Total import time: the sum of the top-level cumulative times.
+    data['import_us'] = sum(row.cumulative_us for row in data['imports'] if row.depth == 0)
+    return data
+
+
+def warm_up():
+    """
+    Load everything a worker would otherwise load lazily on its first request,
+    so that forked workers share it copy-on-write.
+    """
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    # Database connections must never be shared across fork().
+    connections.close_all()
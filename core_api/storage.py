@@ -0,0 +1,177 @@
+# core_api/storage.py
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+from functools import cache
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F, FileField
+
+CONTENT_ADDRESSED_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+
+
+def is_content_addressed(name):
+    """Helper: True for names produced by ContentAddressedStorage (safe to cache forever)."""
+    return bool(CONTENT_ADDRESSED_NAME.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Local storage that names files by the SHA-256 of their content.
+
+    ``gallery_images/beach.jpg`` is stored as ``gallery_images/ab/ab12...ef.jpg``
+    under its top-level upload directory, so the same bytes uploaded twice (on
+    any date, under any name) land on one blob. The hash is computed while the
+    upload is streamed to a temporary file, chunk by chunk. Every save adds a
+    reference on the blob's MediaBlob row and ``delete()`` only unlinks the
+    file once the last reference is gone; both lock the row while they look
+    at the file. The receivers below add a reference when a row is saved
+    with an existing blob's name and release one when a row is deleted or
+    its file replaced. Before the last reference goes, ``delete()`` counts
+    the rows still naming the blob, so rows written without signals (bulk
+    inserts) keep their file.
+    """
+
+    immutable = True
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save().
+        return name
+
+    def _save(self, name, content):
+        top_dir = name.replace('\\', '/').split('/', 1)[0] if '/' in name else ''
+        ext = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(top_dir) if top_dir else self.location
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            sha256 = digest.hexdigest()
+            final_name = posixpath.join(top_dir, sha256[:2], sha256 + ext)
+            self._add_reference(final_name, sha256, size, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return final_name
+
+    def _add_reference(self, name, sha256, size, tmp_path):
+        """Count one more reference to blob ``name``, moving ``tmp_path`` into place if the file is missing."""
+        from .models import MediaBlob
+
+        # The blob row is locked while the file is checked and placed, so a
+        # concurrent delete() of the last reference can't unlink it in between.
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                try:
+                    with transaction.atomic():
+                        blob = MediaBlob.objects.create(name=name, sha256=sha256, size=size, references=0)
+                except IntegrityError:
+                    # Created concurrently by another save; wait for it and add to it.
+                    blob = MediaBlob.objects.select_for_update().get(name=name)
+            final_path = self.path(name)
+            if not os.path.exists(final_path):
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+                os.chmod(final_path, self.file_permissions_mode or 0o644)
+            MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') + 1)
+
+    def add_reference(self, name):
+        """Count one more reference to the existing blob ``name`` (a row saved with its name)."""
+        from .models import MediaBlob
+
+        MediaBlob.objects.filter(name=name).update(references=F('references') + 1)
+
+    def delete(self, name):
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.references > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') - 1)
+                return
+            if blob is not None:
+                remaining = count_rows(name)
+                if remaining:
+                    MediaBlob.objects.filter(pk=blob.pk).update(references=remaining)
+                    return
+                blob.delete()
+            # Still under the lock: a concurrent save of the same bytes waits, then finds no row and puts the file back.
+            super().delete(name)
+
+
+# --- Reference tracking (connected in core_api/signals.py) ---
+@cache
+def counted_fields(model):
+    """(attname, storage) for the file fields of ``model`` kept in a ContentAddressedStorage."""
+    return [
+        (field.attname, field.storage) for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def count_rows(name):
+    """Rows of any model whose content-addressed file field holds ``name``."""
+    return sum(
+        model._default_manager.filter(**{attname: name}).count()
+        for model in apps.get_models() for attname, _ in counted_fields(model)
+    )
+
+
+def _name(value):
+    return getattr(value, 'name', value) or ''
+
+
+def snapshot(sender, instance, **kwargs):
+    # Deferred fields are left out; saving such an instance leaves their references alone.
+    instance._blob_names = {
+        attname: _name(instance.__dict__[attname]) for attname, _ in counted_fields(sender)
+        if attname in instance.__dict__
+    }
+
+
+def note_assigned(sender, instance, raw=False, **kwargs):
+    """Before a save: existing blobs newly named by this row. Uploads count their own reference."""
+    if instance._state.adding:
+        instance._blob_names = {}  # Whatever the constructor was given replaces nothing
+    old = getattr(instance, '_blob_names', {})
+    instance._blob_assigned = []
+    for attname, storage in counted_fields(sender):
+        if attname not in instance.__dict__:
+            continue
+        field_file = getattr(instance, attname)
+        if field_file and field_file._committed and (instance._state.adding or field_file.name != old.get(attname)):
+            instance._blob_assigned.append((storage, field_file.name))
+
+
+def track_save(sender, instance, raw=False, **kwargs):
+    for storage, name in getattr(instance, '_blob_assigned', []):
+        storage.add_reference(name)
+    old = getattr(instance, '_blob_names', {})
+    for attname, storage in counted_fields(sender):
+        if attname in old and old[attname] and old[attname] != _name(instance.__dict__.get(attname)):
+            release(storage, old[attname])
+    snapshot(sender, instance)
+
+
+def track_delete(sender, instance, **kwargs):
+    for attname, storage in counted_fields(sender):
+        name = _name(instance.__dict__.get(attname))
+        if name:
+            release(storage, name)
+
+
+def release(storage, name):
+    # After commit, so a rolled-back delete or replacement still has its file.
+    transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,21 @@
+# core_api/templatetags/inbox.py
+from django import template
+
+from core_api import counters
+
+register = template.Library()
+
+
+@register.simple_tag
+def inbox_counters(user):
+    """Inbox counters the user may view, read from the Counter table in one query."""
+    definitions = [counters.COUNTERS[name] for name in counters.INBOX_COUNTERS]
+    visible = [
+        definition for definition in definitions
+        if user.has_perm(f'{definition.model._meta.app_label}.view_{definition.model._meta.model_name}')
+    ]
+    values = counters.get_counts([definition.name for definition in visible]) if visible else {}
+    return [
+        {'label': definition.label, 'value': values[definition.name], 'url': definition.changelist_url()}
+        for definition in visible
+    ]
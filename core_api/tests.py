@@ -1,3 +1,501 @@
-from django.test import TestCase
+import io
+import struct
+import zipfile
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.mixins import CreateModelMixin
+from rest_framework.response import Response
+
+from . import changes, counters, retention, rollups
+from .db_router import PIN_COOKIE, PrimaryReplicaRouter, ReadYourWritesMiddleware, use_primary
+from .idempotency import HEADER, REPLAYED_HEADER
+from .models import (
+    ArchivedSubmission, BlogPost, Category, ChangeLogEntry, ContactMessage, Counter, DailyRollup, GalleryItem,
+    ImpactStat, VolunteerApplication,
+)
+from .pagination import decode_cursor, encode_cursor, merge_keyset_sources
+from .startup import HEAVY_MODULES, measure_boot
+from .views import ContactMessageCreateView
+from .zipstream import ZIP64_LIMIT, Member, ZipStream, end_records
+
+
+class WorkerBootTests(SimpleTestCase):
+    """Guards the cold-start cost of a worker (see profile_startup for the breakdown)."""
+
+    def test_boot_does_not_import_heavy_modules(self):
+        loaded = set(measure_boot()['modules'])
+        self.assertEqual([name for name in HEAVY_MODULES if name in loaded], [])
+
+    def test_boot_import_time_within_budget(self):
+        # Best of three, to keep a noisy machine from failing the build.
+        import_ms = min(measure_boot(importtime=True)['import_us'] for _ in range(3)) / 1000
+        self.assertLessEqual(
+            import_ms, settings.BOOT_IMPORT_BUDGET_MS,
+            f"Worker boot spent {import_ms:.0f} ms importing (budget {settings.BOOT_IMPORT_BUDGET_MS} ms); "
+            "run `manage.py profile_startup` to see what got heavier.",
+        )
+
+
+class ChangeLogTests(TestCase):
+    """Ordering guarantees delta-sync clients rely on (core_api/changes.py)."""
+
+    def log(self, kind, object_id, action, age_seconds=60):
+        entry = ChangeLogEntry.objects.create(kind=kind, object_id=object_id, action=action)
+        changed_at = timezone.now() - timedelta(seconds=age_seconds)
+        ChangeLogEntry.objects.filter(pk=entry.pk).update(changed_at=changed_at)
+        return entry.pk
+
+    def test_token_round_trip(self):
+        for position in (0, 1, 123456789):
+            self.assertEqual(changes.decode_token(changes.encode_token(position)), position)
+
+    def test_malformed_tokens_are_rejected(self):
+        for token in ('garbage', changes.encode_token(5)[:-2] + '!!', 'djI6NQ'):  # Last one is "v2:5"
+            with self.assertRaises((ValueError, UnicodeDecodeError)):
+                changes.decode_token(token)
+
+    @override_settings(CHANGES_SETTLE_SECONDS=2)
+    def test_unsettled_entries_are_held_back(self):
+        settled = self.log('blogpost', 1, ChangeLogEntry.UPSERT)
+        fresh = self.log('blogpost', 2, ChangeLogEntry.UPSERT, age_seconds=0)
+        self.assertEqual([entry[0] for entry in changes.entries_after(0, 10)], [settled])
+        ChangeLogEntry.objects.filter(pk=fresh).update(changed_at=timezone.now() - timedelta(seconds=3))
+        self.assertEqual([entry[0] for entry in changes.entries_after(settled, 10)], [fresh])
+
+    @override_settings(CHANGES_SETTLE_SECONDS=2)
+    def test_pages_stop_at_the_first_unsettled_entry(self):
+        # A slow commit: the lower position is newer than the one after it.
+        first = self.log('blogpost', 1, ChangeLogEntry.UPSERT)
+        slow = self.log('blogpost', 2, ChangeLogEntry.UPSERT, age_seconds=0)
+        self.log('blogpost', 3, ChangeLogEntry.UPSERT, age_seconds=60)
+        self.assertEqual([entry[0] for entry in changes.entries_after(0, 10)], [first])
+        self.assertEqual(changes.settled_entries().aggregate(position=Max('pk'))['position'], first)
+        ChangeLogEntry.objects.filter(pk=slow).update(changed_at=timezone.now() - timedelta(seconds=3))
+        self.assertEqual(len(changes.entries_after(first, 10)), 2)
+
+    def test_later_entries_win_within_a_page(self):
+        position = self.log('category', 1, ChangeLogEntry.UPSERT)
+        self.log('category', 7, ChangeLogEntry.UPSERT)
+        last = self.log('category', 7, ChangeLogEntry.DELETE)
+        records, deleted, next_position, has_more = changes.changes_since(position, 10)
+        self.assertEqual((records, deleted, next_position, has_more), ({}, {'category': [7]}, last, False))
+
+    def test_compaction_keeps_the_newest_entry_per_object(self):
+        self.log('blogpost', 1, ChangeLogEntry.UPSERT)
+        self.log('blogpost', 1, ChangeLogEntry.UPSERT)
+        newest = self.log('blogpost', 1, ChangeLogEntry.UPSERT)
+        other = self.log('event', 1, ChangeLogEntry.UPSERT)
+        superseded, purged = changes.compact(tombstone_days=90, batch_size=1)
+        self.assertEqual((superseded, purged), (2, 0))
+        self.assertEqual(sorted(ChangeLogEntry.objects.values_list('pk', flat=True)), [newest, other])
+
+    def test_purged_tombstones_move_the_horizon(self):
+        before = self.log('event', 1, ChangeLogEntry.UPSERT, age_seconds=200 * 86400)
+        tombstone = self.log('event', 2, ChangeLogEntry.DELETE, age_seconds=100 * 86400)
+        recent = self.log('event', 3, ChangeLogEntry.DELETE)
+        self.assertEqual(changes.compact(tombstone_days=90), (0, 1))
+        self.assertEqual(changes.horizon(), tombstone)
+        self.assertFalse(ChangeLogEntry.objects.filter(pk=tombstone).exists())
+        self.assertEqual(ChangeLogEntry.objects.filter(pk__in=[before, recent]).count(), 2)
+
+    def test_tokens_behind_the_horizon_must_resync(self):
+        self.log('event', 1, ChangeLogEntry.UPSERT, age_seconds=200 * 86400)
+        tombstone = self.log('event', 2, ChangeLogEntry.DELETE, age_seconds=100 * 86400)
+        changes.compact(tombstone_days=90)
+        expired = self.client.get('/api/changes/', {'since': changes.encode_token(tombstone - 1)})
+        self.assertEqual(expired.status_code, 410)
+        self.assertTrue(expired.json()['reset'])
+        current = self.client.get('/api/changes/', {'since': changes.encode_token(tombstone)})
+        self.assertEqual(current.status_code, 200)
+        self.assertEqual(self.client.get('/api/changes/', {'since': 'garbage'}).status_code, 400)
+
+
+class IdempotencyKeyTests(TestCase):
+    """Retries of a create with the same Idempotency-Key (core_api/idempotency.py)."""
+
+    url = '/api/contact/'
+
+    def post(self, key='retry-1', **fields):
+        data = {'name': 'Ama', 'email': 'ama@example.org', 'subject': 'Visit', 'message': 'Hello', **fields}
+        return self.client.post(self.url, data, content_type='application/json', headers={HEADER: key})
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post()
+        second = self.post()
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((second.status_code, second.json()), (201, first.json()))
+        self.assertEqual(second[REPLAYED_HEADER], 'true')
+        self.assertFalse(first.has_header(REPLAYED_HEADER))
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_retry_while_the_first_is_running_gets_409(self):
+        retries = []
+        perform_create = ContactMessageCreateView.perform_create
+
+        def slow_create(view, serializer):
+            retries.append(self.post())  # Arrives while this request still holds the key
+            perform_create(view, serializer)
+
+        with mock.patch.object(ContactMessageCreateView, 'perform_create', slow_create):
+            self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(retries[0].status_code, 409)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_same_key_with_another_payload_gets_422(self):
+        self.post()
+        response = self.post(message='Something else')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_exceptions_and_validation_errors_release_the_key(self):
+        with mock.patch.object(ContactMessageCreateView, 'perform_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post()
+        self.assertEqual(self.post(email='not an address').status_code, 400)
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_server_errors_release_the_key(self):
+        with mock.patch.object(CreateModelMixin, 'create', return_value=Response(status=503)):
+            self.assertEqual(self.post().status_code, 503)
+        response = self.post()
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header(REPLAYED_HEADER))
+
+    def test_keys_are_scoped_per_endpoint(self):
+        self.post()
+        response = self.client.post(
+            '/api/subscribe/', {'email': 'ama@example.org'}, content_type='application/json',
+            headers={HEADER: 'retry-1'},
+        )
+        self.assertEqual(response.status_code, 201)
+
+
+class KeysetFeedTests(TestCase):
+    """Merged keyset pages of posts and gallery items (core_api/pagination.py, CategoryViewSet.feed)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='News', slug='news')
+        noon = timezone.make_aware(datetime(2025, 3, 1, 12, 0))
+        # Ties at every level: several rows per timestamp, in both sources.
+        for i, minutes in enumerate([0, 0, 0, 5, 5, 10]):
+            post = BlogPost.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='x', author='A', category=cls.category,
+            )
+            BlogPost.objects.filter(pk=post.pk).update(published_date=noon + timedelta(minutes=minutes))
+        for i, minutes in enumerate([0, 0, 5, 10, 10]):
+            GalleryItem.objects.create(
+                title=f'Item {i}', category=cls.category, upload_date=noon + timedelta(minutes=minutes),
+            )
+
+    def sources(self):
+        return [
+            (1, 'published_date', BlogPost.objects.filter(category=self.category)),
+            (0, 'upload_date', GalleryItem.objects.filter(category=self.category)),
+        ]
+
+    def key(self, obj):
+        if isinstance(obj, BlogPost):
+            return obj.published_date, 1, obj.pk
+        return obj.upload_date, 0, obj.pk
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = sorted(
+            [self.key(obj) for obj in BlogPost.objects.all()] + [self.key(obj) for obj in GalleryItem.objects.all()],
+            reverse=True,
+        )
+        for limit in (1, 2, 3, 4, 11, 20):
+            seen, cursor, pages = [], None, 0
+            while True:
+                page, next_cursor = merge_keyset_sources(self.sources(), cursor, limit)
+                seen += [self.key(obj) for obj in page]
+                pages += 1
+                if next_cursor is None:
+                    break
+                cursor = decode_cursor(next_cursor)
+            self.assertEqual(seen, expected, f"limit={limit}")
+            self.assertEqual(pages, max(1, -(-len(expected) // limit)), f"limit={limit}")
+
+    def test_cursor_round_trip(self):
+        position = (timezone.make_aware(datetime(2025, 3, 1, 12, 0, 0, 500)), 1, 42)
+        self.assertEqual(decode_cursor(encode_cursor(*position)), position)
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ['', 'not base64!', encode_cursor('2025-03-01', 1), encode_cursor('yesterday', 1, 2),
+                       encode_cursor('2025-03-01T12:00:00', 'one', 2), 'gICA']:
+            with self.subTest(cursor=cursor), self.assertRaises(ValidationError):
+                decode_cursor(cursor)
+        response = self.client.get('/api/categories/news/feed/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_feed_endpoint_follows_next(self):
+        url, titles = '/api/categories/news/feed/?limit=4', []
+        while url:
+            body = self.client.get(url).json()
+            titles += [row['title'] for row in body['results']]
+            url = body['next']
+        self.assertEqual(len(titles), 11)
+        self.assertEqual(len(set(titles)), 11)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], DATABASE_REPLICA_STRATEGY='round-robin', READ_YOUR_WRITES_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Where reads go (core_api/db_router.py); not wrapped in a transaction, which would pin everything."""
+
+    router = PrimaryReplicaRouter()
+
+    def read_alias(self):
+        return self.router.db_for_read(BlogPost)
+
+    def request(self, method='get', path='/api/blogposts/', cookies=None, view=None):
+        """(response, alias a read inside the view went to)."""
+        seen = []
+
+        def get_response(request):
+            seen.append(view() if view else self.read_alias())
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        response = ReadYourWritesMiddleware(get_response)(request)
+        return response, seen[0]
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.assertEqual(self.request()[1], 'replica1')
+        self.assertEqual(self.request(path='/admin/core_api/blogpost/')[1], DEFAULT_DB_ALIAS)
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        response, alias = self.request('post', '/api/contact/')
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+        pin = response.cookies[PIN_COOKIE]
+        self.assertEqual(pin['max-age'], 5)
+        self.assertEqual(self.request(cookies={PIN_COOKIE: pin.value})[1], DEFAULT_DB_ALIAS)
+        expired = str(int(timezone.now().timestamp()) - 1)
+        self.assertEqual(self.request(cookies={PIN_COOKIE: expired})[1], 'replica1')
+        self.assertEqual(self.request(cookies={PIN_COOKIE: 'junk'})[1], 'replica1')
+
+    def test_reads_inside_atomic_use_the_primary(self):
+        def view():
+            with transaction.atomic():
+                inside = self.read_alias()
+            return inside, self.read_alias()
+
+        self.assertEqual(self.request(view=view)[1], (DEFAULT_DB_ALIAS, 'replica1'))
+
+    def test_use_primary_and_the_cache_table(self):
+        cache_entry = type('CacheEntry', (), {'_meta': type('Options', (), {'app_label': 'django_cache'})})
+
+        def view():
+            with use_primary():
+                pinned = self.read_alias()
+            return pinned, self.router.db_for_read(cache_entry)
+
+        self.assertEqual(self.request(view=view)[1], (DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS))
+
+
+class DailyRollupTests(TestCase):
+    """Incremental stats rollups against backfill_rollups' recount (core_api/rollups.py)."""
+
+    metric = 'volunteer-applications'
+
+    def apply(self, days_ago, status='Pending', area='Education & Training'):
+        return VolunteerApplication.objects.create(
+            name='Kofi', email='kofi@example.org', area_of_interest=area, status=status,
+            application_date=timezone.now() - timedelta(days=days_ago),
+        )
+
+    def rows(self):
+        return {
+            (row.day, row.dimension, row.dimension_value): row.count
+            for row in DailyRollup.objects.filter(metric=self.metric) if row.count
+        }
+
+    def backfilled(self):
+        source = rollups.SOURCES[self.metric]
+        start, end = rollups.date_range(source)
+        rollups.backfill(source, start, end, window_days=7)
+        return self.rows()
+
+    def test_status_change_moves_the_bucket_on_the_submission_day(self):
+        application = self.apply(days_ago=10)
+        day = timezone.localdate(application.application_date)
+        application = VolunteerApplication.objects.get(pk=application.pk)
+        application.status = 'Accepted'
+        application.save()
+        rows = self.rows()
+        self.assertEqual(rows[day, '', ''], 1)
+        self.assertEqual(rows[day, 'status', 'Accepted'], 1)
+        self.assertNotIn((day, 'status', 'Pending'), rows)
+        self.assertEqual(DailyRollup.objects.filter(metric=self.metric, day=timezone.localdate()).count(), 0)
+
+    def test_admin_bulk_update_moves_buckets(self):
+        for days_ago in (1, 1, 3):
+            self.apply(days_ago)
+        counters.bulk_update(VolunteerApplication.objects.all(), status='Reviewed')
+        rows = self.rows()
+        self.assertEqual(sum(n for key, n in rows.items() if key[1:] == ('status', 'Reviewed')), 3)
+        self.assertFalse([key for key in rows if key[2] == 'Pending'])
+        self.assertEqual(rows, self.backfilled())
+
+    def test_backfill_matches_incremental_rows(self):
+        for days_ago, status, area in [(0, 'Pending', 'Fundraising'), (2, 'Accepted', 'Other'),
+                                       (2, 'Rejected', 'Other'), (40, 'Pending', 'Fundraising')]:
+            self.apply(days_ago, status, area)
+        moved = VolunteerApplication.objects.get(application_date__lt=timezone.now() - timedelta(days=30))
+        moved.application_date -= timedelta(days=5)  # Moves every bucket to the new day
+        moved.area_of_interest = 'Other'
+        moved.save()
+        incremental = self.rows()
+        DailyRollup.objects.all().delete()
+        self.assertEqual(self.backfilled(), incremental)
+
+    def test_archiving_leaves_the_history_alone(self):
+        self.apply(days_ago=800, status='Accepted')
+        self.apply(days_ago=800, status='Pending')  # Untriaged: never archived
+        before = self.rows()
+        self.assertEqual(retention.archive_batch(retention.POLICIES['volunteer'], 100), 1)
+        self.assertEqual(ArchivedSubmission.objects.count(), 1)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(self.backfilled(), before)
+
+
+class CounterTests(TestCase):
+    """Incrementally maintained counters must agree with a recount (core_api/counters.py)."""
+
+    def apply(self, status='Pending', days_ago=0):
+        return VolunteerApplication.objects.create(
+            name='Esi', email='esi@example.org', area_of_interest='Other', status=status,
+            application_date=timezone.now() - timedelta(days=days_ago),
+        )
+
+    def message(self, **fields):
+        return ContactMessage.objects.create(name='Yaw', email='yaw@example.org', subject='Hi', message='x', **fields)
+
+    def assertCounts(self, **expected):
+        names = [name.replace('_', '-') for name in expected]
+        counts = counters.get_counts(names)
+        self.assertEqual(counts, dict(zip(names, expected.values())))
+        self.assertEqual(counts, {name: counters.COUNTERS[name].count() for name in names})
+
+    def test_status_flip(self):
+        application = self.apply()
+        self.assertCounts(volunteer_pending=1, volunteers_accepted=0, volunteer_applications=1)
+        application.status = 'Accepted'
+        application.save()
+        self.assertCounts(volunteer_pending=0, volunteers_accepted=1, volunteer_applications=1)
+        application.save()  # Unchanged: no further move
+        self.assertCounts(volunteer_pending=0, volunteers_accepted=1)
+
+    def test_bulk_update_from_admin_actions(self):
+        messages = [self.message() for _ in range(3)]
+        counters.bulk_update(ContactMessage.objects.filter(pk__in=[m.pk for m in messages[:2]]), is_read=True)
+        self.assertCounts(contact_unread=1)
+        counters.bulk_update(ContactMessage.objects.all(), is_read=True)
+        self.assertCounts(contact_unread=0)
+        self.assertEqual(counters.bulk_update(ContactMessage.objects.all(), is_read=True), 3)
+        self.assertCounts(contact_unread=0)
+
+    def test_saving_a_deferred_field_recounts(self):
+        application = self.apply()
+        Counter.objects.filter(name='volunteer-pending').update(value=0)  # Drift to be repaired
+        deferred = VolunteerApplication.objects.only('name').get(pk=application.pk)
+        deferred.name = 'Esi Mensah'
+        deferred.save()
+        self.assertCounts(volunteer_pending=1)
+
+    def test_deletes_while_archiving(self):
+        self.apply(status='Accepted', days_ago=800)
+        self.apply(status='Accepted')
+        self.assertEqual(retention.archive_batch(retention.POLICIES['volunteer'], 100), 1)
+        # Archived rows still count towards the metrics...
+        self.assertCounts(volunteers_accepted=2, volunteer_applications=2)
+        # ...but counters without an archive drop even inside archiving().
+        unread = self.message()
+        with counters.archiving():
+            unread.delete()
+        self.assertCounts(contact_unread=0)
+        VolunteerApplication.objects.get().delete()
+        self.assertCounts(volunteers_accepted=1, volunteer_applications=1)
+
+    def test_metric_moves_log_the_stats_showing_them(self):
+        stat = ImpactStat.objects.create(title='Volunteers', metric='volunteers-accepted')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apply(status='Accepted')
+        self.assertTrue(ChangeLogEntry.objects.filter(kind='impact-stat', object_id=stat.pk).exists())
+
+
+class ZipStreamTests(SimpleTestCase):
+    """The streamed archive must read back with zipfile and match its announced length (core_api/zipstream.py)."""
+
+    def member(self, name, data, **kwargs):
+        return Member(name, len(data), lambda: io.BytesIO(data), **kwargs)
+
+    def write(self, members):
+        archive = ZipStream(members)
+        return archive, b''.join(archive)
+
+    def test_round_trip_and_exact_size(self):
+        modified = datetime(2024, 5, 6, 7, 8, 10)
+        files = {'photos/a.jpg': b'\xff\xd8' + bytes(range(256)) * 40, 'videos/b.mp4': b'', 'c.pdf': b'%PDF-1.4 x'}
+        archive, body = self.write([self.member(name, data, modified=modified) for name, data in files.items()])
+        self.assertEqual(archive.size(), len(body))
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({name: zf.read(name) for name in zf.namelist()}, files)
+            self.assertEqual(zf.getinfo('c.pdf').date_time, (2024, 5, 6, 7, 8, 10))
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist()))
+
+    def test_deflated_members_have_no_announced_size(self):
+        text = 'résumé '.encode() * 1000
+        archive, body = self.write([self.member('notes.txt', text), self.member('a.jpg', b'jpeg')])
+        self.assertIsNone(archive.size())
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertEqual(zf.getinfo('notes.txt').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.read('notes.txt'), text)
+            self.assertLess(zf.getinfo('notes.txt').compress_size, len(text))
+
+    def test_zip64_records(self):
+        data = b'small body, large claim'
+        member = Member('big.mp4', ZIP64_LIMIT, lambda: io.BytesIO(data))  # Faked size: headers go ZIP64
+        self.assertTrue(member.zip64)
+        member.size = len(data)
+        archive, body = self.write([member, self.member('after.jpg', b'x' * 10)])
+        self.assertEqual(archive.size(), len(body))
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.read('big.mp4'), data)
+        # Offsets and counts past the 32/16-bit fields add the ZIP64 end records.
+        self.assertIn(struct.pack('<I', 0x06064b50), end_records(0x10000, 100, ZIP64_LIMIT + 1))
+        self.assertNotIn(struct.pack('<I', 0x06064b50), end_records(2, 100, 1000))
+
+    def test_streamed_members_are_read_lazily(self):
+        opened = []
+
+        def members():
+            for name in ('a.jpg', 'b.jpg'):
+                opened.append(name)
+                yield self.member(name, name.encode() * 10)
+
+        archive = ZipStream(members())
+        self.assertIsNone(archive.size())
+        self.assertEqual(opened, [])
+        body = b''.join(archive)
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertEqual(zf.namelist(), ['a.jpg', 'b.jpg'])
+
+    def test_changed_size_breaks_the_stream(self):
+        member = Member('a.jpg', 10, lambda: io.BytesIO(b'only eight'[:8]))
+        with self.assertRaises(IOError):
+            b''.join(ZipStream([member]))
@@ -0,0 +1,165 @@
+# core_api/textextract.py
+"""
+Plain text out of an uploaded document, run as a child process:
+
+    python -m core_api.textextract <file name> --memory-mb 512 --cpu-seconds 30 < file > text
+
+The child limits its own address space and CPU time before reading
+anything, so a hostile or pathological file can only kill the child.
+core_api/documents.py also enforces a wall-clock timeout. Exits with
+UNSUPPORTED for file types it doesn't read. Deliberately Django-free: it
+starts in a few milliseconds and never touches the database.
+
+Office formats (docx, pptx, xlsx, odt, odp, ods) are ZIP archives of XML
+and are read with the standard library. PDF text is read with pypdf when
+it is installed; otherwise a small reader takes the strings shown by
+``Tj``/``TJ`` in (Flate-compressed) content streams, which covers most
+generated PDFs but not scans or unusual font encodings.
+"""
+import argparse
+import html
+import io
+import re
+import sys
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+UNSUPPORTED = 3
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.csv', '.tsv', '.json', '.rtf'}
+HTML_EXTENSIONS = {'.html', '.htm'}
+OFFICE_PARTS = {
+    '.docx': re.compile(r'word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$'),
+    '.pptx': re.compile(r'ppt/slides/slide\d+\.xml$'),
+    '.xlsx': re.compile(r'xl/sharedStrings\.xml$'),
+    '.odt': re.compile(r'content\.xml$'),
+    '.odp': re.compile(r'content\.xml$'),
+    '.ods': re.compile(r'content\.xml$'),
+}
+# Elements that end a line of text in the formats above (local names)
+BLOCK_ELEMENTS = {'p', 'br', 'tab', 'si', 'h', 'list-item', 'table-row'}
+
+_TAGS = re.compile(r'<(script|style)\b.*?</\1>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+_SPACES = re.compile(r'[ \t\r\f\v]+')
+
+
+def decode(data):
+    for encoding in ('utf-8-sig', 'cp1252'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('latin-1')
+
+
+def tidy(text):
+    text = _SPACES.sub(' ', text.replace('\x00', ''))
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+# --- Formats ---
+def read_html(data):
+    return html.unescape(_TAGS.sub(' ', decode(data)))
+
+
+def read_office(data, parts):
+    chunks = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for name in sorted(n for n in archive.namelist() if parts.search(n)):
+            root = ElementTree.fromstring(archive.read(name))
+            for element in root.iter():
+                local_name = element.tag.rpartition('}')[2]
+                if element.text and local_name in ('t', 'span', 'p', 'h', 's'):
+                    chunks.append(element.text)
+                if local_name in BLOCK_ELEMENTS:
+                    chunks.append('\n')
+                if element.tail and local_name == 'span':
+                    chunks.append(element.tail)
+    return ''.join(chunks)
+
+
+_PDF_STREAM = re.compile(rb'<<(.*?)>>\s*stream\r?\n(.*?)\r?\nendstream', re.DOTALL)
+_PDF_TEXT = re.compile(rb'\((?:\\.|[^\\)])*\)\s*Tj|\[(?:\\.|[^\]])*\]\s*TJ|T\*|ET', re.DOTALL)
+_PDF_STRING = re.compile(rb'\(((?:\\.|[^\\)])*)\)', re.DOTALL)
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def pdf_string(raw):
+    def unescape(match):
+        token = match.group(1)
+        if token[:1].isdigit():
+            return bytes([int(token, 8) & 0xFF])
+        return _PDF_ESCAPES.get(token, token if token != b'\n' else b'')
+
+    return re.sub(rb'\\([0-7]{1,3}|.)', unescape, raw, flags=re.DOTALL).decode('latin-1')
+
+
+def read_pdf_builtin(data):
+    chunks = []
+    for dictionary, stream in _PDF_STREAM.findall(data):
+        if b'/FlateDecode' in dictionary:
+            try:
+                stream = zlib.decompressobj().decompress(stream)
+            except zlib.error:
+                continue
+        elif b'/Filter' in dictionary:
+            continue  # Images and other encodings
+        for operator in _PDF_TEXT.finditer(stream):
+            token = operator.group()
+            if token in (b'T*', b'ET'):
+                chunks.append('\n')
+            else:
+                chunks.append(''.join(pdf_string(s) for s in _PDF_STRING.findall(token)))
+    return ''.join(chunks)
+
+
+def read_pdf(data):
+    try:
+        from pypdf import PdfReader  # Optional; much better with real-world fonts
+    except ImportError:
+        return read_pdf_builtin(data)
+    return '\n\n'.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def extract(name, data):
+    """Text of the document ``data`` named ``name``, or None for an unsupported type."""
+    extension = '.' + name.rpartition('.')[2].lower() if '.' in name else ''
+    if extension in TEXT_EXTENSIONS:
+        return tidy(decode(data))
+    if extension in HTML_EXTENSIONS:
+        return tidy(read_html(data))
+    if extension in OFFICE_PARTS:
+        return tidy(read_office(data, OFFICE_PARTS[extension]))
+    if extension == '.pdf':
+        return tidy(read_pdf(data))
+    return None
+
+
+# --- Child process entry point ---
+def limit(memory_mb, cpu_seconds):
+    import resource
+
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('name')
+    parser.add_argument('--memory-mb', type=int, default=512)
+    parser.add_argument('--cpu-seconds', type=int, default=30)
+    parser.add_argument('--max-chars', type=int, default=200000)
+    args = parser.parse_args(argv)
+    limit(args.memory_mb, args.cpu_seconds)
+    text = extract(args.name, sys.stdin.buffer.read())
+    if text is None:
+        return UNSUPPORTED
+    sys.stdout.buffer.write(text[:args.max_chars].encode('utf-8'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
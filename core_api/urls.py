@@ -2,12 +2,18 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .downloads import gallery_zip, press_kit_zip
+from .feeds import blog_feed, event_feed
+from .live import live_stream
+from .sitemaps import sitemap_chunk, sitemap_index
 # NEW: Import all your views
 from .views import (
     BlogPostViewSet, EventViewSet, ResourceViewSet,
     ContactMessageCreateView, NewsletterSubscriberCreateView,
     VolunteerApplicationCreateView, PartnershipInquiryCreateView, # New form views
-    TeamMemberViewSet, GalleryItemViewSet, CategoryViewSet, ImpactStatViewSet, TransformationStoryViewSet # New data views
+    TeamMemberViewSet, GalleryItemViewSet, CategoryViewSet, ImpactStatViewSet, TransformationStoryViewSet, # New data views
+    SearchView, InboxCountersView, ArchivedSubmissionListView, ChangesView,
+    StatsView,
 )
 
 # Create a router and register our viewsets with it.
@@ -24,6 +30,10 @@ router.register(r'impact-stats', ImpactStatViewSet, basename='impact-stat') #New
 router.register(r'transformation-stories', TransformationStoryViewSet, basename='transformation-story') 
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
+    # Streamed ZIP downloads; before the router, whose format-suffix routes would take resources/press-kit.zip
+    path('categories/<slug:slug>/gallery.zip', gallery_zip, name='category-gallery-zip'),
+    path('resources/press-kit.zip', press_kit_zip, name='press-kit-zip'),
+
     path('', include(router.urls)), # Includes all URLs registered with the router
 
     # Specific API Endpoints for form submissions (using CreateAPIView)
@@ -31,5 +41,20 @@ urlpatterns = [
     path('subscribe/', NewsletterSubscriberCreateView.as_view(), name='newsletter-subscribe'),
     path('volunteer/', VolunteerApplicationCreateView.as_view(), name='volunteer-application-create'), # NEW: Volunteer form API
     path('partner/', PartnershipInquiryCreateView.as_view(), name='partnership-inquiry-create'), # NEW: Partner form API
+    path('search/', SearchView.as_view(), name='search'), # Unified search + typeahead across content types
+    path('changes/', ChangesView.as_view(), name='changes'), # Delta sync: ?since=<token>
+    path('live/', live_stream, name='live'), # Server-sent events (501 unless served by the ASGI app)
+    path('stats/', StatsView.as_view(), name='stats'), # Staff-only daily submission trends
+    path('inbox/counters/', InboxCountersView.as_view(), name='inbox-counters'), # Staff-only triage counts
+    path('archive/submissions/', ArchivedSubmissionListView.as_view(), name='archived-submission-list'), # Staff-only
+
+    # Syndication feeds: <fmt> is rss, atom or json
+    path('feeds/blog.<str:fmt>', blog_feed, name='blog-feed'),
+    path('feeds/blog/<slug:category>.<str:fmt>', blog_feed, name='blog-category-feed'),
+    path('feeds/events.<str:fmt>', event_feed, name='event-feed'),
+
+    # Sitemap index and its per-section chunks
+    path('sitemap.xml', sitemap_index, name='sitemap-index'),
+    path('sitemaps/<slug:section>-<int:chunk>.xml', sitemap_chunk, name='sitemap-chunk'),
     # Add any other specific endpoints you need here
 ]
\ No newline at end of file
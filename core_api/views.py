@@ -1,24 +1,54 @@
 # core_api/views.py
+from datetime import timedelta
+
 from rest_framework import (
     viewsets,
     generics,
     status,
     filters
 )
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 from .models import (
     BlogPost, Event, ContactMessage, NewsletterSubscriber, Resource,
-    VolunteerApplication, PartnershipInquiry, TeamMember, GalleryItem, Category, ImpactStat, TransformationStory
+    VolunteerApplication, PartnershipInquiry, TeamMember, GalleryItem, Category, ImpactStat, TransformationStory,
+    RelatedPost, SearchEntry, ArchivedSubmission
 )
 from .serializers import (
     BlogPostSerializer, EventSerializer, ContactMessageSerializer,
     NewsletterSubscriberSerializer, ResourceSerializer,
     VolunteerApplicationSerializer, PartnershipInquirySerializer,
-    TeamMemberSerializer, GalleryItemSerializer, CategorySerializer, ImpactStatSerializer, TransformationStorySerializer
+    TeamMemberSerializer, GalleryItemSerializer, ImpactStatSerializer, TransformationStorySerializer,
+    CategoryWithCountsSerializer, BlogPostFeedSerializer, GalleryItemFeedSerializer, SearchEntrySerializer,
+    ArchivedSubmissionSerializer
 )
+from . import assets, changes, counters, documents, rollups, search
+from .idempotency import IdempotentCreateMixin
+from .pagination import decode_cursor, merge_keyset_sources
+
+class SparseFieldsetViewMixin:
+    """Narrow read querysets to the columns and joins ``?fields=``/``?expand=`` select."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.get_serializer().narrow_queryset(queryset)
 
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
+
+class BlogPostViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = BlogPost.objects.filter(is_active=True).order_by('-published_date')
     serializer_class = BlogPostSerializer
     lookup_field = 'slug'
@@ -26,22 +56,104 @@ class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['title', 'content', 'author']
     filterset_fields = ['category__slug']
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=True, methods=['get'])
+    def related(self, request, slug=None):
+        """Related posts, read from the precomputed index (see core_api/related.py)."""
+        entries = (
+            RelatedPost.objects
+            .filter(post__slug=slug, post__is_active=True, related__is_active=True)
+            .select_related('related')
+            .order_by('-score')
+        )
+        serializer = BlogPostFeedSerializer(context=self.get_serializer_context())
+        results = [{**serializer.to_representation(entry.related), 'score': round(entry.score, 4)} for entry in entries]
+        if not results:
+            get_object_or_404(BlogPost.objects.only('pk'), slug=slug, is_active=True)
+        return Response(results)
+
+def count_subquery(queryset, related_field):
+    """Helper: correlated COUNT(*) of ``queryset`` rows pointing at the outer row."""
+    counts = (
+        queryset.filter(**{related_field: OuterRef('pk')})
+        .order_by()
+        .values(related_field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class CategoryViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all().order_by('name')
-    serializer_class = CategorySerializer
+    serializer_class = CategoryWithCountsSerializer
     lookup_field = 'slug'
+    feed_page_size = 20
+    feed_max_page_size = 100
+
+    def get_queryset(self):
+        # Counts are computed in the same SELECT as the categories, and only
+        # for the count fields the request actually asks for.
+        queryset = super().get_queryset()
+        fields = self.get_serializer().fields
+        counts = {}
+        if 'blog_post_count' in fields:
+            counts['blog_post_count'] = count_subquery(BlogPost.objects.filter(is_active=True), 'category')
+        if 'gallery_item_count' in fields:
+            counts['gallery_item_count'] = count_subquery(GalleryItem.objects.filter(is_published=True), 'category')
+        return queryset.annotate(**counts)
+
+    @action(detail=True, methods=['get'])
+    def feed(self, request, slug=None):
+        """Merged, newest-first stream of a category's blog posts and gallery items."""
+        category = get_object_or_404(Category.objects.only('pk'), slug=slug)
+        cursor = request.query_params.get('cursor')
+        cursor = decode_cursor(cursor) if cursor else None
+        try:
+            limit = min(int(request.query_params.get('limit', self.feed_page_size)), self.feed_max_page_size)
+        except ValueError:
+            limit = self.feed_page_size
+        limit = max(limit, 1)
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+        context = self.get_serializer_context()
+        post_serializer = BlogPostFeedSerializer(context=context)
+        item_serializer = GalleryItemFeedSerializer(context=context)
+        posts = post_serializer.narrow_queryset(BlogPost.objects.filter(category=category, is_active=True))
+        items = item_serializer.narrow_queryset(GalleryItem.objects.filter(category=category, is_published=True))
+        # Ranks break ties between the two sources at equal timestamps.
+        page, next_cursor = merge_keyset_sources(
+            [(1, 'published_date', posts), (0, 'upload_date', items)], cursor, limit
+        )
+
+        results = []
+        for obj in page:
+            if isinstance(obj, BlogPost):
+                results.append({'type': 'blogpost', **post_serializer.to_representation(obj)})
+            else:
+                results.append({'type': 'gallery-item', **item_serializer.to_representation(obj)})
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        return Response({'next': next_url, 'results': results})
+
+class EventViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.filter(is_active=True).order_by('event_date')
     serializer_class = EventSerializer
     lookup_field = 'slug'
 
-class ResourceViewSet(viewsets.ReadOnlyModelViewSet):
+class ResourceViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Resource.objects.filter(is_public=True)
     serializer_class = ResourceSerializer
 
-# Form create views
-class ContactMessageCreateView(generics.CreateAPIView):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('search', '').strip()
+        if query:
+            # Title, description and the text of the file itself (core_api/documents.py), ranked
+            queryset = documents.search(queryset, query)
+        return queryset
+
+# Form create views (all honour Idempotency-Key, see core_api/idempotency.py)
+class ContactMessageCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
 
@@ -51,7 +163,7 @@ class ContactMessageCreateView(generics.CreateAPIView):
         print(f"New contact message from {instance.name} ({instance.email})")
 
 
-class NewsletterSubscriberCreateView(generics.CreateAPIView):
+class NewsletterSubscriberCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     queryset = NewsletterSubscriber.objects.all()
     serializer_class = NewsletterSubscriberSerializer
 
@@ -71,7 +183,7 @@ class NewsletterSubscriberCreateView(generics.CreateAPIView):
 
 
 # New create-only endpoints
-class VolunteerApplicationCreateView(generics.CreateAPIView):
+class VolunteerApplicationCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     queryset = VolunteerApplication.objects.all()
     serializer_class = VolunteerApplicationSerializer
 
@@ -80,7 +192,7 @@ class VolunteerApplicationCreateView(generics.CreateAPIView):
         print(f"New volunteer application from {instance.name}")
 
 
-class PartnershipInquiryCreateView(generics.CreateAPIView):
+class PartnershipInquiryCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     queryset = PartnershipInquiry.objects.all()
     serializer_class = PartnershipInquirySerializer
 
@@ -90,23 +202,191 @@ class PartnershipInquiryCreateView(generics.CreateAPIView):
 
 
 # Read-only lists
-class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
+class TeamMemberViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TeamMember.objects.filter(is_active=True).order_by('order', 'name')
     serializer_class = TeamMemberSerializer
 
 
-class GalleryItemViewSet(viewsets.ReadOnlyModelViewSet):
+class GalleryItemViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = GalleryItem.objects.filter(is_published=True).order_by('-upload_date')
     serializer_class = GalleryItemSerializer
 
 
 # ImpactStat ViewSet (full CRUD)
-class ImpactStatViewSet(viewsets.ModelViewSet):
+class ImpactStatViewSet(IdempotentCreateMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ImpactStat.objects.all()
     serializer_class = ImpactStatSerializer
 
 
 # TransformationStory ViewSet (full CRUD)
-class TransformationStoryViewSet(viewsets.ModelViewSet):
+class TransformationStoryViewSet(IdempotentCreateMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TransformationStory.objects.all()
     serializer_class = TransformationStorySerializer
+
+
+# Unified search over every public content type
+class SearchPagination(LimitOffsetPagination):
+    default_limit = 20
+    max_limit = 100
+
+
+class SearchView(generics.ListAPIView):
+    """
+    ``/api/search/?q=`` ranked hits across content types (``&type=blogpost,event``
+    to narrow), or ``&mode=typeahead`` for fast title suggestions.
+    """
+    serializer_class = SearchEntrySerializer
+    pagination_class = SearchPagination
+
+    def get_kinds(self):
+        kinds = [kind for kind in self.request.query_params.get('type', '').split(',') if kind in search.SOURCES]
+        return kinds or None
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            return SearchEntry.objects.none()
+        return search.search(query, self.get_kinds()).defer('body', 'search_vector')
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('mode') == 'typeahead':
+            query = request.query_params.get('q', '').strip()
+            hits = search.typeahead(query, self.get_kinds()) if query else []
+            return Response({'results': self.get_serializer(hits, many=True).data})
+        return super().list(request, *args, **kwargs)
+
+
+# Delta sync for clients and static-site builds (core_api/changes.py)
+class ChangesView(APIView):
+    """
+    ``/api/changes/?since=<token>``: public records created or updated since
+    ``token``, and ids deleted or hidden since then. Follow ``next`` while
+    ``has_more``. Without ``since`` (or with ``reset: true`` on a 410),
+    fetch the lists in full and sync from the returned ``next``.
+    """
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if not since:
+            return Response({'changes': {}, 'deleted': {}, 'next': changes.encode_token(changes.current_position()),
+                             'has_more': False, 'reset': True})
+        try:
+            position = changes.decode_token(since)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'since': 'Invalid sync token.'})
+        if position < changes.horizon():
+            return Response(
+                {'detail': 'Sync token has expired; fetch everything again.', 'reset': True,
+                 'next': changes.encode_token(changes.current_position())},
+                status=status.HTTP_410_GONE,
+            )
+        context = self.get_serializer_context()
+        records, deleted, next_position, has_more = changes.changes_since(
+            position, settings.CHANGES_PAGE_SIZE,
+            narrow=lambda source, queryset: source.serializer_class()(context=context).narrow_queryset(queryset),
+        )
+        return Response({
+            'changes': {
+                kind: changes.SOURCES[kind].serializer_class()(objects, many=True, context=context).data
+                for kind, objects in records.items()
+            },
+            'deleted': deleted,
+            'next': changes.encode_token(next_position),
+            'has_more': has_more,
+        })
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+
+# Staff-only inbox counters (core_api/counters.py)
+class InboxCountersView(APIView):
+    """``/api/inbox/counters/``: unread/pending triage counts, without counting the tables."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        values = counters.get_counts(counters.INBOX_COUNTERS)
+        return Response({
+            name: {'label': counters.COUNTERS[name].label, 'value': values[name]}
+            for name in counters.INBOX_COUNTERS
+        })
+
+
+# Staff-only submission trends from the daily rollups (core_api/rollups.py)
+class StatsView(APIView):
+    """
+    ``/api/stats/?metric=volunteer-applications&dimension=status&start=2025-01-01&end=2025-06-30``
+    with ``&interval=day|week|month`` (default day) and ``&cumulative=1`` for
+    running totals (subscriber growth). Without ``metric``, lists the metrics
+    and their dimensions.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        metric = params.get('metric')
+        if not metric:
+            return Response({
+                'metrics': {name: source.dimensions for name, source in rollups.SOURCES.items()},
+                'intervals': list(rollups.INTERVALS),
+            })
+        source = rollups.SOURCES.get(metric)
+        if source is None:
+            raise ValidationError({'metric': f"Choose one of: {', '.join(rollups.SOURCES)}."})
+        dimension = params.get('dimension', rollups.TOTAL)
+        if dimension and dimension not in source.dimensions:
+            raise ValidationError({'dimension': f"Choose one of: {', '.join(source.dimensions) or '(none)'}."})
+        interval = params.get('interval', 'day')
+        if interval not in rollups.INTERVALS:
+            raise ValidationError({'interval': f"Choose one of: {', '.join(rollups.INTERVALS)}."})
+        try:
+            end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+            start = parse_date(params['start']) if params.get('start') else end - timedelta(days=29)
+        except (TypeError, ValueError):
+            start = end = None
+        if start is None or end is None or start > end:
+            raise ValidationError({'start': "Use YYYY-MM-DD dates with start <= end."})
+
+        points, totals = rollups.series(metric, dimension, start, end, interval)
+        if params.get('cumulative') in ('1', 'true'):
+            running = rollups.total_before(metric, dimension, start)
+            cumulative = []
+            for period, counts in points:
+                for value, count in counts.items():
+                    running[value] = running.get(value, 0) + count
+                cumulative.append((period, dict(running)))
+            points = cumulative
+        return Response({
+            'metric': metric,
+            'dimension': dimension or None,
+            'interval': interval,
+            'start': start,
+            'end': end,
+            'totals': totals,
+            'series': [{'period': period, 'counts': counts} for period, counts in points],
+        })
+
+
+# Staff-only access to archived submissions (core_api/retention.py)
+class ArchivedSubmissionListView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """
+    ``/api/archive/submissions/``, newest first. Filter with ``?kind=contact``,
+    ``?email=`` (exact), ``?original_id=`` and ``?submitted_at__gte=``/``?submitted_at__lt=``.
+    """
+    queryset = ArchivedSubmission.objects.order_by('-submitted_at', '-pk')
+    serializer_class = ArchivedSubmissionSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = SearchPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {
+        'kind': ['exact'],
+        'email': ['exact'],
+        'original_id': ['exact'],
+        'submitted_at': ['lt', 'gte'],
+    }
+
+
+# Media serving (development static() route)
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Media with Content-Type, ETag and 304s; far-future caching for content-addressed names."""
+    return assets.serve_media_file(request, path, document_root=document_root)
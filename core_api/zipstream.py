@@ -0,0 +1,154 @@
+# core_api/zipstream.py
+"""
+ZIP archives written on the fly, for StreamingHttpResponse.
+
+Members are read in CHUNK_SIZE pieces and written straight to the response:
+nothing is buffered beyond one chunk and one small central-directory record
+per member, so memory stays flat however large the archive. CRCs are only
+known after a member is written, so each member is followed by a data
+descriptor (general purpose flag bit 3) and the sizes are repeated in the
+central directory.
+
+Already-compressed media (JPEG, MP4, PDF, ...) is stored as is. Anything
+else is deflated. Members may come from a generator, consumed as the
+archive is written. When they are given as a list and every one is stored,
+``ZipStream.size()`` is exact (the layout is computed with the same header
+code used for writing) and can be sent as Content-Length. ZIP64 records are
+used only for members or offsets past 4 GiB.
+"""
+import struct
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+ZIP64_LIMIT = 0xFFFFFFFF
+STORED, DEFLATED = 0, 8
+FLAGS = 0x08 | 0x800  # Data descriptor follows; names are UTF-8
+COMPRESSED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic', '.mp4', '.m4v', '.mov', '.webm', '.mkv', '.avi',
+    '.mp3', '.m4a', '.aac', '.ogg', '.pdf', '.zip', '.gz', '.bz2', '.xz', '.7z', '.rar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub',
+}
+
+
+def dos_datetime(value):
+    """(time, date) fields in MS-DOS format for a datetime (clamped to 1980, the format's epoch)."""
+    if value is None or value.year < 1980:
+        return 0, (1 << 5) | 1
+    return (
+        (value.hour << 11) | (value.minute << 5) | (value.second // 2),
+        ((value.year - 1980) << 9) | (value.month << 5) | value.day,
+    )
+
+
+class Member:
+    """One archive entry: ``open()`` returns a binary file object; ``size`` is its length in bytes."""
+
+    def __init__(self, name, size, open, modified=None, method=None):
+        self.name = name
+        self.encoded_name = name.encode('utf-8')
+        self.size = size
+        self.open = open
+        self.modified = modified
+        if method is None:
+            extension = '.' + name.rpartition('.')[2].lower() if '.' in name else ''
+            method = STORED if extension in COMPRESSED_EXTENSIONS else DEFLATED
+        self.method = method
+        self.zip64 = size >= ZIP64_LIMIT  # Decided up front; the local header can't be rewritten
+
+
+def local_header(member):
+    extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0) if member.zip64 else b''
+    mod_time, mod_date = dos_datetime(member.modified)
+    placeholder = ZIP64_LIMIT if member.zip64 else 0
+    return struct.pack(
+        '<IHHHHHIIIHH', 0x04034b50, 45 if member.zip64 else 20, FLAGS, member.method, mod_time, mod_date,
+        0, placeholder, placeholder, len(member.encoded_name), len(extra),
+    ) + member.encoded_name + extra
+
+
+def data_descriptor(member, crc, compressed_size, size):
+    if member.zip64:
+        return struct.pack('<IIQQ', 0x08074b50, crc, compressed_size, size)
+    return struct.pack('<IIII', 0x08074b50, crc, compressed_size, size)
+
+
+def central_header(member, crc, compressed_size, size, offset):
+    fields = [value for value in (size, compressed_size, offset) if value >= ZIP64_LIMIT]
+    extra = struct.pack(f'<HH{len(fields)}Q', 0x0001, 8 * len(fields), *fields) if fields else b''
+    mod_time, mod_date = dos_datetime(member.modified)
+    version = 45 if (fields or member.zip64) else 20
+    return struct.pack(
+        '<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | version, version, FLAGS, member.method, mod_time, mod_date,
+        crc, min(compressed_size, ZIP64_LIMIT), min(size, ZIP64_LIMIT), len(member.encoded_name), len(extra),
+        0, 0, 0, 0o100644 << 16, min(offset, ZIP64_LIMIT),
+    ) + member.encoded_name + extra
+
+
+def end_records(count, directory_size, directory_offset):
+    records = b''
+    if count >= 0xFFFF or directory_size >= ZIP64_LIMIT or directory_offset >= ZIP64_LIMIT:
+        zip64_end_offset = directory_offset + directory_size
+        records += struct.pack(
+            '<IQHHIIQQQQ', 0x06064b50, 44, (3 << 8) | 45, 45, 0, 0, count, count, directory_size, directory_offset,
+        )
+        records += struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1)
+    return records + struct.pack(
+        '<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+        min(directory_size, ZIP64_LIMIT), min(directory_offset, ZIP64_LIMIT), 0,
+    )
+
+
+class ZipStream:
+    """Iterable of the bytes of a ZIP archive of ``members``."""
+
+    def __init__(self, members):
+        self.members = members  # A list, or an iterator read once while writing
+
+    def size(self):
+        """Exact archive length in bytes, or None for streamed members or any deflated one (size unknown)."""
+        if not isinstance(self.members, list) or any(member.method != STORED for member in self.members):
+            return None
+        offset, directory_size = 0, 0
+        for member in self.members:
+            header_offset = offset
+            offset += len(local_header(member)) + member.size + len(data_descriptor(member, 0, 0, 0))
+            directory_size += len(central_header(member, 0, member.size, member.size, header_offset))
+        return offset + directory_size + len(end_records(len(self.members), directory_size, offset))
+
+    def __iter__(self):
+        offset, directory = 0, []
+        for member in self.members:
+            header_offset = offset
+            header = local_header(member)
+            yield header
+            offset += len(header)
+            crc, size, compressed_size = 0, 0, 0
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15) if member.method == DEFLATED else None
+            with member.open() as source:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    if compressor is not None:
+                        chunk = compressor.compress(chunk)
+                    if chunk:
+                        compressed_size += len(chunk)
+                        yield chunk
+            if compressor is not None:
+                tail = compressor.flush()
+                compressed_size += len(tail)
+                yield tail
+            if member.method == STORED and size != member.size:
+                # Content-Length was promised from the old size; better a broken download than a corrupt file.
+                raise IOError(f"{member.name} changed size while being archived")
+            descriptor = data_descriptor(member, crc, compressed_size, size)
+            yield descriptor
+            offset += compressed_size + len(descriptor)
+            directory.append(central_header(member, crc, compressed_size, size, header_offset))
+        directory_offset = offset
+        for record in directory:
+            yield record
+            offset += len(record)
+        yield end_records(len(directory), offset - directory_offset, directory_offset)
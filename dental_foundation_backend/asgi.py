@@ -2,6 +2,11 @@
 ASGI config for dental_foundation_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn workers under gunicorn to get the /api/live/ event
+stream, which holds connections open on the event loop:
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn -c gunicorn.conf.py dental_foundation_backend.asgi:application
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
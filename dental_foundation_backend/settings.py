@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from decouple import config
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Full-text and trigram search (core_api/search.py)
 
     #Third-party
     'rest_framework',  # Django REST Framework
@@ -54,9 +56,18 @@ INSTALLED_APPS = [
 
 ]
 
+# Workers that only serve the JSON API can leave out the admin and CKEditor (faster boot, less memory per worker)
+ADMIN_ENABLED = config('DJANGO_ADMIN_ENABLED', default=True, cast=bool)
+if not ADMIN_ENABLED:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ('django.contrib.admin', 'ckeditor', 'ckeditor_uploader')]
+
 MIDDLEWARE = [
+    'core_api.profiling.ProfilingMiddleware',  # First, so superuser-triggered profiles cover the whole stack
+    'core_api.slowqueries.SlowQueryRouteMiddleware',  # Tags slow queries with the route that issued them
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware', # position important, must be high in the list
+    'core_api.assets.AssetMiddleware',  # Static/media when SERVE_ASSETS; skips everything below
+    'core_api.db_router.ReadYourWritesMiddleware',  # Primary/replica pinning, before anything reads the DB
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -105,6 +116,22 @@ DATABASES = {
     }
 }
 
+# Read replicas: POSTGRES_REPLICA_HOSTS=replica1.internal,replica2.internal adds
+# one alias per host (same credentials). Public reads are spread over them by
+# core_api.db_router; writes, the admin, recent writers, transactions and
+# everything outside a request (commands, workers) stay on 'default'.
+# For a local two-alias setup point a replica at the primary's own host.
+DATABASE_REPLICAS = []
+for index, replica_host in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': replica_host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core_api.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICA_STRATEGY = os.getenv('DATABASE_REPLICA_STRATEGY', 'round-robin')  # or 'least-lag'
+DATABASE_REPLICA_LAG_CACHE_SECONDS = 5  # How long a measured replica lag is trusted
+READ_YOUR_WRITES_SECONDS = 5  # Reads stay on the primary this long after a client writes
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +158,26 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media') # Directory where media files will
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') # Directory where static files will be collected
 
+# Opt-in content-addressed media: uploads are named by their SHA-256, identical
+# files are stored once and media URLs can be cached forever.
+MEDIA_CONTENT_ADDRESSED = config('MEDIA_CONTENT_ADDRESSED', default=False, cast=bool)
+
+# Production serving from the app server (core_api/assets.py): collectstatic writes hashed,
+# precompressed static files, served from an index built at startup; media gets ETag/304 handling.
+# Run collectstatic before starting workers with this on (templates need staticfiles.json).
+SERVE_ASSETS = config('SERVE_ASSETS', default=False, cast=bool)
+STATIC_CACHE_SECONDS = config('STATIC_CACHE_SECONDS', default=60, cast=int)  # Unhashed static names; hashed ones are immutable
+MEDIA_CACHE_SECONDS = config('MEDIA_CACHE_SECONDS', default=3600, cast=int)  # Media that is not content-addressed
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+if MEDIA_CONTENT_ADDRESSED:
+    STORAGES['default'] = {'BACKEND': 'core_api.storage.ContentAddressedStorage'}
+if SERVE_ASSETS:
+    STORAGES['staticfiles'] = {'BACKEND': 'core_api.assets.CompressedManifestStaticFilesStorage'}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -158,12 +205,109 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = []
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')  # Retry-safe POSTs (core_api/idempotency.py)
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
 
 
 
+# Public site (used for links in feeds and sitemaps)
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+FRONTEND_PATHS = {
+    'home': '/',
+    'blog': '/blog',
+    'blogpost': '/blog/{slug}',
+    'category': '/blog/category/{slug}',
+    'events': '/events',
+    'event': '/events/{slug}',
+    'gallery-item': '/gallery/{id}',
+}
+
+# Cache shared by every worker process: idempotency keys, feed and sitemap versions and renderings
+# live here, so a per-process cache (LocMemCache) breaks them (system check core_api.E001).
+# Redis when REDIS_URL is set (needs the redis package), otherwise a table in the primary database.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}}
+
+# Syndication feeds (core_api/feeds.py)
+FEED_ITEM_COUNT = 20  # Items per feed
+FEED_CACHE_TIMEOUT = 60 * 60 * 24  # Rendered feeds are also invalidated on every relevant save
+
+# Sitemaps (core_api/sitemaps.py)
+SITEMAP_CHUNK_SIZE = 5000  # Primary-key range covered by one sitemap file (protocol limit is 50,000 URLs)
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # Chunks are also invalidated when an object in their range changes
+
+# Related posts (core_api/related.py)
+RELATED_POSTS_LIMIT = 5  # Neighbours stored per post
+RELATED_POSTS_CATEGORY_BOOST = 0.15  # Added to the similarity of posts in the same category
+
+# Idempotency keys on create endpoints (core_api/idempotency.py); needs a cache shared by all workers
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24  # How long a first response is replayed for retries with the same key
+IDEMPOTENCY_PENDING_TTL = 60  # How long an unfinished first attempt blocks retries (409) before they may run again
+
+# Retention for form submissions (core_api/retention.py, manage.py archive_submissions)
+SUBMISSION_RETENTION_DAYS = {  # Older triaged rows move to ArchivedSubmission; None keeps them forever
+    'contact': 365,
+    'volunteer': 730,
+    'partnership': 730,
+    'newsletter': 180,  # Unsubscribed (inactive) addresses only
+}
+
+# Incremental counters (core_api/counters.py)
+COUNTER_SHARDS = 8  # Rows each counter's writes are spread over, so concurrent submissions don't queue on one row lock
+
+# Delta sync (core_api/changes.py, /api/changes/, manage.py compact_changelog)
+CHANGES_PAGE_SIZE = 500  # Log entries per /api/changes/ response
+CHANGES_SETTLE_SECONDS = 2  # Entries younger than this are held back so concurrent commits can't be skipped
+CHANGELOG_TOMBSTONE_DAYS = 90  # Tombstones older than this are purged; clients with older tokens must resync
+
+# Live updates over server-sent events (core_api/live.py, ASGI only)
+LIVE_POLL_SECONDS = 1  # How often each worker's broadcaster reads the change log while clients are connected
+LIVE_POLL_LIMIT = 500  # Log entries read per poll
+LIVE_HEARTBEAT_SECONDS = 25  # Comment line sent on idle streams so proxies keep them open
+LIVE_QUEUE_SIZE = 100  # Undelivered events per connection before it is told to reset
+LIVE_BACKLOG_LIMIT = 200  # Missed events replayed on Last-Event-ID resume; further behind gets a reset
+LIVE_RETRY_MS = 5000  # Client reconnect delay announced in the stream
+LIVE_ERROR_BACKOFF_MAX = 30  # Longest wait between polls while the database keeps failing (doubles from LIVE_POLL_SECONDS)
+
+# Worker boot (core_api/startup.py, gunicorn.conf.py)
+BOOT_IMPORT_BUDGET_MS = config('BOOT_IMPORT_BUDGET_MS', default=600, cast=int)  # core_api.tests fails above this
+
+# On-demand profiling for superusers (core_api/profiling.py): X-Profile-Token header or ?_profile=1 with a superuser session
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))  # Not web-served; downloads go through the admin
+PROFILING_MAX_PROFILES = 50  # Oldest profiles are evicted beyond this count...
+PROFILING_MAX_BYTES = 100 * 1024 * 1024  # ...or this much disk
+PROFILING_TOKEN_MAX_AGE = 60 * 60 * 24  # Seconds a token from manage.py profiling_token stays valid
+
+# Slow-query log (core_api/slowqueries.py): aggregated per statement fingerprint under Slow Queries in the admin
+SLOW_QUERY_LOG = config('SLOW_QUERY_LOG', default=True, cast=bool)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=100, cast=float)  # Statements at least this slow are recorded
+SLOW_QUERY_BUFFER = 1000  # Slow statements held per process between flushes; the oldest are dropped beyond this
+SLOW_QUERY_FLUSH_SECONDS = 5  # How often each process writes its buffer and runs EXPLAIN for new fingerprints
+SLOW_QUERY_MAX_FINGERPRINTS = 500  # Least recently seen fingerprints are deleted beyond this
+
+# Text extraction from Resource files (core_api/documents.py), run by manage.py extract_resource_text --loop
+RESOURCE_TEXT_TIMEOUT = config('RESOURCE_TEXT_TIMEOUT', default=30, cast=int)  # Seconds per file (wall clock and CPU)
+RESOURCE_TEXT_MEMORY_MB = config('RESOURCE_TEXT_MEMORY_MB', default=512, cast=int)  # Address-space limit of the extractor process
+RESOURCE_TEXT_MAX_BYTES = 50 * 1024 * 1024  # Larger files are skipped
+RESOURCE_TEXT_MAX_CHARS = 200000  # Text kept per file
+RESOURCE_TEXT_POLL_SECONDS = 10  # Idle wait between checks for pending resources
+
+# Bulk ZIP downloads (core_api/downloads.py)
+DOWNLOAD_PRESIZE_MAX_ROWS = 1000  # Up to this many rows every file is sized before streaming, for Content-Length
+
+
+
 # CKEditor settings
 CKEDITOR_UPLOAD_PATH = "uploads/"  # Directory where uploaded files will be stored
+CKEDITOR_IMAGE_BACKEND = "core_api.ckeditor.OptimizingImageBackend"  # Downscale + re-encode pasted images
+CKEDITOR_IMAGE_MAX_SIZE = (1600, 1600)  # Largest width/height kept for uploaded images
+CKEDITOR_IMAGE_QUALITY = 80  # JPEG quality used when re-encoding
+CKEDITOR_UPLOAD_GC_GRACE_DAYS = 7  # Unreferenced uploads younger than this are left alone by gc_ckeditor_uploads
 CKEDITOR_CONFIGS = {
     'default': {
         'toolbar': 'full',
@@ -18,15 +18,22 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings # Import settings to access MEDIA_URL and MEDIA_ROOT 
 from django.conf.urls.static import static # Import static to serve media files during development  
+from core_api.views import serve_media
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('core_api.urls')),  # Include the core_api app's URLs
-    path('ckeditor/', include('ckeditor_uploader.urls')),  # Include CKEditor URLs for file uploads
 ]
 
+# Read-only API workers run with DJANGO_ADMIN_ENABLED=False and skip the admin and CKEditor entirely
+if settings.ADMIN_ENABLED:
+    urlpatterns += [
+        path('admin/', admin.site.urls),
+        path('ckeditor/', include('core_api.ckeditor_urls')),  # CKEditor uploads; views (and Pillow) load on first use
+    ]
+
 # Serve media files during development
 # This is only for development purposes; in production, i should serve media files through a web
+# server, or set SERVE_ASSETS=True (core_api.assets.AssetMiddleware answers these URLs before routing)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
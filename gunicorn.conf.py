@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration.
+
+    gunicorn -c gunicorn.conf.py dental_foundation_backend.wsgi
+
+Preload/fork mode (GUNICORN_PRELOAD=True, the default)
+------------------------------------------------------
+The master imports the project once, loads the URLconf (and with it every
+view and serializer) via core_api.startup.warm_up(), closes its database
+connections and freezes the garbage collector before forking. Workers then
+share all of that memory copy-on-write and serve their first request warm:
+
+* gc.freeze() moves every object allocated so far into a permanent
+  generation, so the collector in a worker never touches (and therefore
+  never copies) those pages.
+* Workers are forked from an already-imported master, so scaling out costs
+  a fork, not a Python boot. ``manage.py profile_startup`` shows what that
+  boot costs when it does happen.
+* Code changes need a full restart (not HUP) to be picked up, and nothing
+  that opens sockets or threads may run at import time.
+
+Workers that only serve the JSON API should also set
+DJANGO_ADMIN_ENABLED=False so the admin and CKEditor are never loaded.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')  # uvicorn.workers.UvicornWorker for ASGI (see asgi.py)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() in ('1', 'true', 'yes')
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))  # Recycle workers before fragmentation unshares too much
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from core_api.startup import warm_up
+
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded and froze %d objects before forking", gc.get_freeze_count())